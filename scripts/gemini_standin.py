@@ -0,0 +1,532 @@
+"""
+Local stand-in for the Gemini generateContent API.
+
+Serves `models/{model}:generateContent` and `:streamGenerateContent?alt=sse`
+so that translate.py and translate_articles.py can run without an API key:
+
+  GOOGLE_GEMINI_BASE_URL=http://127.0.0.1:8089 GEMINI_API_KEY=standin \
+    python scripts/translate_articles.py --all
+
+Responses are a deterministic pseudo-translation of the prompt: CJK text
+becomes made-up words while segment markers, placeholders and Markdown pass
+through unchanged, and front matter requests get their JSON values rewritten
+the same way. Latency and failures are drawn per request:
+
+  - latency: (base + per output token) x a log-normal jitter, with an
+    optional slow tail; streams send the base latency before the first event
+    and spread the rest over the events
+  - errors: 429 (with a RetryInfo delay), 503, or a timeout that never
+    answers; a concurrency ceiling returns 429 once exceeded
+
+The draws are seeded by the prompt and how many times it has been seen, so
+a run fails the same requests whatever order they arrive in.
+
+Usage:
+  python scripts/gemini_standin.py [--port 8089] [--latency 0.5] [--rate-429 0.05] ...
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+from translate import estimate_tokens
+
+DEFAULT_PORT = 8089
+
+MARKDOWN_PROMPT = "return only the translated Markdown:\n\n"
+TEXT_PROMPT = "Translate the following text:\n\n"
+JSON_PROMPT = "JSON object:\n\n"
+CONTEXT_RE = re.compile(r"^<!-- context:.*?<!-- end context -->\n\n", re.DOTALL)
+
+_IDEOGRAPH_RE = re.compile(r"[\u3400-\u9fff\uf900-\ufaff]+")
+_SYLLABLES = (
+    "ka", "ri", "to", "mu", "sen", "la", "vo", "ne",
+    "shi", "do", "ra", "pe", "lin", "go", "ta", "mi",
+)  # fmt: skip
+_PUNCTUATION = {
+    "\uff0c": ",",
+    "\u3002": ".",
+    "\u3001": ",",
+    "\uff1a": ":",
+    "\uff1b": ";",
+    "\uff01": "!",
+    "\uff1f": "?",
+    "\u201c": '"',
+    "\u201d": '"',
+    "\u2018": "'",
+    "\u2019": "'",
+}
+_PUNCTUATION_RE = re.compile(f"[{''.join(_PUNCTUATION)}]")
+
+
+def _pseudo_words(match: re.Match) -> str:
+    run = match.group(0)
+    words = " ".join(
+        "".join(_SYLLABLES[ord(char) % len(_SYLLABLES)] for char in run[i : i + 2])
+        for i in range(0, len(run), 2)
+    )
+    before = match.string[match.start() - 1 : match.start()]
+    after = match.string[match.end() : match.end() + 1]
+    if before.isalnum():
+        words = " " + words
+    if after.isalnum():
+        words += " "
+    return words
+
+
+def _ascii_punctuation(match: re.Match) -> str:
+    mark = _PUNCTUATION[match.group(0)]
+    after = match.string[match.end() : match.end() + 1]
+    if mark in ",.:;!?" and after.isalnum():
+        mark += " "
+    return mark
+
+
+def pseudo_translate(text: str) -> str:
+    """Replace CJK text with deterministic made-up words, keeping the rest."""
+    text = _IDEOGRAPH_RE.sub(_pseudo_words, text)
+    return _PUNCTUATION_RE.sub(_ascii_punctuation, text)
+
+
+def answer(prompt: str, body: dict[str, Any], mode: str) -> str:
+    """The response text a translation model would give for `prompt`."""
+    convert = pseudo_translate if mode == "pseudo" else str
+    if "responseSchema" in body.get("generationConfig", {}):
+        fields = json.loads(prompt.split(JSON_PROMPT, 1)[1])
+        translated = {
+            key: [convert(item) for item in value]
+            if isinstance(value, list)
+            else convert(value)
+            for key, value in fields.items()
+        }
+        return json.dumps(translated, ensure_ascii=False)
+    if MARKDOWN_PROMPT in prompt:
+        text = CONTEXT_RE.sub("", prompt.split(MARKDOWN_PROMPT, 1)[1])
+    elif TEXT_PROMPT in prompt:
+        text = prompt.split(TEXT_PROMPT, 1)[1]
+    else:
+        text = prompt
+    return convert(text)
+
+
+@dataclass(frozen=True)
+class StandinConfig:
+    mode: str = "pseudo"
+    # Seconds before the first byte, plus seconds per output token
+    latency: float = 0.5
+    latency_per_token: float = 0.002
+    # Sigma of the log-normal factor applied to every latency
+    jitter: float = 0.3
+    # Share of requests slowed down by `tail_factor`
+    tail_rate: float = 0.0
+    tail_factor: float = 10.0
+    rate_429: float = 0.0
+    rate_503: float = 0.0
+    rate_timeout: float = 0.0
+    # Concurrent requests answered before returning 429 (0: no ceiling)
+    max_concurrency: int = 0
+    retry_delay: float = 1.0
+    # Thinking tokens reported per output token
+    thinking_ratio: float = 0.0
+    stream_chunk_chars: int = 200
+    seed: int = 0
+
+
+@dataclass
+class StandinStats:
+    requests: int = 0
+    statuses: Counter = field(default_factory=Counter)
+    timeouts: int = 0
+    # Seconds from receiving each successful request to the end of its answer
+    latencies: list[float] = field(default_factory=list)
+    in_flight: int = 0
+    peak_in_flight: int = 0
+
+    def percentile(self, percentile: float) -> float:
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        rank = max(1, math.ceil(percentile / 100 * len(ordered)))
+        return ordered[rank - 1]
+
+
+class GeminiStandin:
+    def __init__(self, config: StandinConfig | None = None):
+        self.config = config or StandinConfig()
+        self.stats = StandinStats()
+        self._seen: Counter = Counter()
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._server: ThreadingHTTPServer | None = None
+
+    def _rng(self, prompt: str) -> random.Random:
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        with self._lock:
+            self._seen[digest] += 1
+            attempt = self._seen[digest]
+        return random.Random(f"{self.config.seed}:{digest}:{attempt}")
+
+    def _latency(self, rng: random.Random, output_tokens: int) -> tuple[float, float]:
+        """Return (time to first byte, generation time) for one answer."""
+        config = self.config
+        factor = rng.lognormvariate(0.0, config.jitter) if config.jitter else 1.0
+        if rng.random() < config.tail_rate:
+            factor *= config.tail_factor
+        return (
+            config.latency * factor,
+            config.latency_per_token * output_tokens * factor,
+        )
+
+    def _fault(self, rng: random.Random) -> str | None:
+        config = self.config
+        draw = rng.random()
+        for fault, rate in (
+            ("429", config.rate_429),
+            ("503", config.rate_503),
+            ("timeout", config.rate_timeout),
+        ):
+            if draw < rate:
+                return fault
+            draw -= rate
+        return None
+
+    def _enter(self) -> bool:
+        with self._lock:
+            self.stats.requests += 1
+            ceiling = self.config.max_concurrency
+            if ceiling and self.stats.in_flight >= ceiling:
+                return False
+            self.stats.in_flight += 1
+            self.stats.peak_in_flight = max(
+                self.stats.peak_in_flight, self.stats.in_flight
+            )
+            return True
+
+    def _leave(self) -> None:
+        with self._lock:
+            self.stats.in_flight -= 1
+
+    def _record(self, status: int, started_at: float | None = None) -> None:
+        with self._lock:
+            self.stats.statuses[status] += 1
+            if started_at is not None:
+                self.stats.latencies.append(time.monotonic() - started_at)
+
+    def usage(self, body: dict[str, Any], prompt: str, text: str) -> dict[str, int]:
+        system = "".join(
+            part.get("text", "")
+            for part in body.get("systemInstruction", {}).get("parts", [])
+        )
+        prompt_tokens = estimate_tokens(system + prompt)
+        output_tokens = estimate_tokens(text)
+        thoughts = round(output_tokens * self.config.thinking_ratio)
+        usage = {
+            "promptTokenCount": prompt_tokens,
+            "candidatesTokenCount": output_tokens,
+            "totalTokenCount": prompt_tokens + output_tokens + thoughts,
+        }
+        if thoughts:
+            usage["thoughtsTokenCount"] = thoughts
+        return usage
+
+    def handle(self, handler: "_Handler") -> None:
+        started_at = time.monotonic()
+        length = int(handler.headers.get("content-length", 0))
+        body = json.loads(handler.rfile.read(length))
+        prompt = "".join(
+            part.get("text", "")
+            for content in body.get("contents", [])
+            for part in content.get("parts", [])
+        )
+        rng = self._rng(prompt)
+        fault = self._fault(rng)
+        if not self._enter():
+            self._send_error(handler, 429)
+            return
+        try:
+            self._serve(handler, body, prompt, rng, fault, started_at)
+        finally:
+            self._leave()
+
+    def _serve(
+        self,
+        handler: "_Handler",
+        body: dict[str, Any],
+        prompt: str,
+        rng: random.Random,
+        fault: str | None,
+        started_at: float,
+    ) -> None:
+        if fault == "timeout":
+            # Never answer; the client's deadline ends the request
+            with self._lock:
+                self.stats.timeouts += 1
+            self._stopped.wait()
+            handler.close_connection = True
+            return
+        if fault is not None:
+            self._send_error(handler, int(fault))
+            return
+
+        text = answer(prompt, body, self.config.mode)
+        usage = self.usage(body, prompt, text)
+        first_byte, generation = self._latency(rng, usage["candidatesTokenCount"])
+        if self._stopped.wait(first_byte):
+            return
+        if "streamGenerateContent" not in handler.path:
+            if self._stopped.wait(generation):
+                return
+            payload = json.dumps(
+                {
+                    "candidates": [
+                        {
+                            "content": {"role": "model", "parts": [{"text": text}]},
+                            "finishReason": "STOP",
+                        }
+                    ],
+                    "usageMetadata": usage,
+                },
+                ensure_ascii=False,
+            ).encode("utf-8")
+            handler.send_response(200)
+            handler.send_header("content-type", "application/json; charset=UTF-8")
+            handler.send_header("content-length", str(len(payload)))
+            handler.end_headers()
+            handler.wfile.write(payload)
+            self._record(200, started_at)
+            return
+
+        size = max(1, self.config.stream_chunk_chars)
+        pieces = [text[i : i + size] for i in range(0, len(text), size)] or [""]
+        handler.send_response(200)
+        handler.send_header("content-type", "text/event-stream")
+        handler.send_header("transfer-encoding", "chunked")
+        handler.end_headers()
+        try:
+            for index, piece in enumerate(pieces):
+                if index and self._stopped.wait(generation / len(pieces)):
+                    return
+                event: dict[str, Any] = {
+                    "candidates": [
+                        {"content": {"role": "model", "parts": [{"text": piece}]}}
+                    ]
+                }
+                if index == len(pieces) - 1:
+                    event["candidates"][0]["finishReason"] = "STOP"
+                    event["usageMetadata"] = usage
+                data = f"data: {json.dumps(event, ensure_ascii=False)}\r\n\r\n"
+                handler.write_chunk(data.encode("utf-8"))
+            handler.write_chunk(b"")
+        except (BrokenPipeError, ConnectionResetError):
+            handler.close_connection = True
+            return
+        self._record(200, started_at)
+
+    def _send_error(self, handler: "_Handler", status: int) -> None:
+        if status == 429:
+            error = {
+                "code": 429,
+                "message": "Resource has been exhausted (e.g. check quota).",
+                "status": "RESOURCE_EXHAUSTED",
+                "details": [
+                    {
+                        "@type": "type.googleapis.com/google.rpc.RetryInfo",
+                        "retryDelay": f"{self.config.retry_delay:g}s",
+                    }
+                ],
+            }
+        else:
+            error = {
+                "code": status,
+                "message": "The model is overloaded. Please try again later.",
+                "status": "UNAVAILABLE",
+            }
+        payload = json.dumps({"error": error}).encode("utf-8")
+        handler.send_response(status)
+        handler.send_header("content-type", "application/json; charset=UTF-8")
+        handler.send_header("content-length", str(len(payload)))
+        handler.end_headers()
+        handler.wfile.write(payload)
+        self._record(status)
+
+    def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Serve on a background thread and return the base URL."""
+        self._stopped.clear()
+        self._server = _Server((host, port), _Handler)
+        self._server.standin = self
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        bound_host, bound_port = self._server.server_address[:2]
+        return f"http://{bound_host}:{bound_port}"
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    standin: GeminiStandin
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: _Server
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def write_chunk(self, data: bytes) -> None:
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+
+    def do_POST(self) -> None:
+        if ":generateContent" in self.path or ":streamGenerateContent" in self.path:
+            self.server.standin.handle(self)
+            return
+        self.send_error(404)
+
+
+def add_standin_arguments(parser: argparse.ArgumentParser) -> None:
+    defaults = StandinConfig()
+    group = parser.add_argument_group("Gemini stand-in")
+    group.add_argument(
+        "--mode",
+        choices=("pseudo", "echo"),
+        default=defaults.mode,
+        help="Pseudo-translate CJK text or echo the source. Default: pseudo.",
+    )
+    group.add_argument(
+        "--latency",
+        type=float,
+        default=defaults.latency,
+        help=f"Seconds before the first byte. Default: {defaults.latency}.",
+    )
+    group.add_argument(
+        "--latency-per-token",
+        type=float,
+        default=defaults.latency_per_token,
+        help=f"Seconds per output token. Default: {defaults.latency_per_token}.",
+    )
+    group.add_argument(
+        "--jitter",
+        type=float,
+        default=defaults.jitter,
+        help=f"Sigma of the log-normal latency factor. Default: {defaults.jitter}.",
+    )
+    group.add_argument(
+        "--tail-rate",
+        type=float,
+        default=defaults.tail_rate,
+        help="Share of requests slowed down by --tail-factor. Default: 0.",
+    )
+    group.add_argument(
+        "--tail-factor",
+        type=float,
+        default=defaults.tail_factor,
+        help=f"Latency factor of slow requests. Default: {defaults.tail_factor:g}.",
+    )
+    group.add_argument(
+        "--rate-429",
+        type=float,
+        default=defaults.rate_429,
+        help="Share of requests answered with 429. Default: 0.",
+    )
+    group.add_argument(
+        "--rate-503",
+        type=float,
+        default=defaults.rate_503,
+        help="Share of requests answered with 503. Default: 0.",
+    )
+    group.add_argument(
+        "--rate-timeout",
+        type=float,
+        default=defaults.rate_timeout,
+        help="Share of requests never answered. Default: 0.",
+    )
+    group.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=defaults.max_concurrency,
+        help="Concurrent requests served before returning 429. Default: no limit.",
+    )
+    group.add_argument(
+        "--retry-delay",
+        type=float,
+        default=defaults.retry_delay,
+        help=f"retryDelay sent with 429. Default: {defaults.retry_delay:g}s.",
+    )
+    group.add_argument(
+        "--thinking-ratio",
+        type=float,
+        default=defaults.thinking_ratio,
+        help="Thinking tokens reported per output token. Default: 0.",
+    )
+    group.add_argument(
+        "--seed",
+        type=int,
+        default=defaults.seed,
+        help="Seed for latency and error draws. Default: 0.",
+    )
+
+
+def config_from_args(args: argparse.Namespace) -> StandinConfig:
+    return StandinConfig(
+        mode=args.mode,
+        latency=args.latency,
+        latency_per_token=args.latency_per_token,
+        jitter=args.jitter,
+        tail_rate=args.tail_rate,
+        tail_factor=args.tail_factor,
+        rate_429=args.rate_429,
+        rate_503=args.rate_503,
+        rate_timeout=args.rate_timeout,
+        max_concurrency=args.max_concurrency,
+        retry_delay=args.retry_delay,
+        thinking_ratio=args.thinking_ratio,
+        seed=args.seed,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1", help="Address to bind.")
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=DEFAULT_PORT,
+        help=f"Port to listen on. Default: {DEFAULT_PORT}.",
+    )
+    add_standin_arguments(parser)
+    args = parser.parse_args()
+
+    standin = GeminiStandin(config_from_args(args))
+    base_url = standin.start(args.host, args.port)
+    print(f"Gemini stand-in listening on {base_url}", flush=True)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        standin.stop()
+        stats = standin.stats
+        print(
+            f"{stats.requests} requests, statuses {dict(stats.statuses)}, "
+            f"{stats.timeouts} timeouts",
+            flush=True,
+        )
+
+
+if __name__ == "__main__":
+    main()
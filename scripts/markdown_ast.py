@@ -1,10 +1,31 @@
+import html
 import re
 
+# Code-block languages Zhihu doesn't recognise → known aliases
+ZHIHU_LANGUAGE_ALIASES = {"x86asm": "nasm"}
+ZHIHU_TABLE_TAG = (
+    '<table data-draft-node="block" data-draft-type="table" data-size="normal">'
+)
+
+
+def escape_html(text: str) -> str:
+    """Escape text for HTML, leaving existing character references alone."""
+    text = re.sub(r"&(?!#?\w+;)", "&amp;", text)
+    return text.replace("<", "&lt;").replace(">", "&gt;")
+
+
+def unescape_markdown(text: str) -> str:
+    return re.sub(r"\\([\\`*_{}\[\]()#+\-.!|>~<])", r"\1", text)
+
 
 class Node:
     def __str__(self) -> str:
         raise NotImplementedError
 
+    def to_html(self) -> str:
+        """Render this node in the HTML dialect Zhihu's draft API accepts."""
+        raise NotImplementedError
+
 
 class Paragraph(Node):
     """Represents a paragraph in a markdown document."""
@@ -19,6 +40,27 @@ class Paragraph(Node):
             r" {2,}", " ", "".join(str(child) for child in self.children)
         ).strip()
 
+    def inner_html(self) -> str:
+        return "".join(child.to_html() for child in self.children).strip()
+
+    def to_html(self) -> str:
+        return f"<p>{self.inner_html()}</p>"
+
+
+class InlineHtml(Node):
+    """Represents a raw inline HTML tag in a markdown document. Syntax: <b>."""
+
+    def __init__(self, html: str):
+        assert isinstance(html, str), "HTML must be a string"
+
+        self.html = html
+
+    def __str__(self) -> str:
+        return self.html
+
+    def to_html(self) -> str:
+        return self.html
+
 
 class Text(Node):
     """Represents a text node in a markdown document."""
@@ -31,6 +73,9 @@ class Text(Node):
     def __str__(self) -> str:
         return self.text
 
+    def to_html(self) -> str:
+        return escape_html(unescape_markdown(self.text))
+
 
 class Emphasis(Node):
     """Represents an emphasis in a markdown document. Syntax: *text*."""
@@ -43,6 +88,9 @@ class Emphasis(Node):
     def __str__(self) -> str:
         return f"_{self.text}_"
 
+    def to_html(self) -> str:
+        return f"<em>{inline_html(self.text)}</em>"
+
 
 class Strong(Node):
     """Represents a strong emphasis in a markdown document. Syntax: **text**."""
@@ -55,33 +103,57 @@ class Strong(Node):
     def __str__(self) -> str:
         return f"**{self.text}**"
 
+    def to_html(self) -> str:
+        return f"<strong>{inline_html(self.text)}</strong>"
+
+
+def _title_attribute(title: str) -> str:
+    return f' title="{escape_html(title).replace('"', "&quot;")}"' if title else ""
+
+
+def _title_suffix(title: str) -> str:
+    return f' "{title}"' if title else ""
+
 
 class Link(Node):
-    """Represents a hyperlink in a markdown document. Syntax: [label](url)."""
+    """Represents a hyperlink in a markdown document. Syntax: [label](url "title")."""
 
-    def __init__(self, label: str, url: str):
+    def __init__(self, label: str, url: str, title: str = ""):
         assert isinstance(label, str), "Label must be a string"
         assert isinstance(url, str), "URL must be a string"
+        assert isinstance(title, str), "Title must be a string"
 
         self.label = label
         self.url = url
+        self.title = title
 
     def __str__(self) -> str:
-        return f"[{self.label}]({self.url})"
+        return f"[{self.label}]({self.url}{_title_suffix(self.title)})"
+
+    def to_html(self) -> str:
+        href = html.escape(self.url)
+        title = _title_attribute(self.title)
+        return f'<a href="{href}"{title}>{inline_html(self.label)}</a>'
 
 
 class Image(Node):
-    """Represents an image in a markdown document. Syntax: ![label](url)."""
+    """Represents an image in a markdown document. Syntax: ![label](url "title")."""
 
-    def __init__(self, label: str, url: str):
+    def __init__(self, label: str, url: str, title: str = ""):
         assert isinstance(label, str), "Label must be a string"
         assert isinstance(url, str), "URL must be a string"
+        assert isinstance(title, str), "Title must be a string"
 
         self.label = label
         self.url = url
+        self.title = title
 
     def __str__(self) -> str:
-        return f"![{self.label}]({self.url})"
+        return f"![{self.label}]({self.url}{_title_suffix(self.title)})"
+
+    def to_html(self) -> str:
+        alt, src = html.escape(self.label), html.escape(self.url)
+        return f'<img alt="{alt}" src="{src}"{_title_attribute(self.title)}>'
 
 
 class InlineCode(Node):
@@ -95,6 +167,9 @@ class InlineCode(Node):
     def __str__(self) -> str:
         return f"`{self.code}`"
 
+    def to_html(self) -> str:
+        return f"<code>{escape_html(self.code.strip())}</code>"
+
 
 class BlockCode(Node):
     """Represents a block of code in a markdown document. Syntax: ```language code```."""
@@ -109,6 +184,13 @@ class BlockCode(Node):
     def __str__(self) -> str:
         return f"```{self.language}\n{self.code}\n```"
 
+    def to_html(self) -> str:
+        code = html.escape(self.code, quote=False).replace('"', "&quot;")
+        if not self.language:
+            return f"<pre>{code}\n</pre>"
+        language = ZHIHU_LANGUAGE_ALIASES.get(self.language, self.language)
+        return f'<pre lang="{html.escape(language)}">{code}\n</pre>'
+
 
 class Header(Node):
     """Represents a header in a markdown document. Syntax: # text."""
@@ -123,6 +205,15 @@ class Header(Node):
     def __str__(self) -> str:
         return f"{'#' * self.level} {self.text}"
 
+    def to_html(self) -> str:
+        # Zhihu only supports h2 (TOC-level) and h3 (sub-section):
+        # h1 shifts up to h2, h4+ collapse to bold paragraphs.
+        content = inline_html(self.text)
+        if self.level <= 3:
+            level = max(self.level, 2)
+            return f"<h{level}>{content}</h{level}>"
+        return f"<p><strong>{content}</strong></p>"
+
 
 class List(Node):
     """Represents a list in a markdown document. Syntax: \n - item1 \n - item2."""
@@ -147,17 +238,89 @@ class List(Node):
                 result += f"{indent}{prefix}{str(item)}\n"
         return result
 
+    def to_html(self) -> str:
+        # Always a single list: Zhihu ignores start="N" on <ol>
+        tag = "ol" if self.ordered else "ul"
+        items = []
+        for item in self.items:
+            if isinstance(item, Paragraph):
+                items.append(f"<li>{item.inner_html()}</li>")
+            elif isinstance(item, ListItem):
+                items.append(item.to_html())
+            else:
+                items.append(f"<li>\n{item.to_html()}\n</li>")
+        return f"<{tag}>\n" + "\n".join(items) + f"\n</{tag}>"
+
+
+class ListItem(Node):
+    """Represents a list item holding several blocks (loose items, nested lists,
+    or content between the fragments of a split ordered list)."""
+
+    def __init__(self, children: list[Node]):
+        assert children, "List item must have at least one child"
+        assert isinstance(children, list), "Children must be a list"
+
+        self.children = children
+
+    def __str__(self) -> str:
+        first, *rest = self.children
+        text = str(first).rstrip("\n")
+        for child in rest:
+            block = str(child).rstrip("\n")
+            if isinstance(child, List):
+                text += "\n" + re.sub(r"(?m)^", "    ", block)
+            else:
+                text += "\n\n" + re.sub(r"(?m)^(?=.)", "    ", block)
+        return text
+
+    def to_html(self) -> str:
+        first, *rest = self.children
+        parts = [
+            first.inner_html() if isinstance(first, Paragraph) else first.to_html()
+        ]
+        parts.extend(child.to_html() for child in rest)
+        return "<li>" + "".join(parts) + "</li>"
+
 
 class BlockQuote(Node):
     """Represents a block quote in a markdown document. Syntax: > text."""
 
-    def __init__(self, children: Paragraph):
-        assert isinstance(children, Paragraph), "Children must be a Paragraph"
+    def __init__(self, children: Paragraph | list[Node]):
+        assert isinstance(children, (Paragraph, list)), (
+            "Children must be a Paragraph or a list of blocks"
+        )
 
         self.children = children
 
     def __str__(self) -> str:
-        return f"> {str(self.children).strip()}"
+        if isinstance(self.children, Paragraph):
+            return f"> {str(self.children).strip()}"
+        text = "\n\n".join(str(child).rstrip() for child in self.children)
+        return re.sub(r"(?m)^", "> ", text).replace("> \n", ">\n")
+
+    def to_html(self) -> str:
+        if isinstance(self.children, Paragraph):
+            return f"<blockquote>\n{self.children.to_html()}\n</blockquote>"
+        inner = "\n".join(child.to_html() for child in self.children)
+        return f"<blockquote>\n{inner}\n</blockquote>"
+
+
+class HtmlBlock(Node):
+    """Represents a raw HTML block in a markdown document. Syntax: <div>...</div>."""
+
+    def __init__(self, html: str):
+        assert isinstance(html, str), "HTML must be a string"
+
+        self.html = html
+
+    def __str__(self) -> str:
+        return self.html
+
+    def to_html(self) -> str:
+        # Passed through as is, except for code languages Zhihu doesn't know
+        return _RAW_PRE_LANG_RE.sub(
+            lambda m: f'<pre lang="{ZHIHU_LANGUAGE_ALIASES[m.group(1)]}">', self.html
+        )
 
 
 class HorizontalRule(Node):
@@ -169,16 +332,23 @@ class HorizontalRule(Node):
     def __str__(self) -> str:
         return "---"
 
+    def to_html(self) -> str:
+        return "<hr>"
+
 
 class NewLine(Node):
     """Represents a new line in a markdown document. Syntax: <br>."""
 
-    def __init__(self):
-        pass
+    def __init__(self, source_newline: bool = False):
+        # Breaks made from a source newline keep it in the HTML, as nl2br does
+        self.source_newline = source_newline
 
     def __str__(self) -> str:
         return "<br>"
 
+    def to_html(self) -> str:
+        return "<br>\n" if self.source_newline else "<br>"
+
 
 # markdown extension, see that https://blowfish.page/zh-cn/docs/shortcodes/#article
 class LinkCard(Node):
@@ -194,19 +364,39 @@ class LinkCard(Node):
     def __str__(self) -> str:
         return "{{< " + f'linkcard url="{self.url}" title="{self.label}"' + " >}}"
 
+    def to_html(self) -> str:
+        # Zhihu turns a paragraph holding a single bare link into a card
+        label = inline_html(self.label) if self.label else html.escape(self.url)
+        return f'<p><a href="{html.escape(self.url)}">{label}</a></p>'
+
 
 class Table(Node):
-    """Represents a markdown table. rows[0] is the header row."""
+    """Represents a markdown table. rows[0] is the header row; align holds
+    each column's alignment ("left", "right", "center" or "" for none)."""
 
-    def __init__(self, rows: list[list[str]]):
+    def __init__(self, rows: list[list[str]], align: list[str] | None = None):
         assert rows, "Table must have at least one row"
         self.rows = rows
+        self.align = align or []
+
+    def _column_align(self, column: int) -> str:
+        return self.align[column] if column < len(self.align) else ""
 
     def __str__(self) -> str:
         if not self.rows:
             return ""
         header = self.rows[0]
-        sep = ["-" * max(4, len(h)) for h in header]
+        sep = []
+        for column, h in enumerate(header):
+            dashes = "-" * max(4, len(h))
+            match self._column_align(column):
+                case "left":
+                    dashes = ":" + dashes[1:]
+                case "right":
+                    dashes = dashes[1:] + ":"
+                case "center":
+                    dashes = ":" + dashes[2:] + ":"
+            sep.append(dashes)
         lines = [
             "| " + " | ".join(header) + " |",
             "| " + " | ".join(sep) + " |",
@@ -215,6 +405,19 @@ class Table(Node):
             lines.append("| " + " | ".join(row) + " |")
         return "\n".join(lines)
 
+    def to_html(self) -> str:
+        # Zhihu requires all rows in a single <tbody>; header cells use <th>
+        rows = []
+        for index, row in enumerate(self.rows):
+            cell = "th" if index == 0 else "td"
+            cells = []
+            for column, text in enumerate(row):
+                align = self._column_align(column)
+                style = f' style="text-align: {align};"' if align else ""
+                cells.append(f"<{cell}{style}>{inline_html(text)}</{cell}>")
+            rows.append(f"<tr>{''.join(cells)}</tr>")
+        return f"{ZHIHU_TABLE_TAG}<tbody>" + "".join(rows) + "</tbody></table>"
+
 
 class Document:
     """Represents a markdown document."""
@@ -229,3 +432,510 @@ class Document:
 
     def dump(self):
         return "\n\n".join(str(child).rstrip() for child in self.children)
+
+    def to_html(self) -> str:
+        return "\n".join(child.to_html() for child in self.children)
+
+
+# ---------------------------------------------------------------------------
+# Reader
+# ---------------------------------------------------------------------------
+# Reads the markdown dialect used by the articles (what md_format enforces)
+# straight into the nodes above, so publishing needs no HTML round-trip.
+
+_INLINE_RE = re.compile(
+    r"(?P<escape>\\.)"
+    r"|(?P<ticks>`+)(?P<code>.+?)(?<!`)(?P=ticks)(?!`)"
+    r"|!\[(?P<image_label>[^\]]*)\]\((?P<image_url>[^)\s]+)"
+    r"(?:\s+\"(?P<image_title>[^\"]*)\")?\)"
+    r"|\[(?P<link_label>(?:[^\[\]]|\[[^\]]*\])*)\]"
+    r"\((?:<(?P<link_url_angle>[^>]*)>|(?P<link_url>(?:[^()\s]|\([^()\s]*\))*))"
+    r"(?:\s+\"(?P<link_title>[^\"]*)\")?\)"
+    r"|<(?P<autolink>https?://[^>\s]+)>"
+    r"|(?P<br><br\s*/?>)"
+    r"|(?P<html></?[A-Za-z][\w-]*(?:\s[^<>]*)?>|<!--.*?-->)"
+    r"|\*\*\*(?P<strong_em>[^*\s](?:.*?[^*\s\\])?)\*\*\*"
+    r"|(?<![\w\\])___(?P<strong_em_u>[^_\s](?:.*?[^_\s\\])?)___(?!\w)"
+    r"|\*\*(?P<strong>[^*\s](?:.*?[^\s\\])?)\*\*"
+    r"|(?<![\w\\])__(?P<strong_u>[^_\s](?:.*?[^\s\\])?)__(?!\w)"
+    # Emphasis may hold **strong** text: *a **b** c*
+    r"|\*(?P<em>[^*\s](?:\*\*.+?\*\*|.)*?(?<=[^*\s\\]))\*"
+    r"|(?<![\w\\])_(?P<em_u>[^_\s](?:.*?[^_\s\\])?)_(?!\w)",
+    re.DOTALL,
+)
+
+
+def parse_inline(text: str) -> list[Node]:
+    """Split inline markdown into nodes; everything unmatched stays Text."""
+    nodes: list[Node] = []
+    pending = ""
+    pos = 0
+    for m in _INLINE_RE.finditer(text):
+        pending += text[pos : m.start()]
+        pos = m.end()
+        kind = m.lastgroup
+        if m.group("escape") is not None:
+            pending += m.group()
+            continue
+        if pending:
+            nodes.append(Text(pending))
+            pending = ""
+        if m.group("code") is not None:
+            nodes.append(InlineCode(m.group("code")))
+        elif m.group("image_url") is not None:
+            title = m.group("image_title") or ""
+            nodes.append(Image(m.group("image_label"), m.group("image_url"), title))
+        elif m.group("link_label") is not None:
+            url = m.group("link_url_angle") or m.group("link_url")
+            title = m.group("link_title") or ""
+            nodes.append(Link(m.group("link_label"), url, title))
+        elif kind == "autolink":
+            nodes.append(Link(m.group("autolink"), m.group("autolink")))
+        elif kind == "br":
+            nodes.append(NewLine())
+        elif kind == "html":
+            nodes.append(InlineHtml(m.group(kind)))
+        elif kind in ("strong_em", "strong_em_u"):
+            # ***text*** is strong text holding emphasised text
+            marker = m.group()[0]
+            nodes.append(Strong(f"{marker}{m.group(kind)}{marker}"))
+        elif kind in ("strong", "strong_u"):
+            nodes.append(Strong(m.group(kind)))
+        else:
+            nodes.append(Emphasis(m.group(kind)))
+    pending += text[pos:]
+    if pending:
+        nodes.append(Text(pending))
+    return nodes
+
+
+def inline_html(text: str) -> str:
+    return "".join(node.to_html() for node in parse_inline(text))
+
+
+_FENCE_RE = re.compile(r"^(?P<indent> *)(?P<fence>`{3,}|~{3,})\s*(?P<lang>[\w+#.-]*)")
+_HEADER_RE = re.compile(r"^ {0,3}(?P<hashes>#{1,6})\s+(?P<text>.*?)(?:\s+#+)?\s*$")
+_HR_RE = re.compile(
+    r"^ {0,3}(?:(?:-[ ]{0,2}){3,}|(?:\*[ ]{0,2}){3,}|(?:_[ ]{0,2}){3,})$"
+)
+_LIST_ITEM_RE = re.compile(r"^(?P<indent> *)(?P<marker>[-*+]|\d+[.)])(?: +|$)")
+_SETEXT_RE = re.compile(r"^ {0,3}(?P<underline>=+|-+) *$")
+_TABLE_SEP_RE = re.compile(r"^\s*\|?\s*:?-+:?\s*(?:\|\s*:?-+:?\s*)*\|?\s*$")
+_LINKCARD_RE = re.compile(
+    r'^\s*{{<\s*linkcard\s+url="(?P<url>[^"]+)"\s+title="(?P<title>[^"]*)"\s*>}}\s*$'
+)
+# A raw HTML block opens with one of python-markdown's block-level tags
+_HTML_BLOCK_RE = re.compile(
+    r"^<(?:(?P<tag>address|article|aside|blockquote|center|details|dialog|dd|div|dl"
+    r"|dt|fieldset|figcaption|figure|footer|form|h[1-6]|header|hgroup|hr|iframe|li"
+    r"|main|math|nav|noscript|ol|p|pre|script|section|style|summary|table|tbody|td"
+    r"|tfoot|th|thead|tr|ul|video)(?=[\s/>]|$)|!--)",
+    re.IGNORECASE,
+)
+_RAW_PRE_LANG_RE = re.compile(
+    '<pre lang="(' + "|".join(map(re.escape, ZHIHU_LANGUAGE_ALIASES)) + ')">'
+)
+_LINK_DEFINITION_RE = re.compile(
+    r"^ {0,3}\[(?P<id>[^\]]+)\]:\s*<?(?P<url>[^\s>]+)>?"
+    r"(?:\s+(?:\"(?P<title>[^\"]*)\"|'(?P<title_single>[^']*)'"
+    r"|\((?P<title_paren>[^)]*)\)))?\s*$"
+)
+_REFERENCE_RE = re.compile(
+    r"(?<!\\)(?P<bang>!?)\[(?P<label>(?:[^\[\]]|\[[^\]]*\])*)\]"
+    r"(?: ?\[(?P<id>[^\]]*)\])?(?P<next>[(:]?)"
+)
+_CODE_SPAN_RE = re.compile(r"(`+).+?(?<!`)\1(?!`)")
+# A "N. " / "N、" number prefix, e.g. in **3. Title** between list fragments
+_NUMBER_PREFIX_RE = r"^\s*{num}\s*[\.、]\s*"
+
+
+def _indent_width(line: str) -> int:
+    return len(line) - len(line.lstrip(" "))
+
+
+def _starts_block(line: str) -> bool:
+    """Whether `line` interrupts a running paragraph."""
+    return bool(
+        _FENCE_RE.match(line)
+        or _HEADER_RE.match(line)
+        or _HR_RE.match(line.rstrip())
+        or _LINKCARD_RE.match(line)
+        or line.lstrip().startswith(">")
+        or re.match(r"^ *(?:[-*+]|1[.)]) +\S", line)
+    )
+
+
+_TABLE_CELL_RE = re.compile(r"((?:`[^`]*`|\\.|[^|`\\]|`)*)(\|?)")
+
+
+def _table_cells(line: str) -> list[str]:
+    """Split a table row on pipes outside code spans and escapes."""
+    line = line.strip().removeprefix("|")
+    cells = []
+    for m in _TABLE_CELL_RE.finditer(line):
+        if m.group(2) or m.group(1).strip():
+            cells.append(m.group(1).strip())
+        if not m.group(2):
+            break
+    return cells
+
+
+def _read_html_block(lines: list[str], i: int) -> tuple[HtmlBlock, int]:
+    """Read a raw HTML block starting at lines[i], up to its closing tag."""
+    tag = _HTML_BLOCK_RE.match(lines[i]).group("tag")
+    tag_re = re.compile(rf"<(/?){tag}(?=[\s/>])[^>]*?(/?)>", re.IGNORECASE)
+    start = i
+    depth = 0
+    while i < len(lines):
+        line = lines[i]
+        i += 1
+        if tag is None:
+            if "-->" in line:
+                break
+            continue
+        for m in tag_re.finditer(line):
+            if m.group(1):
+                depth -= 1
+            elif not m.group(2) and tag.lower() != "hr":
+                depth += 1
+        if depth <= 0:
+            break
+    return HtmlBlock("\n".join(lines[start:i])), i
+
+
+def _reference_key(name: str) -> str:
+    return " ".join(name.split()).lower()
+
+
+def _fence_mask(lines: list[str]) -> list[bool]:
+    """Whether each line belongs to a fenced code block."""
+    mask = []
+    marker = ""
+    for line in lines:
+        if marker:
+            mask.append(True)
+            closing = line.strip()
+            if closing.startswith(marker) and not closing.strip(marker[0]):
+                marker = ""
+        elif fence := _FENCE_RE.match(line):
+            mask.append(True)
+            marker = fence.group("fence")
+        else:
+            mask.append(False)
+    return mask
+
+
+def _resolve_references(lines: list[str]) -> list[str]:
+    """Drop link reference definitions and turn [text][id], [text][] and [id]
+    references to them into inline links, as python-markdown resolves them."""
+    in_code = _fence_mask(lines)
+    # Reference key → inline link target: url, plus "title" when it has one
+    urls: dict[str, str] = {}
+    kept: list[tuple[str, bool]] = []
+    for line, code in zip(lines, in_code, strict=True):
+        if not code and (definition := _LINK_DEFINITION_RE.match(line)):
+            title = (
+                definition["title"]
+                or definition["title_single"]
+                or definition["title_paren"]
+                or ""
+            )
+            target = definition["url"] + _title_suffix(title.replace('"', "&quot;"))
+            urls.setdefault(_reference_key(definition.group("id")), target)
+        else:
+            kept.append((line, code))
+    if not urls:
+        return lines
+
+    def resolve(m: re.Match) -> str:
+        if m.group("id") is None and m.group("next"):
+            # An inline link [text](url), or text followed by a colon
+            return m.group()
+        url = urls.get(_reference_key(m.group("id") or m.group("label")))
+        if url is None:
+            return m.group()
+        return f"{m.group('bang')}[{m.group('label')}]({url}){m.group('next')}"
+
+    def resolve_line(line: str) -> str:
+        # Leave code spans alone
+        parts = []
+        pos = 0
+        for code in _CODE_SPAN_RE.finditer(line):
+            parts.append(_REFERENCE_RE.sub(resolve, line[pos : code.start()]))
+            parts.append(code.group())
+            pos = code.end()
+        parts.append(_REFERENCE_RE.sub(resolve, line[pos:]))
+        return "".join(parts)
+
+    return [line if code else resolve_line(line) for line, code in kept]
+
+
+def _column_alignments(separator: str) -> list[str]:
+    """Column alignments from a table separator row such as |:--|--:|:-:|."""
+    alignments = []
+    for cell in _table_cells(separator):
+        left, right = cell.startswith(":"), cell.endswith(":")
+        alignments.append(
+            "center" if left and right else "left" if left else "right" if right else ""
+        )
+    return alignments
+
+
+def _paragraph(lines: list[str]) -> Paragraph:
+    children: list[Node] = []
+    for index, line in enumerate(lines):
+        if index:
+            # Every source newline is a hard break, as with the nl2br extension
+            children.append(NewLine(source_newline=True))
+        children.extend(parse_inline(line.strip()))
+    return Paragraph(children)
+
+
+def _read_list_item(lines: list[str], i: int, indent: int) -> tuple[list[str], int]:
+    """Collect the lines of the item starting at lines[i], dedented."""
+    m = _LIST_ITEM_RE.match(lines[i])
+    content_indent = m.end() if lines[i][m.end() :].strip() else indent + 2
+    body = [lines[i][m.end() :]]
+    i += 1
+    while i < len(lines):
+        line = lines[i]
+        if not line.strip():
+            j = i
+            while j < len(lines) and not lines[j].strip():
+                j += 1
+            if j == len(lines) or _indent_width(lines[j]) <= indent:
+                break
+            body.extend([""] * (j - i))
+            i = j
+            continue
+        width = _indent_width(line)
+        if width > indent:
+            body.append(line[min(width, content_indent) :])
+        elif body[-1].strip() and not _LIST_ITEM_RE.match(line):
+            if _starts_block(line):
+                break
+            # Lazy continuation of the item's paragraph
+            body.append(line)
+        else:
+            break
+        i += 1
+    return body, i
+
+
+def _read_list(lines: list[str], i: int) -> tuple[List, int, int]:
+    """Read one list starting at lines[i]; returns (list, start number, next i)."""
+    first = _LIST_ITEM_RE.match(lines[i])
+    indent = len(first.group("indent"))
+    ordered = first.group("marker")[0].isdigit()
+    start = int(first.group("marker")[:-1]) if ordered else 0
+    items: list[Node] = []
+    while i < len(lines):
+        m = _LIST_ITEM_RE.match(lines[i])
+        if (
+            m is None
+            or len(m.group("indent")) != indent
+            or m.group("marker")[0].isdigit() != ordered
+            or (not ordered and _HR_RE.match(lines[i].rstrip()))
+        ):
+            break
+        body, i = _read_list_item(lines, i, indent)
+        blocks = _parse_blocks(body)
+        if len(blocks) == 1 and isinstance(blocks[0], (Paragraph, List)):
+            items.append(blocks[0])
+        else:
+            items.append(ListItem(blocks or [Paragraph([])]))
+        # Blank lines between items keep the list going
+        j = i
+        while j < len(lines) and not lines[j].strip():
+            j += 1
+        if j < len(lines) and _LIST_ITEM_RE.match(lines[j]):
+            i = j
+    return List(ordered, items), start, i
+
+
+def _promote_numbered_paragraph(node: Node, number: int) -> bool:
+    """Strip a leading "N." from a paragraph standing in for list item N."""
+    if not isinstance(node, Paragraph) or not node.children:
+        return False
+    plain = re.sub(r"[*_`]", "", str(node))
+    pattern = _NUMBER_PREFIX_RE.format(num=number)
+    if not re.match(pattern, plain):
+        return False
+    first = node.children[0]
+    if isinstance(first, (Text, Strong, Emphasis)):
+        first.text = re.sub(pattern, "", first.text)
+    return True
+
+
+def _merge_list_fragment(
+    previous: List, between: list[Node], fragment: List, start: int
+) -> None:
+    """Fold an ordered-list fragment (and the blocks before it) into `previous`.
+
+    Zhihu renumbers every <ol> from 1, so a list split by unindented content
+    is published as one list with the intermediate blocks inside its items.
+    When `start` skips numbers, paragraphs reading "N. ..." in the gap become
+    the missing items.
+    """
+
+    def append_to_last(node: Node) -> None:
+        last = previous.items[-1]
+        if not isinstance(last, ListItem):
+            last = previous.items[-1] = ListItem([last])
+        last.children.append(node)
+
+    missing = start - len(previous.items) - 1
+    for node in between:
+        if missing > 0 and _promote_numbered_paragraph(node, len(previous.items) + 1):
+            previous.items.append(node)
+            missing -= 1
+        else:
+            append_to_last(node)
+    previous.items.extend(fragment.items)
+
+
+def _parse_blocks(lines: list[str]) -> list[Node]:
+    blocks: list[Node] = []
+    # Last ordered list at this level and the blocks seen since, so that a
+    # continuation fragment (start > 1) can be merged back into it.
+    open_list: List | None = None
+    between: list[Node] = []
+
+    def emit(node: Node) -> None:
+        if open_list is not None:
+            between.append(node)
+        else:
+            blocks.append(node)
+
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        stripped = line.strip()
+        if not stripped:
+            i += 1
+            continue
+
+        if _indent_width(line) >= 4:
+            # Indented code: runs over blank lines up to the next line
+            # indented less than four spaces
+            code = []
+            while i < len(lines) and (
+                not lines[i].strip() or _indent_width(lines[i]) >= 4
+            ):
+                code.append(lines[i][4:])
+                i += 1
+            while not code[-1].strip():
+                code.pop()
+            emit(BlockCode("\n".join(code), ""))
+            continue
+
+        if fence := _FENCE_RE.match(line):
+            indent = len(fence.group("indent"))
+            marker = fence.group("fence")
+            code = []
+            i += 1
+            while i < len(lines):
+                closing = lines[i].strip()
+                if closing.startswith(marker) and not closing.strip(marker[0]):
+                    i += 1
+                    break
+                code.append(lines[i][min(indent, _indent_width(lines[i])) :])
+                i += 1
+            emit(BlockCode("\n".join(code), fence.group("lang")))
+            continue
+
+        if _HTML_BLOCK_RE.match(line):
+            node, i = _read_html_block(lines, i)
+            emit(node)
+            continue
+
+        if header := _HEADER_RE.match(line):
+            emit(Header(len(header.group("hashes")), header.group("text")))
+            i += 1
+            continue
+
+        if card := _LINKCARD_RE.match(line):
+            emit(LinkCard(card.group("title"), card.group("url")))
+            i += 1
+            continue
+
+        if _HR_RE.match(line.rstrip()):
+            emit(HorizontalRule())
+            i += 1
+            continue
+
+        if (
+            "|" in line
+            and i + 1 < len(lines)
+            and "|" in lines[i + 1]
+            and _TABLE_SEP_RE.match(lines[i + 1])
+        ):
+            rows = [_table_cells(line)]
+            alignments = _column_alignments(lines[i + 1])
+            i += 2
+            while i < len(lines) and lines[i].strip() and "|" in lines[i]:
+                rows.append(_table_cells(lines[i]))
+                i += 1
+            emit(Table(rows, alignments if any(alignments) else None))
+            continue
+
+        if stripped.startswith(">"):
+            # The quote runs to the next blank line; lines without ">" are
+            # lazy continuations, as in python-markdown
+            quoted: list[str] = []
+            while i < len(lines) and lines[i].strip():
+                quoted.append(re.sub(r"^\s*> ?", "", lines[i]))
+                i += 1
+            children = _parse_blocks(quoted)
+            if len(children) == 1 and isinstance(children[0], Paragraph):
+                emit(BlockQuote(children[0]))
+            elif children:
+                emit(BlockQuote(children))
+            continue
+
+        if _LIST_ITEM_RE.match(line):
+            node, start, i = _read_list(lines, i)
+            if node.ordered and start > 1 and open_list is not None:
+                _merge_list_fragment(open_list, between, node, start)
+                between = []
+                continue
+            if not node.ordered:
+                emit(node)
+                continue
+            blocks.extend(between)
+            between = []
+            blocks.append(node)
+            open_list = node
+            continue
+
+        paragraph = [line]
+        i += 1
+        while (
+            i < len(lines)
+            and lines[i].strip()
+            and not (len(paragraph) == 1 and _SETEXT_RE.match(lines[i]))
+            and not _starts_block(lines[i])
+        ):
+            paragraph.append(lines[i])
+            i += 1
+        # A setext underline only makes a heading of the first line of a
+        # block; further down, "---" is a rule and "===" is plain text
+        if (
+            len(paragraph) == 1
+            and i < len(lines)
+            and (setext := _SETEXT_RE.match(lines[i]))
+        ):
+            level = 1 if setext.group("underline")[0] == "=" else 2
+            emit(Header(level, line.strip()))
+            i += 1
+            continue
+        emit(_paragraph(paragraph))
+
+    blocks.extend(between)
+    return blocks
+
+
+def parse(markdown_text: str) -> Document:
+    """Parse an article body (front matter already stripped) into a Document."""
+    lines = _resolve_references(markdown_text.expandtabs(4).splitlines())
+    return Document(_parse_blocks(lines))
@@ -3,21 +3,37 @@
 Chinese Markdown formatter / linter.
 
 Usage:
-  uv run python scripts/md_format.py [--fix] [files ...]
+  uv run python scripts/md_format.py [--fix | --diff | --edits] [--check-idempotent] [files ...]
   uv run python scripts/md_format.py [--fix]          # all zh-cn articles
 
 Modes:
   (default)  lint: report violations, exit 1 if any found
   --fix      fix:  auto-fix safe violations in-place, report lint-only issues
+  --diff     print a unified diff of the fixes to stdout, write nothing
+  --edits    print the fixes as JSON lines (path, line, start, end,
+             replacement; 1-based line, 0-based columns), write nothing
+
+In --diff / --edits mode the report goes to stderr.
+
+Fixes are re-applied per line until the line stops changing, so a single
+--fix run always reaches the final result.
+  --check-idempotent  also verify that formatting the fixed output is a no-op
 """
 
 from __future__ import annotations
 
 import argparse
+import difflib
+import json
+import os
 import re
+import shutil
 import sys
+import tempfile
+from collections.abc import Iterable, Iterator
 from dataclasses import dataclass, field
 from pathlib import Path
+from typing import TextIO
 
 # ---------------------------------------------------------------------------
 # Constants
@@ -511,8 +527,257 @@ def lint_code_block_lang(fence: str, lno: int) -> list[Issue]:
     return []
 
 
+# ---------------------------------------------------------------------------
+# Per-line rule chain
+# ---------------------------------------------------------------------------
+
+# Upper bound on fix passes per line. Real lines converge in two or three
+# passes; hitting the bound means two rules are undoing each other.
+MAX_FIX_PASSES = 8
+
+
+def fix_line(line: str, lno: int) -> tuple[str, list[Issue]]:
+    """Run every line-level rule once over a prose line."""
+    issues: list[Issue] = []
+
+    # Heading
+    if re.match(r"^#{1,6}\s", line) or re.match(r"^#{1,6}[^\s#]", line):
+        line, iss = fix_heading_space(line, lno)
+        issues.extend(iss)
+
+    # List marker — exclude ** and __ (bold markers)
+    if (
+        re.match(r"^\s*[-+]\S", line)
+        or re.match(r"^\s*\*(?!\*)\S", line)
+        or re.match(r"^\s*\d+\.\S", line)
+    ):
+        line, iss = fix_list_space(line, lno)
+        issues.extend(iss)
+
+    # Full-width → half-width (always fixable, apply early)
+    line, iss = fix_fullwidth(line, lno)
+    issues.extend(iss)
+
+    # Tokenise inline spans
+    spans = tokenise(line)
+
+    # Apply spacing fix at span boundaries
+    spans, iss = fix_spacing_boundary(spans, lno)
+    issues.extend(iss)
+
+    # Apply text-level fixes to each "text", link inner, image inner
+    new_spans: list[Span] = []
+    for span in spans:
+        if span.kind == "text":
+            t, iss = fix_spacing_text(span.text, lno)
+            issues.extend(iss)
+            t, iss = fix_nouns(t, lno)
+            issues.extend(iss)
+            t, iss = fix_typos(t, lno)
+            issues.extend(iss)
+            t, iss = fix_ellipsis_dash(t, lno)
+            issues.extend(iss)
+            t, iss = fix_dup_punct(t, lno)
+            issues.extend(iss)
+            t, iss = fix_number_unit(t, lno)
+            issues.extend(iss)
+            t, iss = fix_quotes(t, lno)
+            issues.extend(iss)
+            issues.extend(lint_punct_ascii(t, lno))
+            new_spans.append(Span("text", t))
+        elif span.kind in ("link", "image"):
+            # Fix the inner label text, but skip if the label is itself a URL
+            inner = span.inner
+            if not inner.startswith(("http://", "https://")):
+                inner, iss = fix_spacing_text(inner, lno)
+                issues.extend(iss)
+                inner, iss = fix_nouns(inner, lno)
+                issues.extend(iss)
+            # Rebuild the span text with fixed inner
+            if span.kind == "link":
+                # [label](url) — replace label part
+                new_text = re.sub(
+                    r"^\[([^\]]*)\]",
+                    "[" + inner.replace("\\", "\\\\") + "]",
+                    span.text,
+                    count=1,
+                )
+            else:
+                new_text = re.sub(
+                    r"^!\[([^\]]*)\]",
+                    "![" + inner.replace("\\", "\\\\") + "]",
+                    span.text,
+                    count=1,
+                )
+            new_spans.append(Span(span.kind, new_text, inner=inner))
+        else:
+            new_spans.append(span)
+
+    return "".join(s.text for s in new_spans), issues
+
+
+def fix_line_fixpoint(line: str, lno: int) -> tuple[str, list[Issue]]:
+    """
+    Re-run fix_line until the line stops changing.
+    Some fixes expose new violations (e.g. fix_fullwidth creating a CJK↔ASCII
+    boundary), so a single pass is not always enough. Fixable issues are
+    collected from every pass that changed the line; lint-only issues are
+    taken from the converged pass so they are reported once.
+    """
+    issues: list[Issue] = []
+    for attempt in range(MAX_FIX_PASSES):
+        fixed, iss = fix_line(line, lno)
+        if fixed == line:
+            issues.extend(iss if attempt == 0 else [i for i in iss if not i.fixable])
+            return line, issues
+        issues.extend(i for i in iss if i.fixable)
+        line = fixed
+    issues.append(
+        Issue(
+            lno,
+            "fixpoint",
+            f"自动修复在 {MAX_FIX_PASSES} 轮内未收敛",
+            fixable=False,
+        )
+    )
+    return line, issues
+
+
+# ---------------------------------------------------------------------------
+# Edits
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class Edit:
+    """Replace source line `line_no` (1-based) columns [start, end) with
+    `replacement`. Columns are 0-based str indices and may cover the line
+    ending, so deleting a whole line is Edit(n, 0, len(line), "")."""
+
+    line_no: int
+    start: int
+    end: int
+    replacement: str
+
+
+def line_edits(lno: int, old: str, new: str) -> list[Edit]:
+    """Minimal column-range edits turning one source line into its fixed form."""
+    matcher = difflib.SequenceMatcher(None, old, new, autojunk=False)
+    return [
+        Edit(lno, i1, i2, new[j1:j2])
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes()
+        if tag != "equal"
+    ]
+
+
+def apply_edits(lines: Iterable[str], edits: list[Edit]) -> Iterator[str]:
+    """Apply a sorted edit list to a line stream in a single pass."""
+    pending = iter(edits)
+    edit = next(pending, None)
+    for lno, line in enumerate(lines, start=1):
+        for_line: list[Edit] = []
+        while edit is not None and edit.line_no == lno:
+            for_line.append(edit)
+            edit = next(pending, None)
+        for e in reversed(for_line):
+            line = line[: e.start] + e.replacement + line[e.end :]
+        if line:
+            yield line
+
+
+def _diff_range(start: int, length: int) -> str:
+    # Same convention as difflib.unified_diff
+    if length == 1:
+        return str(start)
+    if not length:
+        start -= 1
+    return f"{start},{length}"
+
+
+def unified_diff(
+    path: Path, lines: Iterable[str], edits: list[Edit], context: int = 3
+) -> Iterator[str]:
+    """
+    Stream a unified diff of `lines` with `edits` applied. Only the lines of
+    the hunk being emitted are buffered.
+    """
+    changed = sorted({e.line_no for e in edits})
+    if not changed:
+        return
+
+    # Old-side line ranges of each hunk, merged when their context overlaps
+    hunks: list[list[int]] = []
+    for lno in changed:
+        if hunks and lno - context <= hunks[-1][1] + 1:
+            hunks[-1][1] = lno + context
+        else:
+            hunks.append([max(1, lno - context), lno + context])
+
+    yield f"--- {path}\n"
+    yield f"+++ {path}\n"
+
+    by_line: dict[int, list[Edit]] = {}
+    for e in edits:
+        by_line.setdefault(e.line_no, []).append(e)
+
+    def emit(hunk: list[tuple[str, str]], old_start: int, new_start: int):
+        old_len = len(hunk)
+        new_len = sum(1 for _, new in hunk if new)
+        yield (
+            f"@@ -{_diff_range(old_start, old_len)} "
+            f"+{_diff_range(new_start, new_len)} @@\n"
+        )
+        i = 0
+        while i < len(hunk):
+            old, new = hunk[i]
+            if old == new:
+                yield " " + old
+                i += 1
+                continue
+            j = i
+            while j < len(hunk) and hunk[j][0] != hunk[j][1]:
+                j += 1
+            for old, _ in hunk[i:j]:
+                yield "-" + old
+                if not old.endswith("\n"):
+                    yield "\n\\ No newline at end of file\n"
+            for _, new in hunk[i:j]:
+                if new:
+                    yield "+" + new
+            i = j
+
+    hunk_iter = iter(hunks)
+    current = next(hunk_iter)
+    buffer: list[tuple[str, str]] = []
+    offset = 0  # new line number minus old line number
+    hunk_offset = 0
+    for lno, old in enumerate(lines, start=1):
+        if current is None:
+            break
+        new = old
+        for e in reversed(by_line.get(lno, [])):
+            new = new[: e.start] + e.replacement + new[e.end :]
+        if lno == current[0]:
+            hunk_offset = offset
+        if current[0] <= lno <= current[1]:
+            buffer.append((old, new))
+        if not new:
+            offset -= 1
+        if lno == current[1]:
+            yield from emit(buffer, current[0], current[0] + hunk_offset)
+            buffer = []
+            current = next(hunk_iter, None)
+    if buffer and current is not None:
+        yield from emit(buffer, current[0], current[0] + hunk_offset)
+
+
 # ---------------------------------------------------------------------------
 # Process a single file
+#
+# Processing is a generator pipeline so memory stays flat in file size:
+#   read_lines → format_lines → compress_blank_lines → edit list
+# The edit list is then applied in one pass (--fix), rendered as a unified
+# diff (--diff) or printed as JSON (--edits).
 # ---------------------------------------------------------------------------
 
 
@@ -520,41 +785,46 @@ def lint_code_block_lang(fence: str, lno: int) -> list[Issue]:
 class FileResult:
     path: Path
     issues: list[Issue] = field(default_factory=list)
-    fixed_lines: list[str] | None = None  # None in lint-only mode
+    edits: list[Edit] = field(default_factory=list)
 
+    @property
+    def changed(self) -> bool:
+        return bool(self.edits)
+
+
+def read_lines(path: Path) -> Iterator[str]:
+    with path.open(encoding="utf-8") as f:
+        yield from f
 
-def process_file(path: Path, fix: bool) -> FileResult:
-    source = path.read_text(encoding="utf-8")
-    lines = source.splitlines(keepends=True)
-    result = FileResult(path=path)
-    out_lines: list[str] = []
 
+def format_lines(
+    lines: Iterable[str], result: FileResult
+) -> Iterator[tuple[int, str, str]]:
+    """
+    Run the block-state machine and rule chain, one source line at a time.
+    Yields (line_no, source_line, formatted_line).
+    """
     in_frontmatter = False
-    frontmatter_done = False
     in_code_block = False
     code_fence: str = ""
 
     for lno, raw_line in enumerate(lines, start=1):
         line = raw_line.rstrip("\n").rstrip("\r")
         suffix = raw_line[len(line) :]  # original line ending
+        fence_m = re.match(r"^(`{3,}|~{3,})", line)
 
         # ---- Block-level state ----
 
-        # Frontmatter
         if lno == 1 and line.strip() == "---":
+            # Frontmatter
             in_frontmatter = True
-            out_lines.append(raw_line)
-            continue
-        if in_frontmatter:
+            out = raw_line
+        elif in_frontmatter:
             if line.strip() == "---":
                 in_frontmatter = False
-                frontmatter_done = True
-            out_lines.append(raw_line)
-            continue
-
-        # Fenced code block
-        fence_m = re.match(r"^(`{3,}|~{3,})", line)
-        if fence_m:
+            out = raw_line
+        elif fence_m:
+            # Fenced code block
             if not in_code_block:
                 in_code_block = True
                 code_fence = fence_m.group(1)
@@ -562,116 +832,95 @@ def process_file(path: Path, fix: bool) -> FileResult:
             elif line.startswith(code_fence):
                 in_code_block = False
                 code_fence = ""
-            out_lines.append(raw_line)
-            continue
-
-        if in_code_block:
-            out_lines.append(raw_line)
-            continue
-
-        # ---- Line-level transformations ----
-
-        # Heading
-        if re.match(r"^#{1,6}\s", line) or re.match(r"^#{1,6}[^\s#]", line):
-            line, iss = fix_heading_space(line, lno)
+            out = raw_line
+        elif in_code_block:
+            out = raw_line
+        else:
+            # ---- Line-level transformations ----
+            line, iss = fix_line_fixpoint(line, lno)
             result.issues.extend(iss)
+            out = line + suffix
 
-        # List marker — exclude ** and __ (bold markers)
-        if (
-            re.match(r"^\s*[-+]\S", line)
-            or re.match(r"^\s*\*(?!\*)\S", line)
-            or re.match(r"^\s*\d+\.\S", line)
-        ):
-            line, iss = fix_list_space(line, lno)
-            result.issues.extend(iss)
+        # File-level: EOF newline (only the last line can lack one)
+        if not out.endswith("\n"):
+            result.issues.append(
+                Issue(lno, "structure", "文件末尾缺少换行符", fixable=True)
+            )
+            out += "\n"
 
-        # Full-width → half-width (always fixable, apply early)
-        line, iss = fix_fullwidth(line, lno)
-        result.issues.extend(iss)
-
-        # Tokenise inline spans
-        spans = tokenise(line)
-
-        # Apply spacing fix at span boundaries
-        spans, iss = fix_spacing_boundary(spans, lno)
-        result.issues.extend(iss)
-
-        # Apply text-level fixes to each "text", link inner, image inner
-        new_spans: list[Span] = []
-        for span in spans:
-            if span.kind == "text":
-                t, iss = fix_spacing_text(span.text, lno)
-                result.issues.extend(iss)
-                t, iss = fix_nouns(t, lno)
-                result.issues.extend(iss)
-                t, iss = fix_typos(t, lno)
-                result.issues.extend(iss)
-                t, iss = fix_ellipsis_dash(t, lno)
-                result.issues.extend(iss)
-                t, iss = fix_dup_punct(t, lno)
-                result.issues.extend(iss)
-                t, iss = fix_number_unit(t, lno)
-                result.issues.extend(iss)
-                t, iss = fix_quotes(t, lno)
-                result.issues.extend(iss)
-                result.issues.extend(lint_punct_ascii(t, lno))
-                new_spans.append(Span("text", t))
-            elif span.kind in ("link", "image"):
-                # Fix the inner label text, but skip if the label is itself a URL
-                inner = span.inner
-                if not inner.startswith(("http://", "https://")):
-                    inner, iss = fix_spacing_text(inner, lno)
-                    result.issues.extend(iss)
-                    inner, iss = fix_nouns(inner, lno)
-                    result.issues.extend(iss)
-                # Rebuild the span text with fixed inner
-                if span.kind == "link":
-                    # [label](url) — replace label part
-                    new_text = re.sub(
-                        r"^\[([^\]]*)\]",
-                        "[" + inner.replace("\\", "\\\\") + "]",
-                        span.text,
-                        count=1,
-                    )
-                else:
-                    new_text = re.sub(
-                        r"^!\[([^\]]*)\]",
-                        "![" + inner.replace("\\", "\\\\") + "]",
-                        span.text,
-                        count=1,
-                    )
-                new_spans.append(Span(span.kind, new_text, inner=inner))
-            else:
-                new_spans.append(span)
+        yield lno, raw_line, out
 
-        line = "".join(s.text for s in new_spans)
-        out_lines.append(line + suffix)
 
-    # File-level: EOF newline
-    if out_lines and not out_lines[-1].endswith("\n"):
-        result.issues.append(
-            Issue(len(lines), "structure", "文件末尾缺少换行符", fixable=True)
-        )
-        out_lines[-1] = out_lines[-1] + "\n"
-
-    # Consecutive blank lines
-    compressed: list[str] = []
+def compress_blank_lines(
+    lines: Iterable[tuple[int, str, str]], result: FileResult
+) -> Iterator[tuple[int, str, str]]:
+    """Collapse runs of blank lines into one; dropped lines come out empty."""
     blank_count = 0
-    for raw in out_lines:
-        if raw.strip() == "":
+    for lno, raw, out in lines:
+        if out.strip() == "":
             blank_count += 1
             if blank_count > 1:
                 result.issues.append(
                     Issue(0, "structure", "连续空行已压缩", fixable=True)
                 )
-                continue
+                out = ""
         else:
             blank_count = 0
-        compressed.append(raw)
+        yield lno, raw, out
+
+
+def collect_edits(lines: Iterable[str], result: FileResult) -> None:
+    for lno, raw, out in compress_blank_lines(format_lines(lines, result), result):
+        if out != raw:
+            result.edits.extend(line_edits(lno, raw, out))
+
 
-    if fix:
-        result.fixed_lines = compressed
+def write_temp_lines(path: Path, lines: Iterable[str]) -> Path:
+    """Stream lines into a temp file next to path (same filesystem as path)."""
+    fd, tmp_name = tempfile.mkstemp(
+        prefix=f".{path.name}.", suffix=".tmp", dir=path.parent
+    )
+    tmp_path = Path(tmp_name)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.writelines(lines)
+        shutil.copymode(path, tmp_path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    return tmp_path
+
+
+def verify_idempotent(fixed_path: Path, result: FileResult) -> None:
+    """
+    Re-run the formatter over already-fixed output and record a lint-only
+    issue if the second pass would change anything.
+    """
+    second = FileResult(path=result.path)
+    collect_edits(read_lines(fixed_path), second)
+    if second.changed:
+        lines = sorted({e.line_no for e in second.edits})
+        where = f"（行 {', '.join(map(str, lines[:5]))}）"
+        result.issues.append(
+            Issue(0, "idempotent", f"二次修复仍有改动{where}", fixable=False)
+        )
 
+
+def process_file(path: Path, fix: bool, check_idempotent: bool = False) -> FileResult:
+    result = FileResult(path=path)
+    collect_edits(read_lines(path), result)
+
+    if not result.changed or not (fix or check_idempotent):
+        return result
+
+    tmp_path = write_temp_lines(path, apply_edits(read_lines(path), result.edits))
+    try:
+        if check_idempotent:
+            verify_idempotent(tmp_path, result)
+        if fix:
+            os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
     return result
 
 
@@ -687,33 +936,35 @@ CYAN = "\033[36m"
 BOLD = "\033[1m"
 
 
-def report(results: list[FileResult], fix: bool) -> None:
+def report(results: list[FileResult], fix: bool, file: TextIO = sys.stdout) -> None:
     total_issues = sum(len(r.issues) for r in results)
     fixable = sum(sum(1 for i in r.issues if i.fixable) for r in results)
     lint_only = total_issues - fixable
 
-    print(f"\n{BOLD}=== md_format ==={RESET}")
+    print(f"\n{BOLD}=== md_format ==={RESET}", file=file)
     mode = "fix" if fix else "lint"
     print(
         f"Mode: {mode}  Files: {len(results)}  Issues: {total_issues}  "
-        f"(auto-fixed: {fixable if fix else 0}  lint-only: {lint_only})\n"
+        f"(auto-fixed: {fixable if fix else 0}  lint-only: {lint_only})\n",
+        file=file,
     )
 
     for r in results:
         if not r.issues:
-            print(f"{GREEN}✓{RESET} {r.path}")
+            print(f"{GREEN}✓{RESET} {r.path}", file=file)
             continue
         fixable_count = sum(1 for i in r.issues if i.fixable)
         lintonly_count = len(r.issues) - fixable_count
         print(
             f"{RED}✗{RESET} {r.path}  "
-            f"({fixable_count} fixable, {lintonly_count} lint-only)"
+            f"({fixable_count} fixable, {lintonly_count} lint-only)",
+            file=file,
         )
         for issue in r.issues:
             color = YELLOW if not issue.fixable else (GREEN if fix else RED)
             tag = f"[{issue.rule}]"
             ln = f":{issue.line_no}" if issue.line_no else ""
-            print(f"  {color}{tag}{RESET}{ln} {issue.message}")
+            print(f"  {color}{tag}{RESET}{ln} {issue.message}", file=file)
 
 
 # ---------------------------------------------------------------------------
@@ -723,9 +974,21 @@ def report(results: list[FileResult], fix: bool) -> None:
 
 def build_parser() -> argparse.ArgumentParser:
     p = argparse.ArgumentParser(description=__doc__)
-    p.add_argument(
+    mode = p.add_mutually_exclusive_group()
+    mode.add_argument(
         "--fix", action="store_true", help="Auto-fix safe violations in-place"
     )
+    mode.add_argument(
+        "--diff", action="store_true", help="Print fixes as a unified diff"
+    )
+    mode.add_argument(
+        "--edits", action="store_true", help="Print fixes as JSON-lines edits"
+    )
+    p.add_argument(
+        "--check-idempotent",
+        action="store_true",
+        help="Fail if running the fixer over its own output would change it",
+    )
     p.add_argument(
         "files", nargs="*", help="Markdown files to check (default: all zh-cn articles)"
     )
@@ -746,12 +1009,28 @@ def main() -> None:
 
     results: list[FileResult] = []
     for path in paths:
-        result = process_file(path, fix=args.fix)
+        result = process_file(
+            path, fix=args.fix, check_idempotent=args.check_idempotent
+        )
         results.append(result)
-        if args.fix and result.fixed_lines is not None:
-            path.write_text("".join(result.fixed_lines), encoding="utf-8")
-
-    report(results, fix=args.fix)
+        if args.diff:
+            sys.stdout.writelines(unified_diff(path, read_lines(path), result.edits))
+        elif args.edits:
+            for e in result.edits:
+                record = {
+                    "path": str(path),
+                    "line": e.line_no,
+                    "start": e.start,
+                    "end": e.end,
+                    "replacement": e.replacement,
+                }
+                print(json.dumps(record, ensure_ascii=False))
+
+    report(
+        results,
+        fix=args.fix,
+        file=sys.stderr if args.diff or args.edits else sys.stdout,
+    )
 
     lint_only_issues = sum(sum(1 for i in r.issues if not i.fixable) for r in results)
     if lint_only_issues > 0 or (not args.fix and any(r.issues for r in results)):
@@ -0,0 +1,105 @@
+"""
+Benchmark the shared round-trip normaliser against the old per-line path.
+
+The reference below is the per-line implementation zhihu_roundtrip_check used
+before zhihu_normalise existed: a nested callback and uncompiled re.sub calls
+for every line. Both paths run over every article and test document (raw and
+through the offline preview round-trip); their output must be identical.
+
+Usage:
+  uv run python scripts/tests/bench_normalise.py [--repeat N]
+"""
+
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+from zhihu_client import markdown_to_html, read_markdown_document
+from zhihu_normalise import apply_norms, normalise_lines
+from zhihu_parser import Parser
+from zhihu_simulator import simulate_preview
+
+REPO_ROOT = SCRIPTS_DIR.parent
+CORPUS_GLOBS = [
+    "website/content/*/articles/*/index.md",
+    "scripts/tests/data/*.md",
+]
+
+
+def per_line_norms(lines: list[str]) -> list[str]:
+    result = []
+    for l in lines:
+        l = l.replace("https://", "http://")
+
+        def _norm_img_url(m: re.Match) -> str:
+            url = m.group(1)
+            url = re.sub(r"\?.*$", "", url)
+            url = re.sub(r"_(r|720w|1440w|b)\.", ".", url)
+            url = re.sub(r"pic[a-z0-9]*\.zhimg\.com", "pic.zhimg.com", url)
+            return url
+
+        l = re.sub(r"(?<=\()([^)]*zhimg\.com[^)]*)", _norm_img_url, l)
+        l = re.sub(r"(?<!\*)\*(?!\*)(.+?)(?<!\*)\*(?!\*)", r"_\1_", l)
+        l = re.sub(r"`([^`]+?) +`", r"`\1`", l)
+        l = re.sub(r"\(<(https?://[^>]+)>\)", r"(\1)", l)
+        l = re.sub(r"\[(http[^\]]+)\]\(\1\)", r"\1", l)
+        l = re.sub(r"\[([^\]]+?) +\]", r"[\1]", l)
+        l = re.sub(r"\\([_*\[\]()~`>#+\-.!|{}])", r"\1", l)
+        l = re.sub(r"\[`([^`]+)`\]", r"[\1]", l)
+        l = re.sub(r"^(#{1,6}) `(.+)`$", r"\1 \2", l)
+        result.append(l)
+    return result
+
+
+def load_corpus() -> list[list[str]]:
+    documents = []
+    for pattern in CORPUS_GLOBS:
+        for path in sorted(REPO_ROOT.glob(pattern)):
+            _, body = read_markdown_document(path)
+            preview = simulate_preview(markdown_to_html(body))
+            round_trip = Parser().parse_article_from_html(preview).content.dump()
+            documents.append(normalise_lines(body))
+            documents.append(normalise_lines(round_trip))
+    return documents
+
+
+def best_of(repeat: int, fn, documents: list[list[str]]) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for lines in documents:
+            fn(lines)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description=__doc__)
+    p.add_argument("--repeat", type=int, default=5, help="Timed runs per path")
+    args = p.parse_args()
+
+    documents = load_corpus()
+    mismatches = [
+        index
+        for index, lines in enumerate(documents)
+        if per_line_norms(lines) != apply_norms(lines)
+    ]
+    if mismatches:
+        print(f"Output differs for {len(mismatches)} documents", file=sys.stderr)
+        sys.exit(1)
+
+    total_lines = sum(len(lines) for lines in documents)
+    per_line = best_of(args.repeat, per_line_norms, documents)
+    compiled = best_of(args.repeat, apply_norms, documents)
+    print(f"{len(documents)} documents, {total_lines} lines, identical output")
+    print(f"  per-line    {per_line * 1000:8.1f} ms")
+    print(f"  compiled    {compiled * 1000:8.1f} ms  ({per_line / compiled:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Benchmark the article translation pipeline against the local Gemini stand-in.
+
+Starts gemini_standin on a free port, points GOOGLE_GEMINI_BASE_URL at it and
+runs translate_articles over the corpus into a scratch directory under
+.cache/. Reports throughput, the latency of successful requests as served,
+and how many attempts were throttled, failed or timed out (each one is a
+retry, or a failed article once the retries run out).
+
+Usage:
+  uv run python scripts/tests/bench_translate.py [--workers N] [--engine asyncio]
+      [--latency 0.5] [--rate-429 0.05] [--rate-timeout 0.01] ...
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+from gemini_standin import GeminiStandin, add_standin_arguments, config_from_args
+from translate_articles import DEFAULT_SOURCE_ROOT, translate_markdown_files
+
+REPO_ROOT = SCRIPTS_DIR.parent
+SCRATCH_ROOT = REPO_ROOT / ".cache"
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description=__doc__)
+    p.add_argument("--workers", type=int, default=8, help="Articles in flight")
+    p.add_argument("--engine", choices=("threads", "asyncio"), default="threads")
+    p.add_argument("--stream", action="store_true", help="Use streamed responses")
+    p.add_argument("--chunk-tokens", type=int, default=None, help="Tokens per request")
+    p.add_argument(
+        "--source-root",
+        default=str(DEFAULT_SOURCE_ROOT),
+        help="Corpus of */index.md articles",
+    )
+    p.add_argument("--limit", type=int, default=None, help="Translate N articles")
+    p.add_argument(
+        "--timeout",
+        type=float,
+        default=10.0,
+        help="Client deadline per attempt (GOOGLE_GEMINI_TIMEOUT_SECONDS)",
+    )
+    p.add_argument("--verbose", action="store_true", help="Show the pipeline log")
+    add_standin_arguments(p)
+    args = p.parse_args()
+
+    source_root = Path(args.source_root).resolve()
+    articles = sorted(
+        path.relative_to(source_root) for path in source_root.glob("*/index.md")
+    )[: args.limit]
+    if not articles:
+        print(f"No articles under {source_root}", file=sys.stderr)
+        sys.exit(1)
+
+    standin = GeminiStandin(config_from_args(args))
+    os.environ["GOOGLE_GEMINI_BASE_URL"] = standin.start()
+    os.environ.setdefault("GEMINI_API_KEY", "standin")
+    os.environ["GOOGLE_GEMINI_TIMEOUT_SECONDS"] = f"{args.timeout:g}"
+
+    SCRATCH_ROOT.mkdir(exist_ok=True)
+    target_root = Path(tempfile.mkdtemp(prefix="bench-translate-", dir=SCRATCH_ROOT))
+    quiet = (
+        contextlib.nullcontext()
+        if args.verbose
+        else contextlib.redirect_stdout(io.StringIO())
+    )
+    failed = 0
+    started = time.perf_counter()
+    try:
+        with quiet:
+            translate_markdown_files(
+                articles,
+                source_root,
+                target_root,
+                source_lang="zh-CN",
+                target_lang="English",
+                model="gemini-2.5-pro",
+                temperature=0.2,
+                workers=args.workers,
+                dry_run=False,
+                chunk_tokens=args.chunk_tokens,
+                stream=True if args.stream else None,
+                engine=args.engine,
+            )
+    except RuntimeError as exc:
+        failed = str(exc).count("[fail ")
+    finally:
+        elapsed = time.perf_counter() - started
+        standin.stop()
+        shutil.rmtree(target_root, ignore_errors=True)
+
+    stats = standin.stats
+    ok = stats.statuses[200]
+    print(
+        f"{len(articles)} articles ({failed} failed), {args.workers} workers, "
+        f"{args.engine} engine{', streamed' if args.stream else ''}"
+    )
+    print(
+        f"  throughput  {(len(articles) - failed) / elapsed * 60:8.1f} articles/min "
+        f"({elapsed:.1f}s)"
+    )
+    print(
+        f"  latency     p50 {stats.percentile(50):.2f}s  p95 {stats.percentile(95):.2f}s"
+        f"  ({ok} requests, peak {stats.peak_in_flight} in flight)"
+    )
+    print(
+        f"  retries     {stats.requests - ok}  "
+        f"(429: {stats.statuses[429]}, 503: {stats.statuses[503]}, "
+        f"timeouts: {stats.timeouts})"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -4,14 +4,15 @@ Zhihu markdown feature tests.
 
 Pushes each test/data/*.md file as a draft to a target article,
 fetches the preview HTML, parses it back, and diffs vs the original.
+Previews are cached by the hash of the generated HTML, so only test cases
+whose HTML changed are pushed again; --refresh ignores the cache.
 
 Usage:
-  uv run python scripts/tests/run_tests.py --article-id <ID> [--delay SECONDS] [--test NAME]
+  uv run python scripts/tests/run_tests.py --article-id <ID> [--delay SECONDS] [--test NAME] [--refresh]
 """
 
 import argparse
 import difflib
-import re
 import sys
 import time
 from pathlib import Path
@@ -26,7 +27,9 @@ from zhihu_client import (
     markdown_to_html,
     read_markdown_document,
 )
+from zhihu_normalise import URL_NORMS, apply_norms, normalise_lines
 from zhihu_parser import Parser
+from zhihu_preview_cache import PreviewCache
 
 DATA_DIR = Path(__file__).resolve().parent / "data"
 PREVIEW_URL = "https://zhuanlan.zhihu.com/p/{id}/preview?comment=0&catalog=1"
@@ -44,44 +47,6 @@ BOLD = "\033[1m"
 # ---------------------------------------------------------------------------
 
 
-def _normalise(text: str) -> list[str]:
-    lines = [l.rstrip() for l in text.splitlines()]
-    out: list[str] = []
-    prev_blank = False
-    for line in lines:
-        blank = not line.strip()
-        if blank and prev_blank:
-            continue
-        out.append(line)
-        prev_blank = blank
-    while out and not out[0].strip():
-        out.pop(0)
-    while out and not out[-1].strip():
-        out.pop()
-    return out
-
-
-def _http_norm(lines: list[str]) -> list[str]:
-    return [l.replace("https://", "http://") for l in lines]
-
-
-def _img_norm(lines: list[str]) -> list[str]:
-    """Normalize Zhihu image URLs: strip query params and subdomain variant.
-    e.g. picx.zhimg.com/v2-abc_720w.jpg?source=xxx -> pic.zhimg.com/v2-abc
-    """
-
-    def _norm_url(m: re.Match) -> str:
-        url = m.group(1)
-        url = re.sub(r"\?.*$", "", url)  # strip query string
-        url = re.sub(r"_(r|720w|1440w)\.", ".", url)  # strip size suffix
-        url = re.sub(
-            r"pic[a-z0-9]*\.zhimg\.com", "pic.zhimg.com", url
-        )  # normalise subdomain
-        return url
-
-    return [re.sub(r"(?<=\()([^)]*zhimg\.com[^)]*)", _norm_url, l) for l in lines]
-
-
 def colour_diff(diff: list[str]) -> str:
     out = []
     for line in diff:
@@ -108,37 +73,44 @@ def run_test(
     article_id: str,
     md_path: Path,
     delay: float,
+    cache: PreviewCache | None = None,
+    refresh: bool = False,
 ) -> dict:
     name = md_path.stem
     body = md_path.read_text(encoding="utf-8")
 
     html = markdown_to_html(body)
 
-    patch = client.session.patch(
-        f"{ZHUANLAN_API}/{article_id}/draft",
-        json={
-            "content": html,
-            "title": f"[test] {name}",
-            "titleImage": "",
-            "isTitleImageFullScreen": False,
-            "table_of_contents": True,
-        },
-        headers=ZHUANLAN_HEADERS,
-        timeout=30,
-    )
-    patch.raise_for_status()
-    time.sleep(delay)
+    preview_html = cache.get(html) if cache is not None and not refresh else None
+    if preview_html is None:
+        patch = client.session.patch(
+            f"{ZHUANLAN_API}/{article_id}/draft",
+            json={
+                "content": html,
+                "title": f"[test] {name}",
+                "titleImage": "",
+                "isTitleImageFullScreen": False,
+                "table_of_contents": True,
+            },
+            headers=ZHUANLAN_HEADERS,
+            timeout=30,
+        )
+        patch.raise_for_status()
+        time.sleep(delay)
 
-    preview = client.session.get(PREVIEW_URL.format(id=article_id), timeout=30)
-    preview.raise_for_status()
-    time.sleep(delay)
+        preview = client.session.get(PREVIEW_URL.format(id=article_id), timeout=30)
+        preview.raise_for_status()
+        time.sleep(delay)
+        preview_html = preview.text
+        if cache is not None:
+            cache.put(html, preview_html)
 
     parser = Parser()
-    article = parser.parse_article_from_html(preview.text)
+    article = parser.parse_article_from_html(preview_html)
     rt_md = article.content.dump()
 
-    local_lines = _img_norm(_http_norm(_normalise(body)))
-    rt_lines = _img_norm(_http_norm(_normalise(rt_md)))
+    local_lines = apply_norms(normalise_lines(body), URL_NORMS)
+    rt_lines = apply_norms(normalise_lines(rt_md), URL_NORMS)
 
     diff = list(
         difflib.unified_diff(
@@ -196,6 +168,11 @@ def build_parser() -> argparse.ArgumentParser:
     p.add_argument(
         "--test", default="", help="Run only tests matching this name pattern"
     )
+    p.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Ignore cached previews and push every test again",
+    )
     return p
 
 
@@ -210,12 +187,15 @@ def main() -> None:
         sys.exit(1)
 
     client = ZhihuClient.from_env_or_cache(allow_login=False)
+    cache = PreviewCache()
 
     results: list[dict] = []
     for i, md_path in enumerate(test_files, 1):
         print(f"[{i}/{len(test_files)}] {md_path.stem} ...", end=" ", flush=True)
         try:
-            result = run_test(client, args.article_id, md_path, args.delay)
+            result = run_test(
+                client, args.article_id, md_path, args.delay, cache, args.refresh
+            )
             print("OK" if not result["diff"] else f"{len(result['diff'])} diff lines")
             results.append(result)
         except Exception as e:
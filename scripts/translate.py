@@ -1,13 +1,28 @@
 import argparse
+import hashlib
+import heapq
+import itertools
+import json
+import math
 import os
+import re
+import shutil
 import sys
+import tempfile
+import threading
 import time
-from dataclasses import dataclass
+from collections import deque
+from collections.abc import Callable, Mapping
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from email.utils import parsedate_to_datetime
 from pathlib import Path
-from typing import Any
+from typing import Any, Self
 
 import requests
 import yaml
+from requests.adapters import HTTPAdapter
 
 
 class _PrettierDumper(yaml.Dumper):
@@ -27,14 +42,34 @@ MARKDOWN_SUFFIXES = {".md", ".markdown"}
 DEFAULT_BASE_URL = "https://generativelanguage.googleapis.com"
 DEFAULT_API_VERSION = "v1beta"
 DEFAULT_INCLUDE_THOUGHTS = False
+DEFAULT_STREAM = False
 DEFAULT_TIMEOUT_SECONDS = 180
 DEFAULT_MAX_RETRIES = 3
+# Long bodies are split into chunks of about this many tokens, translated
+# concurrently; each chunk carries a short context header of preceding text
+DEFAULT_CHUNK_TOKENS = 3000
+DEFAULT_CHUNK_WORKERS = 4
+CONTEXT_TOKENS = 200
+DEFAULT_MEMORY_PATH = (
+    Path(__file__).resolve().parent.parent / ".cache" / "translation-memory.jsonl"
+)
+# Part of every translation memory key: bump whenever the prompts or the
+# segment protocol change so that stale translations are not reused.
+PROMPT_VERSION = "2"
 MARKDOWN_SYSTEM_INSTRUCTION = """
 You are an expert technical translator. Translate the user's Markdown into the target language.
 Preserve Markdown structure, headings, list structure, block quotes, tables, and emphasis markers.
 Do not add explanations. Do not wrap the answer in code fences.
-Preserve URLs exactly. Preserve fenced code blocks, inline code, and code identifiers unless a human-language
-comment inside code clearly needs translation.
+Preserve URLs exactly. Preserve code identifiers.
+Code and URLs have been replaced with placeholders such as @@CODE3@@ and @@URL7@@.
+Copy every placeholder exactly as written, once, and never translate, split, or merge placeholders.
+The input is split into segments, each introduced by a marker line such as <!-- segment 3 -->.
+Copy every marker line unchanged, in the same order, and put each segment's translation right after its marker.
+""".strip()
+FRONT_MATTER_SYSTEM_INSTRUCTION = """
+You are an expert technical translator. The user sends a JSON object of article metadata fields.
+Translate every string value into the target language and return a JSON object with the same keys,
+where lists keep their length and order. Do not translate keys.
 """.strip()
 TEXT_SYSTEM_INSTRUCTION = """
 You are an expert bilingual translator. Translate the user's text into the target language naturally and accurately.
@@ -91,6 +126,589 @@ def prepend_notice(body: str, notice: str) -> str:
     return f"{notice}\n\n{normalized_body}"
 
 
+SEGMENT_MARKER = "<!-- segment {index} -->"
+SEGMENT_MARKER_RE = re.compile(r"^<!-- segment (\d+) -->[ \t]*$", re.MULTILINE)
+_FENCE_RE = re.compile(r"^[ \t]*(`{3,}|~{3,})")
+_LIST_ITEM_RE = re.compile(r"^(?:[-*+]|\d+[.)])(?:[ \t]|$)")
+
+
+@dataclass(frozen=True)
+class Segment:
+    """A top-level block of a Markdown body and the whitespace after it."""
+
+    text: str
+    separator: str
+
+    @property
+    def translatable(self) -> bool:
+        # Table separator rows, horizontal rules, ... have nothing to translate
+        return bool(re.search(r"[^\W\d_]", self.text))
+
+
+def segment_markdown(body: str) -> list[Segment]:
+    """Split a Markdown body into paragraphs, headings, list items, table rows
+    and fenced code blocks. Joining text + separator gives back `body`."""
+    lines = body.split("\n")
+    # [start, end) line ranges of the top-level blocks
+    ranges: list[tuple[int, int]] = []
+    index = 0
+    while index < len(lines):
+        if not lines[index].strip():
+            index += 1
+            continue
+        start = index
+        fence = _FENCE_RE.match(lines[index])
+        if fence:
+            marker = fence.group(1)
+            index += 1
+            while index < len(lines):
+                closing = lines[index].strip()
+                index += 1
+                if closing.startswith(marker) and not closing.strip(marker[0]):
+                    break
+            ranges.append((start, index))
+            continue
+        index += 1
+        while index < len(lines) and lines[index].strip():
+            current = lines[index]
+            if _FENCE_RE.match(current):
+                break
+            # Top-level list items and table rows each start a new segment
+            if _LIST_ITEM_RE.match(current) or (
+                current.startswith("|") and lines[start].startswith("|")
+            ):
+                ranges.append((start, index))
+                start = index
+            index += 1
+        ranges.append((start, index))
+
+    offsets = [0]
+    for line in lines:
+        offsets.append(offsets[-1] + len(line) + 1)
+    segments: list[Segment] = []
+    if ranges and ranges[0][0] > 0:
+        # Leading blank lines
+        segments.append(Segment("", body[: offsets[ranges[0][0]]]))
+    for position, (start, end) in enumerate(ranges):
+        text_end = offsets[end] - 1
+        if position + 1 < len(ranges):
+            separator = body[text_end : offsets[ranges[position + 1][0]]]
+        else:
+            separator = body[text_end:]
+        segments.append(Segment(body[offsets[start] : text_end], separator))
+    if not ranges and body:
+        segments.append(Segment("", body))
+    return segments
+
+
+def join_segments(segments: list[Segment]) -> str:
+    return "".join(segment.text + segment.separator for segment in segments)
+
+
+class TranslationMemory:
+    """Persistent segment cache: hash(source, model, target language, prompt
+    version) → translation, stored as an append-only JSON lines file."""
+
+    def __init__(self, path: Path = DEFAULT_MEMORY_PATH):
+        self.path = path
+        self.entries: dict[str, str] = {}
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        if path.exists():
+            for line in path.read_text(encoding="utf-8").splitlines():
+                if line.strip():
+                    record = json.loads(line)
+                    self.entries[record["key"]] = record["translation"]
+
+    @staticmethod
+    def key(source: str, *, model: str, target_lang: str) -> str:
+        material = json.dumps([PROMPT_VERSION, model, target_lang, source])
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def peek(self, key: str) -> str | None:
+        """Look `key` up without counting a hit or a miss."""
+        with self._lock:
+            return self.entries.get(key)
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            translation = self.entries.get(key)
+            if translation is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return translation
+
+    def put_many(self, translations: dict[str, str]) -> None:
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a", encoding="utf-8") as handle:
+                for key, translation in translations.items():
+                    self.entries[key] = translation
+                    record = {"key": key, "translation": translation}
+                    handle.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+PLACEHOLDER = "@@{kind}{index}@@"
+PLACEHOLDER_RE = re.compile(r"@@(?:CODE|URL)\d+@@")
+# (kind, pattern) masking passes, applied in order; later passes never see
+# the text earlier ones replaced
+_MASK_PASSES: list[tuple[str, re.Pattern]] = [
+    # Fenced code blocks, up to the closing fence or the end of the segment
+    (
+        "CODE",
+        re.compile(
+            r"^[ \t]*(`{3,}|~{3,}).*?(?:^[ \t]*\1[`~]*[ \t]*$|\Z)",
+            re.MULTILINE | re.DOTALL,
+        ),
+    ),
+    # Inline code
+    ("CODE", re.compile(r"(?<!`)(`+)(?!`).+?(?<!`)\1(?!`)")),
+    # Link and image destinations: [label](url "title")
+    (
+        "URL",
+        re.compile(r"(?<=\]\()(?:<[^>\n]*>|[^\s()<>]+(?:\([^\s()]*\)[^\s()<>]*)*)"),
+    ),
+    # Autolinks and bare URLs (link cards, footnotes, ...)
+    ("URL", re.compile(r"<https?://[^>\s]+>")),
+    (
+        "URL",
+        re.compile(
+            r"https?://[^\s<>()\[\]\"'`，。；：！？（）「」]*"
+            r"[^\s<>()\[\]\"'`，。；：！？（）「」.,;:!?]"
+        ),
+    ),
+]
+
+
+class PlaceholderMask:
+    """Replace code and URLs with stable placeholders before a request and put
+    the originals back afterwards, so that only prose is sent to the model."""
+
+    def __init__(self):
+        self.originals: dict[str, str] = {}
+
+    def mask(self, text: str) -> str:
+        for kind, pattern in _MASK_PASSES:
+
+            def replace(m: re.Match, kind: str = kind) -> str:
+                placeholder = PLACEHOLDER.format(kind=kind, index=len(self.originals))
+                self.originals[placeholder] = m.group(0)
+                return placeholder
+
+            text = pattern.sub(replace, text)
+        return text
+
+    def unmask(self, text: str, source: str) -> str:
+        """Restore the originals in `text`, the translation of masked `source`.
+
+        The translation must carry exactly the placeholders of its source.
+        """
+        returned = sorted(PLACEHOLDER_RE.findall(text))
+        expected = sorted(PLACEHOLDER_RE.findall(source))
+        if returned != expected:
+            missing = sorted(set(expected) - set(returned))
+            unexpected = sorted(set(returned) - set(expected))
+            raise RuntimeError(
+                "Gemini altered placeholders: "
+                f"missing {missing}, unexpected {unexpected}, "
+                f"expected each of {expected} exactly once."
+            )
+        return PLACEHOLDER_RE.sub(
+            lambda m: self.originals.get(m.group(0), m.group(0)), text
+        )
+
+
+_CJK_RE = re.compile(r"[\u3000-\u9fff\uac00-\ud7af\uff00-\uffef]")
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count: one per CJK character, one per four other characters."""
+    cjk = len(_CJK_RE.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+def chunk_segments(segments: dict[int, str], budget: int) -> list[dict[int, str]]:
+    """Group consecutive segments into chunks of at most `budget` estimated
+    tokens. Once a chunk is half full, a heading starts the next one; a
+    segment larger than the budget gets a chunk of its own."""
+    chunks: list[dict[int, str]] = []
+    current: dict[int, str] = {}
+    size = 0
+    for index, text in segments.items():
+        tokens = estimate_tokens(text)
+        heading = text.startswith("#")
+        if current and (size + tokens > budget or (heading and size >= budget // 2)):
+            chunks.append(current)
+            current, size = {}, 0
+        current[index] = text
+        size += tokens
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+# Limiter priority of front matter requests: they are short and an article
+# cannot finish without its front matter, so they go first
+FRONT_MATTER_PRIORITY = math.inf
+
+
+def chunk_priorities(count: int) -> range:
+    """Limiter priorities of a document's chunks in submission order: the
+    number of its chunks still to start, so that across documents the one
+    with the most work left is served first."""
+    return range(count, 0, -1)
+
+
+def context_before(segments: dict[int, str], first: int) -> str:
+    """Return the segments right before index `first`, up to CONTEXT_TOKENS."""
+    context: list[str] = []
+    size = 0
+    for index in sorted((i for i in segments if i < first), reverse=True):
+        size += estimate_tokens(segments[index])
+        if context and size > CONTEXT_TOKENS:
+            break
+        context.insert(0, segments[index])
+    return "\n\n".join(context)
+
+
+def build_segment_prompt(segments: dict[int, str], context: str = "") -> str:
+    prompt = "\n\n".join(
+        f"{SEGMENT_MARKER.format(index=index)}\n{text}"
+        for index, text in segments.items()
+    )
+    if context:
+        # Anything before the first marker is dropped when parsing
+        prompt = (
+            "<!-- context: preceding text, for terminology only; "
+            f"do not translate or return it -->\n{context}\n"
+            f"<!-- end context -->\n\n{prompt}"
+        )
+    return prompt
+
+
+class MalformedResponse(RuntimeError):
+    """A response that breaks the output protocol; retried like a transient
+    error."""
+
+
+def parse_segment_response(text: str, expected: list[int]) -> dict[int, str]:
+    """Split a marker-delimited response; every requested marker must come back
+    exactly once and in order."""
+    found = [int(m.group(1)) for m in SEGMENT_MARKER_RE.finditer(text)]
+    if found != expected:
+        raise MalformedResponse(
+            f"Gemini returned segment markers {found}, expected {expected}."
+        )
+    pieces = SEGMENT_MARKER_RE.split(text)[1:]
+    return {
+        int(pieces[position]): pieces[position + 1].strip("\n")
+        for position in range(0, len(pieces), 2)
+    }
+
+
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+# The limit is halved at most once per cooldown: the requests already in
+# flight when the quota is hit all come back throttled together
+LIMIT_DECREASE_COOLDOWN_SECONDS = 2.0
+
+
+def parse_retry_after(headers: Mapping[str, str], body: str) -> float | None:
+    """Seconds to wait from a Retry-After header (delta or HTTP date) or the
+    RetryInfo detail of a Gemini error body, if either is present."""
+    header = headers.get("retry-after", "").strip()
+    if header:
+        if header.isdigit():
+            return float(header)
+        try:
+            retry_at = parsedate_to_datetime(header)
+        except (TypeError, ValueError):
+            retry_at = None
+        if retry_at is not None:
+            return max(0.0, (retry_at - datetime.now(UTC)).total_seconds())
+    try:
+        details = json.loads(body).get("error", {}).get("details", [])
+    except (ValueError, AttributeError):
+        return None
+    for detail in details:
+        delay = str(detail.get("retryDelay", ""))
+        if re.fullmatch(r"\d+(?:\.\d+)?s", delay):
+            return float(delay[:-1])
+    return None
+
+
+class AdaptiveLimiter:
+    """AIMD cap on in-flight Gemini requests, shared by every thread.
+
+    The limit grows by about one per round of successful requests, is halved
+    when a request is throttled (429, 5xx, timeout), and nobody starts a
+    request before a server-sent Retry-After has passed. Waiting requests get
+    free slots highest priority first, then first come first served.
+    """
+
+    def __init__(self, initial: int, maximum: int, minimum: int = 1):
+        self.minimum = minimum
+        self.maximum = max(maximum, initial)
+        self.limit = float(initial)
+        self.lowest = self.limit
+        self.in_flight = 0
+        self.throttled = 0
+        self._blocked_until = 0.0
+        self._last_decrease = float("-inf")
+        # Heap of (-priority, arrival) tickets of the requests waiting
+        self._waiting: list[tuple[float, int]] = []
+        self._arrivals = itertools.count()
+        self._condition = threading.Condition()
+
+    def _enqueue(self, priority: float) -> tuple[float, int]:
+        ticket = (-priority, next(self._arrivals))
+        heapq.heappush(self._waiting, ticket)
+        return ticket
+
+    def _dequeue(self, ticket: tuple[float, int]) -> None:
+        self._waiting.remove(ticket)
+        heapq.heapify(self._waiting)
+
+    def _wait_seconds(self, ticket: tuple[float, int]) -> float | None:
+        """0 if the request holding `ticket` may start now, otherwise how
+        long to wait (None: until another request is released)."""
+        wait = self._blocked_until - time.monotonic()
+        if wait > 0:
+            return wait
+        if self.in_flight >= int(self.limit) or self._waiting[0] != ticket:
+            return None
+        return 0
+
+    def _record(self, throttled: bool, retry_after: float | None) -> None:
+        self.in_flight -= 1
+        now = time.monotonic()
+        if retry_after is not None:
+            self._blocked_until = max(self._blocked_until, now + retry_after)
+        if not throttled:
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            return
+        self.throttled += 1
+        if now - self._last_decrease >= LIMIT_DECREASE_COOLDOWN_SECONDS:
+            previous = self.limit
+            self.limit = max(self.minimum, self.limit / 2)
+            self.lowest = min(self.lowest, self.limit)
+            self._last_decrease = now
+            print(
+                f"[gemini] throttled: concurrency limit "
+                f"{int(previous)} -> {int(self.limit)}",
+                flush=True,
+            )
+
+    def acquire(self, *, block: bool = True, priority: float = 0.0) -> None:
+        """Wait for a free slot; with block=False take one regardless (the
+        request still counts as in flight and feeds back on release)."""
+        with self._condition:
+            if block:
+                ticket = self._enqueue(priority)
+                try:
+                    while (wait := self._wait_seconds(ticket)) != 0:
+                        self._condition.wait(timeout=wait)
+                finally:
+                    self._dequeue(ticket)
+                    # The next in line may have a slot as well
+                    self._condition.notify_all()
+            self.in_flight += 1
+
+    def release(
+        self, *, throttled: bool = False, retry_after: float | None = None
+    ) -> None:
+        with self._condition:
+            self._record(throttled, retry_after)
+            self._condition.notify_all()
+
+
+def completed_segments(text: str, expected: list[int]) -> dict[int, str]:
+    """Return the segments of a partial marker-delimited response that are
+    followed by the next marker, failing as soon as the markers go wrong."""
+    found = [int(m.group(1)) for m in SEGMENT_MARKER_RE.finditer(text)]
+    if found != expected[: len(found)]:
+        raise MalformedResponse(
+            f"Gemini returned segment markers {found}, expected {expected}."
+        )
+    pieces = SEGMENT_MARKER_RE.split(text)[1:]
+    return {
+        int(pieces[position]): pieces[position + 1].strip("\n")
+        for position in range(0, len(pieces) - 2, 2)
+    }
+
+
+def response_text(payload: dict[str, Any]) -> str:
+    candidates = payload.get("candidates") or []
+    parts = []
+    if candidates:
+        content = candidates[0].get("content") or {}
+        parts = content.get("parts") or []
+    return "".join(part.get("text", "") for part in parts)
+
+
+def sse_payload(line: str) -> dict[str, Any] | None:
+    """Return the JSON carried by one server-sent event line, or None for
+    lines that are not data."""
+    if not line.startswith("data:"):
+        return None
+    return json.loads(line[5:])
+
+
+def check_stream_text(text: str) -> None:
+    """Fail fast on output that is going wrong while it is still streaming."""
+    if text.lstrip().startswith("```"):
+        raise MalformedResponse("Gemini wrapped its answer in a code fence.")
+
+
+# The process umask, for the mode write_text would give a new file. It can
+# only be read by setting it, so this happens once, before any threads start.
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+class ProgressiveWriter:
+    """Write a translated body into a temp file next to `path` as its
+    segments arrive, in order, then atomically replace `path` with the final
+    document. A writer that is never committed removes its temp file.
+
+    Until the commit creates them, missing parent directories are left alone:
+    the temp file goes in the nearest existing one, on the same filesystem.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        directory = path.parent
+        while not directory.exists():
+            directory = directory.parent
+        fd, temp_name = tempfile.mkstemp(
+            dir=directory, prefix=f".{path.name}.", suffix=".partial"
+        )
+        self.temp_path = Path(temp_name)
+        self._handle = os.fdopen(fd, "w", encoding="utf-8")
+        self._waiting: dict[int, str] = {}
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def add(self, index: int, segment: Segment) -> None:
+        with self._lock:
+            if self._handle.closed or index < self._next:
+                return
+            self._waiting.setdefault(index, segment.text + segment.separator)
+            while self._next in self._waiting:
+                self._handle.write(self._waiting.pop(self._next))
+                self._next += 1
+            self._handle.flush()
+
+    def commit(self, content: str) -> None:
+        with self._lock:
+            self._handle.seek(0)
+            self._handle.truncate()
+            self._handle.write(content)
+            self._handle.close()
+            # mkstemp creates the file 0600
+            if self.path.exists():
+                shutil.copymode(self.path, self.temp_path)
+            else:
+                self.temp_path.chmod(0o666 & ~_UMASK)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(self.temp_path, self.path)
+
+    def abort(self) -> None:
+        with self._lock:
+            self._handle.close()
+            self.temp_path.unlink(missing_ok=True)
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        if self.temp_path.exists():
+            self.abort()
+
+
+@dataclass(frozen=True)
+class HedgePolicy:
+    """Opt-in hedging: once a request has run longer than `percentile` of the
+    latencies seen so far, send a duplicate (to `fallback_model` if set) and
+    keep whichever answers first. At most `max_hedges` duplicates per run."""
+
+    percentile: float = 95.0
+    fallback_model: str | None = None
+    max_hedges: int = 5
+    # Until `min_samples` requests have finished, hedge after `initial_delay`
+    min_samples: int = 10
+    initial_delay: float = 60.0
+
+    @classmethod
+    def from_env(cls) -> "HedgePolicy | None":
+        percentile = os.environ.get("GOOGLE_GEMINI_HEDGE_PERCENTILE", "").strip()
+        if not percentile:
+            return None
+        max_hedges = os.environ.get("GOOGLE_GEMINI_HEDGE_MAX", "").strip()
+        return cls(
+            percentile=float(percentile),
+            fallback_model=os.environ.get("GOOGLE_GEMINI_HEDGE_MODEL", "").strip()
+            or None,
+            max_hedges=int(max_hedges) if max_hedges else cls.max_hedges,
+        )
+
+
+class RequestCancelled(Exception):
+    """Raised inside a request that lost a hedge race."""
+
+
+@dataclass
+class UsageTally:
+    """Tokens and request time summed over Gemini responses, from their
+    usageMetadata. Every response that arrives counts, including the losers
+    of hedge races that finished anyway: they are billed all the same."""
+
+    requests: int = 0
+    prompt_tokens: int = 0
+    output_tokens: int = 0
+    thinking_tokens: int = 0
+    # Seconds spent in requests (concurrent requests add up) and the longest
+    latency: float = 0.0
+    slowest: float = 0.0
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, repr=False, compare=False
+    )
+
+    def add(self, metadata: Mapping[str, Any], latency: float) -> None:
+        with self._lock:
+            self.requests += 1
+            self.prompt_tokens += int(metadata.get("promptTokenCount", 0))
+            self.output_tokens += int(metadata.get("candidatesTokenCount", 0))
+            self.thinking_tokens += int(metadata.get("thoughtsTokenCount", 0))
+            self.latency += latency
+            self.slowest = max(self.slowest, latency)
+
+    def merge(self, other: "UsageTally") -> None:
+        with self._lock:
+            self.requests += other.requests
+            self.prompt_tokens += other.prompt_tokens
+            self.output_tokens += other.output_tokens
+            self.thinking_tokens += other.thinking_tokens
+            self.latency += other.latency
+            self.slowest = max(self.slowest, other.slowest)
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.output_tokens + self.thinking_tokens
+
+    def as_record(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "prompt_tokens": self.prompt_tokens,
+                "output_tokens": self.output_tokens,
+                "thinking_tokens": self.thinking_tokens,
+                "latency": round(self.latency, 3),
+                "slowest": round(self.slowest, 3),
+            }
+
+
 @dataclass(frozen=True)
 class TranslationOptions:
     source_lang: str = "auto"
@@ -100,12 +718,266 @@ class TranslationOptions:
     markdown: bool = False
 
 
+def build_translation_prompt(text: str, options: TranslationOptions) -> tuple[str, str]:
+    """Return (prompt, system instruction) for translating `text`."""
+    if options.markdown:
+        prompt = (
+            f"Source language: {options.source_lang}\n"
+            f"Target language: {options.target_lang}\n\n"
+            "Translate the following Markdown and return only the translated Markdown:\n\n"
+            f"{text}"
+        )
+        return prompt, MARKDOWN_SYSTEM_INSTRUCTION
+    prompt = (
+        f"Source language: {options.source_lang}\n"
+        f"Target language: {options.target_lang}\n\n"
+        "Translate the following text:\n\n"
+        f"{text}"
+    )
+    return prompt, TEXT_SYSTEM_INSTRUCTION
+
+
+@dataclass
+class SegmentPlan:
+    """One Markdown body on its way through translation: the segments already
+    known (untranslatable or remembered) and the masked ones still to send."""
+
+    segments: list[Segment]
+    mask: PlaceholderMask
+    translated: dict[int, str]
+    # Masked text of every segment with prose, sent or not (for context)
+    prose: dict[int, str]
+    pending: dict[int, str]
+    keys: dict[int, str]
+
+    def prompt(self, chunk: dict[int, str]) -> str:
+        return build_segment_prompt(
+            chunk, context_before(self.prose, next(iter(chunk)))
+        )
+
+    def segment(self, index: int, text: str) -> Segment:
+        return Segment(text, self.segments[index].separator)
+
+    def partial(self, chunk: dict[int, str], text: str) -> dict[int, str]:
+        """Unmask the segments completed so far in a streaming response."""
+        return self._unmask(chunk, completed_segments(text, list(chunk)))
+
+    def parse(self, chunk: dict[int, str], response: str) -> dict[int, str]:
+        """Unmask the segments of a complete response. A lost marker or
+        placeholder is a MalformedResponse, so this can check a response
+        inside the retry loop."""
+        return self._unmask(chunk, parse_segment_response(response, list(chunk)))
+
+    def finish(self, chunk: dict[int, str], response: str) -> dict[int, str]:
+        fresh = self.parse(chunk, response)
+        self.translated.update(fresh)
+        return fresh
+
+    def _unmask(
+        self, chunk: dict[int, str], translations: dict[int, str]
+    ) -> dict[int, str]:
+        unmasked: dict[int, str] = {}
+        for index, translation in translations.items():
+            try:
+                unmasked[index] = self.mask.unmask(translation, chunk[index])
+            except RuntimeError as exc:
+                raise MalformedResponse(str(exc)) from exc
+        return unmasked
+
+    def join(self) -> str:
+        return join_segments(
+            [
+                self.segment(index, self.translated[index])
+                for index in range(len(self.segments))
+            ]
+        )
+
+
+def plan_segments(
+    body: str,
+    *,
+    model: str,
+    target_lang: str,
+    memory: TranslationMemory | None,
+    count_hits: bool = True,
+) -> SegmentPlan:
+    """Split `body` into segments, mask them and look them up in `memory`;
+    what is left pending is what has to be sent. Estimates pass
+    `count_hits=False` to leave the memory's hit counts alone."""
+    segments = segment_markdown(body)
+    plan = SegmentPlan(segments, PlaceholderMask(), {}, {}, {}, {})
+    for index, segment in enumerate(segments):
+        masked = plan.mask.mask(segment.text)
+        # Code blocks, bare links, ... have no prose left once masked
+        if not Segment(PLACEHOLDER_RE.sub("", masked), "").translatable:
+            plan.translated[index] = segment.text
+            continue
+        plan.prose[index] = masked
+        plan.keys[index] = TranslationMemory.key(
+            segment.text, model=model, target_lang=target_lang
+        )
+        if memory is None:
+            cached = None
+        elif count_hits:
+            cached = memory.get(plan.keys[index])
+        else:
+            cached = memory.peek(plan.keys[index])
+        if cached is None:
+            plan.pending[index] = masked
+        else:
+            plan.translated[index] = cached
+    return plan
+
+
+def front_matter_fields(
+    metadata: dict[str, Any], keys: tuple[str, ...]
+) -> dict[str, str | list[str]]:
+    """The string values (and string list items) of `keys` to translate."""
+    fields: dict[str, str | list[str]] = {}
+    for key in keys:
+        value = metadata.get(key)
+        if isinstance(value, str) and value.strip():
+            fields[key] = value
+        elif isinstance(value, list):
+            items = [item for item in value if isinstance(item, str)]
+            if items:
+                fields[key] = items
+    return fields
+
+
+def build_front_matter_request(
+    fields: dict[str, str | list[str]], *, source_lang: str, target_lang: str
+) -> tuple[str, dict[str, Any]]:
+    """Return (prompt, response schema) translating all `fields` at once."""
+    schema = {
+        "type": "OBJECT",
+        "properties": {
+            key: (
+                {"type": "STRING"}
+                if isinstance(value, str)
+                else {"type": "ARRAY", "items": {"type": "STRING"}}
+            )
+            for key, value in fields.items()
+        },
+        "required": list(fields),
+        "propertyOrdering": list(fields),
+    }
+    prompt = (
+        f"Source language: {source_lang}\n"
+        f"Target language: {target_lang}\n\n"
+        "Translate the values of the following JSON object:\n\n"
+        f"{json.dumps(fields, ensure_ascii=False, indent=2)}"
+    )
+    return prompt, schema
+
+
+def merge_front_matter(
+    metadata: dict[str, Any], fields: dict[str, str | list[str]], response: str
+) -> dict[str, Any]:
+    """Check a front matter JSON response against `fields` and merge it."""
+    try:
+        translated_fields = json.loads(response)
+    except json.JSONDecodeError as exc:
+        raise RuntimeError(
+            f"Gemini returned invalid front matter JSON: {response}"
+        ) from exc
+
+    translated = dict(metadata)
+    for key, value in fields.items():
+        result = translated_fields.get(key)
+        if isinstance(value, str) and isinstance(result, str):
+            translated[key] = result
+        elif (
+            isinstance(value, list)
+            and isinstance(result, list)
+            and len(result) == len(value)
+            and all(isinstance(item, str) for item in result)
+        ):
+            # Non-string list items stay where they were
+            results = iter(result)
+            translated[key] = [
+                next(results) if isinstance(item, str) else item
+                for item in metadata[key]
+            ]
+        else:
+            raise RuntimeError(
+                f"Gemini returned front matter {key}={result!r} for {value!r}."
+            )
+    return translated
+
+
+def resolve_chunk_tokens(chunk_tokens: int | None = None) -> int:
+    """`chunk_tokens`, else GOOGLE_GEMINI_CHUNK_TOKENS, else the default."""
+    env_chunk_tokens = os.environ.get("GOOGLE_GEMINI_CHUNK_TOKENS", "").strip()
+    return chunk_tokens or (
+        int(env_chunk_tokens) if env_chunk_tokens else DEFAULT_CHUNK_TOKENS
+    )
+
+
+def estimate_document_usage(
+    markdown_text: str,
+    *,
+    source_lang: str,
+    target_lang: str,
+    model: str,
+    chunk_tokens: int | None = None,
+    memory: TranslationMemory | None = None,
+    front_matter_keys: tuple[str, ...] = DEFAULT_FRONT_MATTER_KEYS,
+) -> UsageTally:
+    """Estimate the requests and tokens translate_markdown_document would
+    spend on `markdown_text`, without sending anything. Output tokens are
+    taken as the size of the source text; thinking tokens are not counted."""
+    estimate = UsageTally()
+    metadata, body, has_front_matter = extract_front_matter(markdown_text)
+    fields = (
+        front_matter_fields(metadata, front_matter_keys) if has_front_matter else {}
+    )
+    if fields:
+        prompt, _ = build_front_matter_request(
+            fields, source_lang=source_lang, target_lang=target_lang
+        )
+        estimate.add(
+            {
+                "promptTokenCount": estimate_tokens(
+                    FRONT_MATTER_SYSTEM_INSTRUCTION + prompt
+                ),
+                "candidatesTokenCount": estimate_tokens(
+                    json.dumps(fields, ensure_ascii=False)
+                ),
+            },
+            0.0,
+        )
+    plan = plan_segments(
+        body, model=model, target_lang=target_lang, memory=memory, count_hits=False
+    )
+    options = TranslationOptions(
+        source_lang=source_lang, target_lang=target_lang, model=model, markdown=True
+    )
+    for chunk in chunk_segments(plan.pending, resolve_chunk_tokens(chunk_tokens)):
+        prompt, system_instruction = build_translation_prompt(
+            plan.prompt(chunk), options
+        )
+        estimate.add(
+            {
+                "promptTokenCount": estimate_tokens(system_instruction + prompt),
+                "candidatesTokenCount": estimate_tokens(build_segment_prompt(chunk)),
+            },
+            0.0,
+        )
+    return estimate
+
+
 class GeminiTranslator:
     def __init__(
         self,
         api_key: str | None = None,
         model: str = DEFAULT_MODEL,
         temperature: float = 0.2,
+        memory: TranslationMemory | None = None,
+        chunk_tokens: int | None = None,
+        workers: int = 1,
+        hedge: HedgePolicy | None = None,
+        stream: bool | None = None,
     ):
         resolved_key = (api_key or os.environ.get("GEMINI_API_KEY", "")).strip()
         if not resolved_key:
@@ -126,74 +998,312 @@ class GeminiTranslator:
             if include_thoughts
             else DEFAULT_INCLUDE_THOUGHTS
         )
+        env_stream = os.environ.get("GOOGLE_GEMINI_STREAM", "").strip()
+        if stream is None:
+            stream = (
+                env_stream.lower() in {"1", "true", "yes", "on"}
+                if env_stream
+                else DEFAULT_STREAM
+            )
+        self.stream = stream
         timeout_seconds = os.environ.get("GOOGLE_GEMINI_TIMEOUT_SECONDS", "").strip()
         self.timeout_seconds = (
             int(timeout_seconds) if timeout_seconds else DEFAULT_TIMEOUT_SECONDS
         )
         max_retries = os.environ.get("GOOGLE_GEMINI_MAX_RETRIES", "").strip()
         self.max_retries = int(max_retries) if max_retries else DEFAULT_MAX_RETRIES
+        self.chunk_tokens = resolve_chunk_tokens(chunk_tokens)
+        chunk_workers = os.environ.get("GOOGLE_GEMINI_CHUNK_WORKERS", "").strip()
+        self.chunk_workers = (
+            int(chunk_workers) if chunk_workers else DEFAULT_CHUNK_WORKERS
+        )
         self.model = model
         self.temperature = temperature
+        self.memory = memory
+        self._setup_transport(workers)
+        self.hedge = hedge or HedgePolicy.from_env()
+        self.hedges_sent = 0
+        self.hedges_won = 0
+        self._latencies: deque[float] = deque(maxlen=200)
+        self._stats_lock = threading.Lock()
+        # Tokens and request time of the whole run
+        self.usage = UsageTally()
+
+    def _setup_transport(self, workers: int) -> None:
+        # One keep-alive pool shared by every thread: `workers` callers, each
+        # running its body chunks and front matter request concurrently.
+        # Sessions are per thread (cookies and settings are not thread-safe),
+        # the adapter holding the connections is shared.
+        pool_size = max(1, workers) * (self.chunk_workers + 1)
+        self._adapter = HTTPAdapter(pool_maxsize=pool_size)
+        self._local = threading.local()
+        # In-flight requests start at the worker count (or one article's
+        # chunks) and adapt to the quota from there
+        self.limiter = AdaptiveLimiter(
+            max(workers, self.chunk_workers), maximum=pool_size
+        )
+
+    def _session(self) -> requests.Session:
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.mount("https://", self._adapter)
+            session.mount("http://", self._adapter)
+            self._local.session = session
+        return session
+
+    def connection_stats(self) -> dict[str, int]:
+        """Requests sent and TCP/TLS connections opened through the pool."""
+        container = self._adapter.poolmanager.pools
+        # RecentlyUsedContainer cannot be iterated directly
+        keys = container.keys()
+        pools = [container[key] for key in keys]
+        return {
+            "requests": sum(pool.num_requests for pool in pools),
+            "connections": sum(pool.num_connections for pool in pools),
+        }
+
+    def close(self) -> None:
+        self._adapter.close()
 
-    def _build_endpoint(self) -> str:
-        return f"{self.base_url}/{self.api_version}/models/{self.model}:generateContent"
+    def _build_endpoint(self, model: str | None = None) -> str:
+        model = model or self.model
+        if self.stream:
+            return (
+                f"{self.base_url}/{self.api_version}/models/{model}"
+                ":streamGenerateContent?alt=sse"
+            )
+        return f"{self.base_url}/{self.api_version}/models/{model}:generateContent"
 
-    def _generate(self, prompt: str, *, system_instruction: str) -> str:
+    def _generate(
+        self,
+        prompt: str,
+        *,
+        system_instruction: str,
+        response_schema: dict[str, Any] | None = None,
+        on_text: Callable[[str], None] | None = None,
+        check: Callable[[str], Any] | None = None,
+        usage: UsageTally | None = None,
+        priority: float = 0.0,
+    ) -> str:
+        """Send one request and return the response text. In stream mode,
+        `on_text` is called with the text received so far after every event
+        (not while hedging, where the winner is only known at the end).
+        `check` is called with the complete text of every attempt; a
+        MalformedResponse from it is retried, in both modes.
+        Tokens and latency are added to `usage` as well as the run totals;
+        `priority` orders the request in the limiter's queue."""
+        body = self._request_body(prompt, system_instruction, response_schema)
+        if self.hedge is None:
+            return self._generate_with_retries(
+                self.model,
+                body,
+                on_text=on_text,
+                check=check,
+                usage=usage,
+                priority=priority,
+            )
+        return self._generate_hedged(body, check, usage, priority)
+
+    def _request_body(
+        self,
+        prompt: str,
+        system_instruction: str,
+        response_schema: dict[str, Any] | None,
+    ) -> dict[str, Any]:
         generation_config: dict[str, Any] = {
             "temperature": self.temperature,
             "thinkingConfig": {
                 "includeThoughts": self.include_thoughts,
             },
         }
+        if response_schema is not None:
+            generation_config["responseMimeType"] = "application/json"
+            generation_config["responseSchema"] = response_schema
         if self.thinking_budget is not None:
             generation_config["thinkingConfig"]["thinkingBudget"] = self.thinking_budget
+        return {
+            "generationConfig": generation_config,
+            "systemInstruction": {
+                "parts": [{"text": system_instruction}],
+            },
+            "contents": [
+                {
+                    "role": "user",
+                    "parts": [{"text": prompt}],
+                }
+            ],
+        }
+
+    def _hedge_delay(self) -> float:
+        with self._stats_lock:
+            latencies = sorted(self._latencies)
+        if len(latencies) < self.hedge.min_samples:
+            return self.hedge.initial_delay
+        rank = math.ceil(self.hedge.percentile / 100 * len(latencies))
+        return latencies[min(len(latencies), max(1, rank)) - 1]
+
+    def _take_hedge(self) -> bool:
+        with self._stats_lock:
+            if self.hedges_sent >= self.hedge.max_hedges:
+                return False
+            self.hedges_sent += 1
+            return True
+
+    def _generate_hedged(
+        self,
+        body: dict[str, Any],
+        check: Callable[[str], Any] | None = None,
+        usage: UsageTally | None = None,
+        priority: float = 0.0,
+    ) -> str:
+        """Race the request against a delayed duplicate.
+
+        The loser is cancelled cooperatively: it never starts if it is still
+        waiting for the limiter, stops retrying, and its response is dropped.
+        """
+        primary_cancel = threading.Event()
+        executor = ThreadPoolExecutor(max_workers=2)
+        try:
+            primary = executor.submit(
+                self._generate_with_retries,
+                self.model,
+                body,
+                primary_cancel,
+                check=check,
+                usage=usage,
+                priority=priority,
+            )
+            delay = self._hedge_delay()
+            done, _ = wait([primary], timeout=delay)
+            if done or not self._take_hedge():
+                return primary.result()
+
+            model = self.hedge.fallback_model or self.model
+            print(
+                f"[gemini] hedging after {delay:.1f}s with model={model}",
+                flush=True,
+            )
+            hedge_cancel = threading.Event()
+            hedge = executor.submit(
+                self._generate_with_retries,
+                model,
+                body,
+                hedge_cancel,
+                hedge=True,
+                check=check,
+                usage=usage,
+            )
+            cancels = {primary: primary_cancel, hedge: hedge_cancel}
+            pending = set(cancels)
+            error: Exception | None = None
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    try:
+                        text = future.result()
+                    except (
+                        RuntimeError,
+                        requests.RequestException,
+                        RequestCancelled,
+                    ) as exc:
+                        error = exc
+                        continue
+                    for loser in pending:
+                        cancels[loser].set()
+                    if future is hedge:
+                        with self._stats_lock:
+                            self.hedges_won += 1
+                    return text
+            raise error
+        finally:
+            executor.shutdown(wait=False)
+
+    def _generate_with_retries(
+        self,
+        model: str,
+        body: dict[str, Any],
+        cancel: threading.Event | None = None,
+        *,
+        hedge: bool = False,
+        on_text: Callable[[str], None] | None = None,
+        check: Callable[[str], Any] | None = None,
+        usage: UsageTally | None = None,
+        priority: float = 0.0,
+    ) -> str:
         last_error: Exception | None = None
         response: requests.Response | None = None
+        payload: dict[str, Any] = {}
+        text = ""
         for attempt in range(1, self.max_retries + 1):
             print(
-                f"[gemini] request model={self.model} attempt={attempt}/{self.max_retries}",
+                f"[gemini] request model={model} attempt={attempt}/{self.max_retries}",
                 flush=True,
             )
+            # A hedge exists to cut a tail, so it does not queue for a slot;
+            # max_hedges bounds how far it can push past the limit
+            self.limiter.acquire(block=not hedge, priority=priority)
+            throttled = True
+            retry_after: float | None = None
+            started_at = time.monotonic()
             try:
-                response = requests.post(
-                    self._build_endpoint(),
+                if cancel is not None and cancel.is_set():
+                    throttled = False
+                    raise RequestCancelled(model)
+                response = self._session().post(
+                    self._build_endpoint(model),
                     headers={
                         "x-goog-api-key": self.api_key,
                         "content-type": "application/json",
                     },
-                    json={
-                        "generationConfig": generation_config,
-                        "systemInstruction": {
-                            "parts": [{"text": system_instruction}],
-                        },
-                        "contents": [
-                            {
-                                "role": "user",
-                                "parts": [{"text": prompt}],
-                            }
-                        ],
-                    },
+                    json=body,
                     timeout=self.timeout_seconds,
+                    stream=self.stream,
                 )
                 if response.ok:
+                    throttled = False
+                    if self.stream:
+                        text, metadata = self._read_stream(
+                            response, model, started_at, cancel, on_text
+                        )
+                    else:
+                        payload = response.json()
+                        text = response_text(payload)
+                        metadata = payload.get("usageMetadata") or {}
+                    latency = time.monotonic() - started_at
+                    with self._stats_lock:
+                        self._latencies.append(latency)
+                    self._record_usage(metadata, latency, usage)
+                    if check is not None and text.strip():
+                        check(text.strip())
                     break
-                if response.status_code not in {408, 429, 500, 502, 503, 504}:
+                if response.status_code not in RETRYABLE_STATUS_CODES:
+                    throttled = False
                     raise RuntimeError(
                         f"Gemini request failed with {response.status_code}: {response.text}"
                     )
                 print(
-                    f"[gemini] retryable status={response.status_code} model={self.model}",
+                    f"[gemini] retryable status={response.status_code} model={model}",
                     flush=True,
                 )
+                retry_after = parse_retry_after(response.headers, response.text)
                 last_error = RuntimeError(
                     f"Gemini request failed with {response.status_code}: {response.text}"
                 )
+            except MalformedResponse as exc:
+                print(
+                    f"[gemini] malformed response model={model}: {exc}",
+                    flush=True,
+                )
+                last_error = exc
             except requests.RequestException as exc:
                 print(
-                    f"[gemini] request error model={self.model}: {exc}",
+                    f"[gemini] request error model={model}: {exc}",
                     flush=True,
                 )
                 last_error = exc
+            finally:
+                self.limiter.release(throttled=throttled, retry_after=retry_after)
 
             if attempt == self.max_retries:
                 if last_error is not None:
@@ -201,7 +1311,11 @@ class GeminiTranslator:
                         f"Gemini request failed after {self.max_retries} attempts: {last_error}"
                     ) from last_error
                 raise RuntimeError("Gemini request failed without a response.")
-            time.sleep(min(2**attempt, 10))
+            backoff = min(2**attempt, 10)
+            if cancel is None:
+                time.sleep(backoff)
+            elif cancel.wait(backoff):
+                raise RequestCancelled(model)
 
         if response is None or not response.ok:
             if last_error is not None:
@@ -210,72 +1324,205 @@ class GeminiTranslator:
                 ) from last_error
             raise RuntimeError("Gemini request failed without a response.")
 
-        payload = response.json()
-        candidates = payload.get("candidates") or []
-        parts = []
-        if candidates:
-            content = candidates[0].get("content") or {}
-            parts = content.get("parts") or []
-        text = "".join(part.get("text", "") for part in parts).strip()
+        if cancel is not None and cancel.is_set():
+            raise RequestCancelled(model)
+        if self.stream:
+            if not text.strip():
+                raise RuntimeError("Gemini returned an empty stream.")
+            return text.strip()
+        text = text.strip()
         if not text:
             raise RuntimeError(f"Gemini returned an empty response: {payload}")
         return text
 
-    def translate_text(self, text: str, options: TranslationOptions) -> str:
+    def _record_usage(
+        self, metadata: Mapping[str, Any], latency: float, usage: UsageTally | None
+    ) -> None:
+        self.usage.add(metadata, latency)
+        if usage is not None:
+            usage.add(metadata, latency)
+
+    def _read_stream(
+        self,
+        response: requests.Response,
+        model: str,
+        started_at: float,
+        cancel: threading.Event | None,
+        on_text: Callable[[str], None] | None,
+    ) -> tuple[str, dict[str, Any]]:
+        """Accumulate the text of a server-sent event stream, reporting the
+        time to first byte and checking the output's shape as it arrives.
+        Returns the text and the usageMetadata of the last event carrying it."""
+        response.encoding = "utf-8"
+        text = ""
+        metadata: dict[str, Any] = {}
+        first_event = True
+        try:
+            for line in response.iter_lines(decode_unicode=True):
+                if cancel is not None and cancel.is_set():
+                    raise RequestCancelled(model)
+                payload = sse_payload(line)
+                if payload is None:
+                    continue
+                metadata = payload.get("usageMetadata") or metadata
+                delta = response_text(payload)
+                if first_event:
+                    first_event = False
+                    print(
+                        f"[gemini] first byte after "
+                        f"{time.monotonic() - started_at:.2f}s model={model}",
+                        flush=True,
+                    )
+                text += delta
+                check_stream_text(text)
+                if on_text is not None:
+                    on_text(text)
+        finally:
+            response.close()
+        return text, metadata
+
+    def translate_text(
+        self,
+        text: str,
+        options: TranslationOptions,
+        on_text: Callable[[str], None] | None = None,
+        usage: UsageTally | None = None,
+        priority: float = 0.0,
+        check: Callable[[str], Any] | None = None,
+    ) -> str:
         if not text.strip():
             return text
+        prompt, system_instruction = build_translation_prompt(text, options)
+        return self._generate(
+            prompt,
+            system_instruction=system_instruction,
+            on_text=on_text,
+            check=check,
+            usage=usage,
+            priority=priority,
+        )
 
-        if options.markdown:
-            prompt = (
-                f"Source language: {options.source_lang}\n"
-                f"Target language: {options.target_lang}\n\n"
-                "Translate the following Markdown and return only the translated Markdown:\n\n"
-                f"{text}"
-            )
-            return self._generate(
-                prompt, system_instruction=MARKDOWN_SYSTEM_INSTRUCTION
-            )
+    def translate_segments(
+        self,
+        body: str,
+        options: TranslationOptions,
+        on_segment: Callable[[int, Segment], None] | None = None,
+        usage: UsageTally | None = None,
+    ) -> str:
+        """Translate a Markdown body segment by segment, reusing translations
+        from the memory and sending only new or changed segments. Code and
+        URLs are masked with placeholders and never sent. Long bodies are
+        split into chunks of about `chunk_tokens` tokens, translated
+        concurrently and stitched back in order.
 
-        prompt = (
-            f"Source language: {options.source_lang}\n"
-            f"Target language: {options.target_lang}\n\n"
-            "Translate the following text:\n\n"
-            f"{text}"
+        `on_segment` is called with each translated segment as soon as it is
+        known; in stream mode that is while the response is still arriving.
+        """
+        plan = self._plan_segments(body, options, on_segment)
+        if plan.pending:
+            chunks = self._plan_chunks(plan)
+            chunk_options = self._chunk_options(options)
+
+            def translate_chunk(chunk: dict[int, str], priority: int) -> None:
+                def on_text(partial: str) -> None:
+                    for index, text in plan.partial(chunk, partial).items():
+                        on_segment(index, plan.segment(index, text))
+
+                response = self.translate_text(
+                    plan.prompt(chunk),
+                    chunk_options,
+                    on_text=on_text if on_segment is not None else None,
+                    usage=usage,
+                    priority=priority,
+                    check=lambda text: plan.parse(chunk, text),
+                )
+                self._finish_chunk(plan, chunk, response, on_segment)
+
+            workers = max(1, min(self.chunk_workers, len(chunks)))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                list(
+                    executor.map(translate_chunk, chunks, chunk_priorities(len(chunks)))
+                )
+        return plan.join()
+
+    def _plan_segments(
+        self,
+        body: str,
+        options: TranslationOptions,
+        on_segment: Callable[[int, Segment], None] | None,
+    ) -> SegmentPlan:
+        plan = plan_segments(
+            body, model=self.model, target_lang=options.target_lang, memory=self.memory
         )
-        return self._generate(prompt, system_instruction=TEXT_SYSTEM_INSTRUCTION)
+        if on_segment is not None:
+            for index, text in plan.translated.items():
+                on_segment(index, plan.segment(index, text))
+        return plan
 
-    def translate_value(self, value: Any, *, source_lang: str, target_lang: str) -> Any:
-        if isinstance(value, str):
-            return self.translate_text(
-                value,
-                TranslationOptions(
-                    source_lang=source_lang,
-                    target_lang=target_lang,
-                    model=self.model,
-                    temperature=self.temperature,
-                    markdown=False,
-                ),
-            )
-        if isinstance(value, list):
-            translated_items: list[Any] = []
-            for item in value:
-                if isinstance(item, str):
-                    translated_items.append(
-                        self.translate_text(
-                            item,
-                            TranslationOptions(
-                                source_lang=source_lang,
-                                target_lang=target_lang,
-                                model=self.model,
-                                temperature=self.temperature,
-                                markdown=False,
-                            ),
-                        )
-                    )
-                else:
-                    translated_items.append(item)
-            return translated_items
-        return value
+    def _plan_chunks(self, plan: SegmentPlan) -> list[dict[int, str]]:
+        chunks = chunk_segments(plan.pending, self.chunk_tokens)
+        print(
+            f"[gemini] translating {len(plan.pending)}/{len(plan.keys)} segments "
+            f"in {len(chunks)} chunks",
+            flush=True,
+        )
+        # Largest first: with more chunks than chunk workers (or limiter
+        # slots), a big chunk queued last would finish the document alone
+        return sorted(
+            chunks,
+            key=lambda chunk: sum(estimate_tokens(text) for text in chunk.values()),
+            reverse=True,
+        )
+
+    def _chunk_options(self, options: TranslationOptions) -> TranslationOptions:
+        return TranslationOptions(
+            source_lang=options.source_lang,
+            target_lang=options.target_lang,
+            model=self.model,
+            temperature=self.temperature,
+            markdown=True,
+        )
+
+    def _finish_chunk(
+        self,
+        plan: SegmentPlan,
+        chunk: dict[int, str],
+        response: str,
+        on_segment: Callable[[int, Segment], None] | None,
+    ) -> None:
+        fresh = plan.finish(chunk, response)
+        if on_segment is not None:
+            for index, text in fresh.items():
+                on_segment(index, plan.segment(index, text))
+        # Saved per chunk, so a retry only resends the chunks that failed
+        if self.memory is not None:
+            self.memory.put_many({plan.keys[index]: fresh[index] for index in fresh})
+
+    def translate_front_matter(
+        self,
+        metadata: dict[str, Any],
+        keys: tuple[str, ...],
+        *,
+        source_lang: str,
+        target_lang: str,
+        usage: UsageTally | None = None,
+    ) -> dict[str, Any]:
+        """Translate the string values (and string list items) of `keys` in
+        one JSON request constrained by a response schema."""
+        fields = front_matter_fields(metadata, keys)
+        if not fields:
+            return dict(metadata)
+        prompt, schema = build_front_matter_request(
+            fields, source_lang=source_lang, target_lang=target_lang
+        )
+        response = self._generate(
+            prompt,
+            system_instruction=FRONT_MATTER_SYSTEM_INSTRUCTION,
+            response_schema=schema,
+            usage=usage,
+            priority=FRONT_MATTER_PRIORITY,
+        )
+        return merge_front_matter(metadata, fields, response)
 
     def translate_markdown_document(
         self,
@@ -284,34 +1531,47 @@ class GeminiTranslator:
         source_lang: str,
         target_lang: str,
         front_matter_keys: tuple[str, ...] = DEFAULT_FRONT_MATTER_KEYS,
+        writer: ProgressiveWriter | None = None,
+        usage: UsageTally | None = None,
     ) -> str:
         metadata, body, has_front_matter = extract_front_matter(markdown_text)
-        translated_body = self.translate_text(
-            body,
-            TranslationOptions(
+        # The front matter request runs alongside the body chunks
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            front_matter = executor.submit(
+                self.translate_front_matter,
+                metadata if has_front_matter else {},
+                front_matter_keys,
                 source_lang=source_lang,
                 target_lang=target_lang,
-                model=self.model,
-                temperature=self.temperature,
-                markdown=True,
-            ),
-        )
-        if target_lang.strip().lower().startswith("english"):
-            translated_body = prepend_notice(
-                translated_body, build_english_ai_translation_notice(self.model)
+                usage=usage,
             )
-        if not has_front_matter:
-            return translated_body
-
-        translated_metadata = dict(metadata)
-        for key in front_matter_keys:
-            if key in translated_metadata:
-                translated_metadata[key] = self.translate_value(
-                    translated_metadata[key],
+            translated_body = self.translate_segments(
+                body,
+                TranslationOptions(
                     source_lang=source_lang,
                     target_lang=target_lang,
-                )
-        return render_front_matter(translated_metadata, translated_body)
+                    model=self.model,
+                    temperature=self.temperature,
+                    markdown=True,
+                ),
+                on_segment=writer.add if writer is not None else None,
+                usage=usage,
+            )
+            translated_metadata = front_matter.result()
+        return self._assemble_document(
+            translated_body,
+            translated_metadata if has_front_matter else None,
+            target_lang=target_lang,
+        )
+
+    def _assemble_document(
+        self, body: str, metadata: dict[str, Any] | None, *, target_lang: str
+    ) -> str:
+        if target_lang.strip().lower().startswith("english"):
+            body = prepend_notice(body, build_english_ai_translation_notice(self.model))
+        if metadata is None:
+            return body
+        return render_front_matter(metadata, body)
 
 
 def load_input(text: str | None, file_path: str) -> tuple[str, Path | None]:
@@ -392,11 +1652,39 @@ def build_parser() -> argparse.ArgumentParser:
         default=[],
         help="Front matter key to translate for Markdown files. Can be repeated.",
     )
+    parser.add_argument(
+        "--memory",
+        default=str(DEFAULT_MEMORY_PATH),
+        help="Translation memory file for Markdown segments.",
+    )
+    parser.add_argument(
+        "--no-memory",
+        action="store_true",
+        help="Translate every Markdown segment, ignoring the translation memory.",
+    )
     parser.add_argument(
         "--no-front-matter",
         action="store_true",
         help="Do not translate front matter values, only the Markdown body.",
     )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        default=None,
+        help=(
+            "Use streamGenerateContent (SSE) and write output progressively. "
+            "Default: GOOGLE_GEMINI_STREAM."
+        ),
+    )
+    parser.add_argument(
+        "--chunk-tokens",
+        type=int,
+        default=None,
+        help=(
+            "Approximate token budget per request for long Markdown bodies. "
+            f"Default: GOOGLE_GEMINI_CHUNK_TOKENS or {DEFAULT_CHUNK_TOKENS}."
+        ),
+    )
     return parser
 
 
@@ -411,7 +1699,14 @@ def main() -> None:
         raise RuntimeError("--in-place cannot be combined with --output.")
 
     markdown_mode = infer_markdown(input_path, args.markdown)
-    translator = GeminiTranslator(model=args.model, temperature=args.temperature)
+    memory = None if args.no_memory else TranslationMemory(Path(args.memory))
+    translator = GeminiTranslator(
+        model=args.model,
+        temperature=args.temperature,
+        memory=memory,
+        chunk_tokens=args.chunk_tokens,
+        stream=args.stream,
+    )
 
     if markdown_mode:
         if args.no_front_matter:
@@ -1,15 +1,34 @@
 import argparse
+import asyncio
+import heapq
+import json
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import shutil
+import statistics
 import subprocess
+import threading
 import time
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import UTC, datetime
 from pathlib import Path
+from typing import Any
 from zoneinfo import ZoneInfo
 
 from rewrite_en_article_links import collect_article_ids, rewrite_article_links
-from translate import GeminiTranslator, extract_front_matter, render_front_matter
+from translate import (
+    DEFAULT_CHUNK_TOKENS,
+    DEFAULT_MEMORY_PATH,
+    GeminiTranslator,
+    HedgePolicy,
+    ProgressiveWriter,
+    TranslationMemory,
+    UsageTally,
+    estimate_document_usage,
+    estimate_tokens,
+    extract_front_matter,
+    render_front_matter,
+)
+from translate_async import TRANSPORT_ERRORS, AsyncGeminiTranslator
 
 _TZ_SHANGHAI = ZoneInfo("Asia/Shanghai")
 _TZ_NEW_YORK = ZoneInfo("America/New_York")
@@ -36,10 +55,23 @@ def convert_dates_to_new_york(markdown_text: str) -> str:
     return render_front_matter(metadata, body)
 
 
+def postprocess_translation(
+    translated: str, *, target_lang: str, known_article_ids: set[str]
+) -> tuple[str, int]:
+    """Point article links of an English translation at the English articles
+    and move its dates to New York time; return the text and links rewritten."""
+    if not target_lang.strip().lower().startswith("english"):
+        return translated, 0
+    translated, rewritten_links = rewrite_article_links(translated, known_article_ids)
+    return convert_dates_to_new_york(translated), rewritten_links
+
+
 REPO_ROOT = Path(__file__).resolve().parents[1]
 DEFAULT_SOURCE_ROOT = REPO_ROOT / "website/content/zh-cn/articles"
 DEFAULT_TARGET_ROOT = REPO_ROOT / "website/content/en/articles"
 DEFAULT_WORKERS = 8
+DEFAULT_RUN_LOG_PATH = REPO_ROOT / ".cache" / "translation-runs.jsonl"
+DEFAULT_JOURNAL_PATH = REPO_ROOT / ".cache" / "translation-journal"
 ZERO_SHA = "0" * 40
 
 
@@ -152,6 +184,212 @@ def sync_asset(change: FileChange, source_root: Path, target_root: Path) -> None
     print(f"copied asset: {change.relative_path.as_posix()}", flush=True)
 
 
+class RunLog:
+    """Append-only JSON lines log of translation runs: one record per article
+    and one for the whole run, with the tokens and time each one took."""
+
+    def __init__(self, path: Path = DEFAULT_RUN_LOG_PATH):
+        self.path = path
+
+    def append(self, records: list[dict[str, Any]]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a", encoding="utf-8") as handle:
+            for record in records:
+                handle.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def seconds_per_token(self) -> dict[str, float]:
+        """Wall seconds per token sent (prompt and output) for each article,
+        from its latest successful run."""
+        rates: dict[str, float] = {}
+        if not self.path.exists():
+            return rates
+        for line in self.path.read_text(encoding="utf-8").splitlines():
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if record.get("kind") != "article" or record.get("status") != "ok":
+                continue
+            tokens = record.get("prompt_tokens", 0) + record.get("output_tokens", 0)
+            if tokens and record.get("elapsed"):
+                rates[record["article"]] = record["elapsed"] / tokens
+        return rates
+
+
+class JobJournal:
+    """Persistent state of article translation jobs.
+
+    A job is keyed by its target path and a hash of its source (with the
+    model, target language and prompt version, like translation memory
+    keys). `jobs.jsonl` holds the latest state of each target: pending from
+    the start of a run, then done or failed. The translation of every
+    finished job is kept under `translations/`, as Gemini returned it: an
+    identical job is restored from there rather than sent again, even into a
+    fresh checkout, and its links are rewritten against the articles that
+    exist at that point. Whatever a crash or timeout left pending or failed
+    can be picked up with --resume.
+    """
+
+    def __init__(self, path: Path = DEFAULT_JOURNAL_PATH):
+        self.path = path
+        self.jobs: dict[str, dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        if self.log_path.exists():
+            for line in self.log_path.read_text(encoding="utf-8").splitlines():
+                if line.strip():
+                    record = json.loads(line)
+                    self.jobs[record["target"]] = record
+
+    @property
+    def log_path(self) -> Path:
+        return self.path / "jobs.jsonl"
+
+    def output_path(self, key: str) -> Path:
+        return self.path / "translations" / f"{key}.md"
+
+    @staticmethod
+    def key(source_text: str, *, model: str, target_lang: str) -> str:
+        return TranslationMemory.key(source_text, model=model, target_lang=target_lang)
+
+    @staticmethod
+    def target_name(target_path: Path) -> str:
+        return target_path.relative_to(REPO_ROOT).as_posix()
+
+    def finished_output(self, target_path: Path, key: str) -> str | None:
+        """The translation of the job that last translated this same source
+        into `target_path`, if it finished."""
+        record = self.jobs.get(self.target_name(target_path))
+        if record is None or record["status"] != "done" or record["key"] != key:
+            return None
+        output_path = self.output_path(key)
+        if not output_path.exists():
+            return None
+        return output_path.read_text(encoding="utf-8")
+
+    def unfinished(self, target_root: Path) -> list[Path]:
+        """Articles under `target_root` whose last job is pending or failed."""
+        return sorted(
+            Path(record["article"])
+            for target, record in self.jobs.items()
+            if record["status"] in {"pending", "failed"}
+            and target == self.target_name(target_root / record["article"])
+        )
+
+    def record(
+        self,
+        entries: list[tuple[Path, Path, str]],
+        status: str,
+        *,
+        error: str | None = None,
+    ) -> None:
+        """Set the status of the jobs (article, target path, key) in `entries`."""
+        now = datetime.now(UTC).isoformat(timespec="seconds")
+        with self._lock:
+            self.path.mkdir(parents=True, exist_ok=True)
+            with self.log_path.open("a", encoding="utf-8") as handle:
+                for article, target_path, key in entries:
+                    record = {
+                        "target": self.target_name(target_path),
+                        "article": article.as_posix(),
+                        "key": key,
+                        "status": status,
+                        "time": now,
+                    }
+                    if error is not None:
+                        record["error"] = error
+                    self.jobs[record["target"]] = record
+                    handle.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def finish(
+        self, article: Path, target_path: Path, key: str, translated: str
+    ) -> None:
+        output_path = self.output_path(key)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = output_path.with_suffix(".partial")
+        temp_path.write_text(translated, encoding="utf-8")
+        temp_path.replace(output_path)
+        self.record([(article, target_path, key)], "done")
+
+
+def reuse_finished_jobs(
+    relative_paths: list[Path],
+    source_root: Path,
+    target_root: Path,
+    journal: JobJournal,
+    *,
+    model: str,
+    target_lang: str,
+    known_article_ids: set[str],
+    dry_run: bool,
+) -> dict[Path, str]:
+    """Skip (or restore) the articles the journal has already translated from
+    the same source; return the job keys of the ones left to translate."""
+    remaining: dict[Path, str] = {}
+    for relative_path in sorted(relative_paths):
+        source_text = (source_root / relative_path).read_text(encoding="utf-8")
+        key = JobJournal.key(source_text, model=model, target_lang=target_lang)
+        target_path = target_root / relative_path
+        translated = journal.finished_output(target_path, key)
+        if translated is None:
+            remaining[relative_path] = key
+            continue
+        output, _ = postprocess_translation(
+            translated, target_lang=target_lang, known_article_ids=known_article_ids
+        )
+        if target_path.exists() and target_path.read_text(encoding="utf-8") == output:
+            print(
+                f"[journal] skip {relative_path.as_posix()}: "
+                "already translated from this source",
+                flush=True,
+            )
+            continue
+        if dry_run:
+            print(
+                f"[dry-run] restore {relative_path.as_posix()} from the journal",
+                flush=True,
+            )
+            continue
+        ProgressiveWriter(target_path).commit(output)
+        print(
+            f"[journal] restored {relative_path.as_posix()}: "
+            "translated from this source before",
+            flush=True,
+        )
+    return remaining
+
+
+def predict_makespan(durations: list[float], workers: int) -> float:
+    """Finish time of running `durations` in order, each one on the first
+    worker to become free."""
+    free_at = [0.0] * max(1, workers)
+    for duration in durations:
+        heapq.heappush(free_at, heapq.heappop(free_at) + duration)
+    return max(free_at)
+
+
+def print_usage_table(
+    prefix: str,
+    rows: dict[str, tuple[UsageTally, float | None]],
+    total: UsageTally,
+    elapsed: float | None,
+) -> None:
+    """Print tokens and time per article, most expensive first."""
+    width = max(len("article"), *(len(name) for name in rows))
+    print(
+        f"{prefix} {'article':<{width}} {'requests':>8} {'prompt':>9} {'output':>9} "
+        f"{'thinking':>9} {'request s':>9} {'elapsed s':>9}",
+        flush=True,
+    )
+    ordered = sorted(rows.items(), key=lambda row: row[1][0].total_tokens, reverse=True)
+    for name, (usage, seconds) in [*ordered, ("total", (total, elapsed))]:
+        print(
+            f"{prefix} {name:<{width}} {usage.requests:>8} {usage.prompt_tokens:>9} "
+            f"{usage.output_tokens:>9} {usage.thinking_tokens:>9} "
+            f"{usage.latency:>9.1f} "
+            f"{'-' if seconds is None else f'{seconds:.1f}':>9}",
+            flush=True,
+        )
+
+
 def translate_markdown_files(
     relative_paths: list[Path],
     source_root: Path,
@@ -163,69 +401,327 @@ def translate_markdown_files(
     temperature: float,
     workers: int,
     dry_run: bool,
+    memory: TranslationMemory | None = None,
+    chunk_tokens: int | None = None,
+    hedge: HedgePolicy | None = None,
+    stream: bool | None = None,
+    engine: str = "threads",
+    estimate: bool = False,
+    run_log: RunLog | None = None,
+    journal: JobJournal | None = None,
 ) -> None:
+    known_article_ids = collect_article_ids(source_root)
+    if journal is not None:
+        job_keys = reuse_finished_jobs(
+            relative_paths,
+            source_root,
+            target_root,
+            journal,
+            model=model,
+            target_lang=target_lang,
+            known_article_ids=known_article_ids,
+            dry_run=dry_run,
+        )
+        relative_paths = list(job_keys)
     if not relative_paths:
         return
 
     total = len(relative_paths)
     if dry_run:
+        estimates: dict[str, tuple[UsageTally, float | None]] = {}
+        estimated_total = UsageTally()
         for index, relative_path in enumerate(sorted(relative_paths), start=1):
             target_path = target_root / relative_path
             print(
                 f"[dry-run {index}/{total}] translate {relative_path.as_posix()} -> {target_path.relative_to(REPO_ROOT).as_posix()}",
                 flush=True,
             )
+            if not estimate:
+                continue
+            usage = estimate_document_usage(
+                (source_root / relative_path).read_text(encoding="utf-8"),
+                source_lang=source_lang,
+                target_lang=target_lang,
+                model=model,
+                chunk_tokens=chunk_tokens,
+                memory=memory,
+            )
+            estimates[relative_path.as_posix()] = (usage, None)
+            estimated_total.merge(usage)
+        if estimate:
+            print_usage_table("[estimate]", estimates, estimated_total, None)
         return
 
-    known_article_ids = collect_article_ids(source_root)
-
-    def translate_one(index: int, relative_path: Path) -> str:
-        source_path = source_root / relative_path
-        target_path = target_root / relative_path
-        started_at = time.monotonic()
+    translator_options = {
+        "model": model,
+        "temperature": temperature,
+        "memory": memory,
+        "chunk_tokens": chunk_tokens,
+        "workers": workers,
+        "hedge": hedge,
+        "stream": stream,
+    }
+    # Longest processing time first: the article expected to take longest
+    # starts first, so that it does not end up running alone at the end.
+    # Its cost is the tokens it still has to send (after the translation
+    # memory) times the seconds per token it took last time, or the median
+    # over all articles when it has no history yet
+    work = {
+        relative_path: estimate_document_usage(
+            (source_root / relative_path).read_text(encoding="utf-8"),
+            source_lang=source_lang,
+            target_lang=target_lang,
+            model=model,
+            chunk_tokens=chunk_tokens,
+            memory=memory,
+        )
+        for relative_path in relative_paths
+    }
+    tokens = {
+        relative_path: usage.prompt_tokens + usage.output_tokens
+        for relative_path, usage in work.items()
+    }
+    history = run_log.seconds_per_token() if run_log is not None else {}
+    predicted: dict[Path, float] = {}
+    if history:
+        default_rate = statistics.median(history.values())
+        predicted = {
+            relative_path: count * history.get(relative_path.as_posix(), default_rate)
+            for relative_path, count in tokens.items()
+        }
+    costs = predicted or tokens
+    sorted_paths = sorted(
+        relative_paths, key=lambda relative_path: (-costs[relative_path], relative_path)
+    )
+    if predicted:
+        predicted_makespan = predict_makespan(
+            [predicted[relative_path] for relative_path in sorted_paths], workers
+        )
+        path_order_makespan = predict_makespan(
+            [predicted[relative_path] for relative_path in sorted(relative_paths)],
+            workers,
+        )
         print(
-            f"[start {index}/{total}] translating {relative_path.as_posix()}",
+            f"[schedule] largest first: predicted makespan {predicted_makespan:.1f}s "
+            f"on {workers} workers ({path_order_makespan:.1f}s in path order)",
             flush=True,
         )
-        translator = GeminiTranslator(model=model, temperature=temperature)
-        markdown_text = source_path.read_text(encoding="utf-8")
-        translated = translator.translate_markdown_document(
-            markdown_text,
-            source_lang=source_lang,
-            target_lang=target_lang,
+    else:
+        print(
+            "[schedule] largest first by estimated tokens "
+            "(no run history to predict durations yet)",
+            flush=True,
         )
-        if target_lang.strip().lower().startswith("english"):
-            translated, rewritten_links = rewrite_article_links(
-                translated, known_article_ids
-            )
-            translated = convert_dates_to_new_york(translated)
-        else:
-            rewritten_links = 0
-        target_path.parent.mkdir(parents=True, exist_ok=True)
-        target_path.write_text(translated, encoding="utf-8")
-        elapsed = time.monotonic() - started_at
+    usages = {relative_path: UsageTally() for relative_path in sorted_paths}
+    durations: dict[Path, float] = {}
+    failed_paths: set[Path] = set()
+    run_started_at = time.monotonic()
+    run_id = datetime.now(UTC).strftime("%Y%m%dT%H%M%SZ")
+
+    def postprocess(translated: str) -> tuple[str, int]:
+        return postprocess_translation(
+            translated, target_lang=target_lang, known_article_ids=known_article_ids
+        )
+
+    def start_message(index: int, relative_path: Path) -> str:
+        return f"[start {index}/{total}] translating {relative_path.as_posix()}"
+
+    def done_message(index: int, relative_path: Path, rewritten_links: int) -> str:
+        target_path = target_root / relative_path
         return (
             f"[done {index}/{total}] translated {relative_path.as_posix()} -> "
             f"{target_path.relative_to(REPO_ROOT).as_posix()} "
-            f"(rewrote {rewritten_links} links, {elapsed:.1f}s)"
+            f"(rewrote {rewritten_links} links, {durations[relative_path]:.1f}s)"
+        )
+
+    def job(relative_path: Path) -> tuple[Path, Path, str]:
+        return relative_path, target_root / relative_path, job_keys[relative_path]
+
+    def finish(relative_path: Path, translated: str) -> None:
+        if journal is not None:
+            journal.finish(*job(relative_path), translated)
+
+    def fail_message(index: int, relative_path: Path, exc: BaseException) -> str:
+        failed_paths.add(relative_path)
+        if journal is not None:
+            journal.record([job(relative_path)], "failed", error=str(exc))
+        return f"[fail {index}/{total}] {relative_path.as_posix()}: {exc}"
+
+    # Recorded up front: a run that dies half way leaves its unfinished
+    # articles pending in the journal
+    if journal is not None:
+        journal.record(
+            [job(relative_path) for relative_path in sorted_paths], "pending"
         )
 
     failures: list[str] = []
-    sorted_paths = sorted(relative_paths)
-    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
-        future_map = {
-            executor.submit(translate_one, index, relative_path): (index, relative_path)
-            for index, relative_path in enumerate(sorted_paths, start=1)
-        }
-        for future in as_completed(future_map):
-            index, relative_path = future_map[future]
+    stats: dict[str, int] = {}
+    if engine == "asyncio":
+        # One event loop drives every article; `workers` bounds how many
+        # articles are in flight, the limiter bounds requests across them
+        translator = AsyncGeminiTranslator(**translator_options)
+        articles = asyncio.BoundedSemaphore(max(1, workers))
+
+        async def translate_one_async(index: int, relative_path: Path) -> str:
+            async with articles:
+                started_at = time.monotonic()
+                print(start_message(index, relative_path), flush=True)
+                source_path = source_root / relative_path
+                markdown_text = source_path.read_text(encoding="utf-8")
+                try:
+                    with ProgressiveWriter(target_root / relative_path) as writer:
+                        translated = await translator.translate_markdown_document(
+                            markdown_text,
+                            source_lang=source_lang,
+                            target_lang=target_lang,
+                            writer=writer,
+                            usage=usages[relative_path],
+                        )
+                        output, rewritten_links = postprocess(translated)
+                        writer.commit(output)
+                    finish(relative_path, translated)
+                finally:
+                    durations[relative_path] = time.monotonic() - started_at
+                return done_message(index, relative_path, rewritten_links)
+
+        async def run_one(index: int, relative_path: Path) -> None:
             try:
-                print(future.result(), flush=True)
-            except Exception as exc:
-                message = f"[fail {index}/{total}] {relative_path.as_posix()}: {exc}"
+                print(await translate_one_async(index, relative_path), flush=True)
+            # Failed requests (RuntimeError), transport and file errors, bad
+            # front matter; a cancelled run propagates
+            except (RuntimeError, ValueError, OSError, *TRANSPORT_ERRORS) as exc:
+                message = fail_message(index, relative_path, exc)
                 failures.append(message)
                 print(message, flush=True)
 
+        async def run_all() -> None:
+            try:
+                await asyncio.gather(
+                    *(
+                        run_one(index, relative_path)
+                        for index, relative_path in enumerate(sorted_paths, start=1)
+                    )
+                )
+            finally:
+                stats.update(translator.connection_stats())
+                await translator.close()
+
+        asyncio.run(run_all())
+    else:
+        translator = GeminiTranslator(**translator_options)
+
+        def translate_one(index: int, relative_path: Path) -> str:
+            started_at = time.monotonic()
+            print(start_message(index, relative_path), flush=True)
+            markdown_text = (source_root / relative_path).read_text(encoding="utf-8")
+            # The body is written to a temp file as it is translated; the
+            # target only changes once the whole document is done
+            try:
+                with ProgressiveWriter(target_root / relative_path) as writer:
+                    translated = translator.translate_markdown_document(
+                        markdown_text,
+                        source_lang=source_lang,
+                        target_lang=target_lang,
+                        writer=writer,
+                        usage=usages[relative_path],
+                    )
+                    output, rewritten_links = postprocess(translated)
+                    writer.commit(output)
+                finish(relative_path, translated)
+            finally:
+                durations[relative_path] = time.monotonic() - started_at
+            return done_message(index, relative_path, rewritten_links)
+
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            future_map = {
+                executor.submit(translate_one, index, relative_path): (
+                    index,
+                    relative_path,
+                )
+                for index, relative_path in enumerate(sorted_paths, start=1)
+            }
+            for future in as_completed(future_map):
+                index, relative_path = future_map[future]
+                try:
+                    print(future.result(), flush=True)
+                except Exception as exc:
+                    message = fail_message(index, relative_path, exc)
+                    failures.append(message)
+                    print(message, flush=True)
+        stats.update(translator.connection_stats())
+        translator.close()
+
+    print(
+        f"[http] {stats['requests']} requests over {stats['connections']} connections",
+        flush=True,
+    )
+    limiter = translator.limiter
+    print(
+        f"[limit] concurrency limit {int(limiter.limit)} "
+        f"(lowest {int(limiter.lowest)}, {limiter.throttled} throttled responses)",
+        flush=True,
+    )
+    if translator.hedge is not None:
+        print(
+            f"[hedge] {translator.hedges_sent} hedged requests, "
+            f"{translator.hedges_won} won by the duplicate",
+            flush=True,
+        )
+    if memory is not None:
+        print(
+            f"[memory] {memory.hits} segments reused, {memory.misses} translated",
+            flush=True,
+        )
+    run_elapsed = time.monotonic() - run_started_at
+    if predicted:
+        print(
+            f"[schedule] predicted makespan {predicted_makespan:.1f}s, "
+            f"actual {run_elapsed:.1f}s",
+            flush=True,
+        )
+    print_usage_table(
+        "[usage]",
+        {
+            relative_path.as_posix(): (
+                usages[relative_path],
+                durations.get(relative_path),
+            )
+            for relative_path in sorted_paths
+        },
+        translator.usage,
+        run_elapsed,
+    )
+    if run_log is not None:
+        records = [
+            {
+                "kind": "article",
+                "run": run_id,
+                "article": relative_path.as_posix(),
+                "model": model,
+                "status": "failed" if relative_path in failed_paths else "ok",
+                "source_tokens": estimate_tokens(
+                    (source_root / relative_path).read_text(encoding="utf-8")
+                ),
+                "elapsed": round(durations.get(relative_path, 0.0), 3),
+                **usages[relative_path].as_record(),
+            }
+            for relative_path in sorted_paths
+        ]
+        records.append(
+            {
+                "kind": "run",
+                "run": run_id,
+                "model": model,
+                "engine": engine,
+                "workers": workers,
+                "articles": total,
+                "failed": len(failed_paths),
+                "elapsed": round(run_elapsed, 3),
+                **translator.usage.as_record(),
+            }
+        )
+        run_log.append(records)
+        print(f"[usage] run {run_id} appended to {run_log.path}", flush=True)
     if failures:
         raise RuntimeError(
             "One or more article translations failed:\n" + "\n".join(failures)
@@ -283,23 +779,132 @@ def build_parser() -> argparse.ArgumentParser:
         action="store_true",
         help="Print planned work without writing files or calling Gemini.",
     )
+    parser.add_argument(
+        "--estimate",
+        action="store_true",
+        help=(
+            "With --dry-run, estimate the requests and tokens each article would "
+            "use, counted locally."
+        ),
+    )
     parser.add_argument(
         "--workers",
         type=int,
         default=DEFAULT_WORKERS,
         help=f"Article translation concurrency. Default: {DEFAULT_WORKERS}.",
     )
+    parser.add_argument(
+        "--memory",
+        default=str(DEFAULT_MEMORY_PATH),
+        help="Segment translation memory file. Default: .cache/translation-memory.jsonl",
+    )
+    parser.add_argument(
+        "--no-memory",
+        action="store_true",
+        help="Retranslate every segment instead of reusing the translation memory.",
+    )
+    parser.add_argument(
+        "--chunk-tokens",
+        type=int,
+        default=None,
+        help=(
+            "Approximate token budget per Gemini request; longer articles are "
+            "split and their chunks translated concurrently. "
+            f"Default: GOOGLE_GEMINI_CHUNK_TOKENS or {DEFAULT_CHUNK_TOKENS}."
+        ),
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        default=None,
+        help=(
+            "Stream Gemini responses (SSE), writing each article progressively. "
+            "Default: GOOGLE_GEMINI_STREAM."
+        ),
+    )
+    parser.add_argument(
+        "--hedge-percentile",
+        type=float,
+        default=None,
+        help=(
+            "Send a duplicate request once a request runs longer than this "
+            "latency percentile (e.g. 95). Default: GOOGLE_GEMINI_HEDGE_PERCENTILE "
+            "or no hedging."
+        ),
+    )
+    parser.add_argument(
+        "--hedge-model",
+        default=None,
+        help="Model for duplicate requests. Default: the same model.",
+    )
+    parser.add_argument(
+        "--max-hedges",
+        type=int,
+        default=HedgePolicy.max_hedges,
+        help=f"Duplicate requests allowed per run. Default: {HedgePolicy.max_hedges}.",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=("threads", "asyncio"),
+        default="threads",
+        help=(
+            "Run requests on a thread pool or on one asyncio event loop; asyncio "
+            "suits large batches with many workers. Default: threads."
+        ),
+    )
+    parser.add_argument(
+        "--run-log",
+        default=str(DEFAULT_RUN_LOG_PATH),
+        help="Token and timing log of translation runs. Default: .cache/translation-runs.jsonl",
+    )
+    parser.add_argument(
+        "--no-run-log",
+        action="store_true",
+        help="Do not append this run to the run log.",
+    )
+    parser.add_argument(
+        "--journal",
+        default=str(DEFAULT_JOURNAL_PATH),
+        help=(
+            "Job journal of translated articles and their outputs. "
+            "Default: .cache/translation-journal"
+        ),
+    )
+    parser.add_argument(
+        "--no-journal",
+        action="store_true",
+        help="Retranslate articles even if the journal has them from the same source.",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help=(
+            "Translate the articles left pending or failed by earlier runs "
+            "instead of using git diff."
+        ),
+    )
     return parser
 
 
 def main() -> None:
     parser = build_parser()
     args = parser.parse_args()
+    if args.estimate and not args.dry_run:
+        parser.error("--estimate requires --dry-run")
+    if args.resume and (args.all or args.no_journal):
+        parser.error("--resume cannot be combined with --all or --no-journal")
 
     source_root = Path(args.source_root).expanduser().resolve()
     target_root = Path(args.target_root).expanduser().resolve()
 
-    if args.all:
+    journal = None if args.no_journal else JobJournal(Path(args.journal))
+    if args.resume:
+        changes = [
+            FileChange("upsert", relative_path)
+            for relative_path in journal.unfinished(target_root)
+            if (source_root / relative_path).exists()
+        ]
+    elif args.all:
         changes = collect_all_changes(source_root)
     else:
         changes = collect_changes(source_root, args.base_ref.strip())
@@ -338,6 +943,22 @@ def main() -> None:
         temperature=args.temperature,
         workers=args.workers,
         dry_run=args.dry_run,
+        memory=None if args.no_memory else TranslationMemory(Path(args.memory)),
+        chunk_tokens=args.chunk_tokens,
+        hedge=(
+            HedgePolicy(
+                percentile=args.hedge_percentile,
+                fallback_model=args.hedge_model,
+                max_hedges=args.max_hedges,
+            )
+            if args.hedge_percentile is not None
+            else None
+        ),
+        stream=args.stream,
+        engine=args.engine,
+        estimate=args.estimate,
+        run_log=None if args.no_run_log else RunLog(Path(args.run_log)),
+        journal=journal,
     )
 
 
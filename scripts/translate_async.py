@@ -0,0 +1,438 @@
+"""
+asyncio engine for GeminiTranslator.
+
+AsyncGeminiTranslator has the same configuration and public methods as
+GeminiTranslator, as coroutines, and runs every request on one event loop
+instead of a thread each:
+
+  - a shared AIMD limiter bounds in-flight requests (see AdaptiveLimiter)
+  - every attempt runs under a deadline of GOOGLE_GEMINI_TIMEOUT_SECONDS
+  - cancellation is cooperative: when a chunk fails, its sibling requests
+    are cancelled and their connections closed; a lost hedge race cancels
+    the slower request the same way
+
+HTTP goes through one httpx.AsyncClient: a shared keep-alive pool that
+honours HTTPS_PROXY and NO_PROXY like requests does. A POST is only sent
+again when it failed before reaching the server; a dropped connection or a
+truncated body after that fails the request instead of billing it twice.
+"""
+
+import asyncio
+import contextlib
+import json
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+import httpx
+
+from translate import (
+    DEFAULT_FRONT_MATTER_KEYS,
+    FRONT_MATTER_PRIORITY,
+    FRONT_MATTER_SYSTEM_INSTRUCTION,
+    RETRYABLE_STATUS_CODES,
+    AdaptiveLimiter,
+    GeminiTranslator,
+    MalformedResponse,
+    ProgressiveWriter,
+    Segment,
+    TranslationOptions,
+    UsageTally,
+    build_front_matter_request,
+    build_translation_prompt,
+    check_stream_text,
+    chunk_priorities,
+    extract_front_matter,
+    front_matter_fields,
+    merge_front_matter,
+    parse_retry_after,
+    response_text,
+    sse_payload,
+)
+
+# Failures before the request reached the server, the only ones retried
+CONNECT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+# Every transport failure, including missed deadlines
+TRANSPORT_ERRORS = (httpx.TransportError, TimeoutError)
+
+
+class AsyncAdaptiveLimiter(AdaptiveLimiter):
+    """AdaptiveLimiter for coroutines on one event loop."""
+
+    def __init__(self, initial: int, maximum: int, minimum: int = 1):
+        super().__init__(initial, maximum, minimum)
+        self._async_condition = asyncio.Condition()
+
+    async def acquire(self, *, block: bool = True, priority: float = 0.0) -> None:
+        async with self._async_condition:
+            if block:
+                ticket = self._enqueue(priority)
+                try:
+                    while (wait := self._wait_seconds(ticket)) != 0:
+                        with contextlib.suppress(TimeoutError):
+                            await asyncio.wait_for(self._async_condition.wait(), wait)
+                finally:
+                    self._dequeue(ticket)
+                    self._async_condition.notify_all()
+            self.in_flight += 1
+
+    async def release(
+        self, *, throttled: bool = False, retry_after: float | None = None
+    ) -> None:
+        async with self._async_condition:
+            self._record(throttled, retry_after)
+            self._async_condition.notify_all()
+
+
+async def gather_or_cancel(*awaitables: Awaitable[Any]) -> list[Any]:
+    """Run `awaitables` concurrently; on the first failure cancel the rest
+    and re-raise it."""
+    tasks = [asyncio.ensure_future(awaitable) for awaitable in awaitables]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
+class AsyncGeminiTranslator(GeminiTranslator):
+    def _setup_transport(self, workers: int) -> None:
+        # Concurrency is bounded by the limiter alone: it starts at the
+        # worker count and never goes past one request per chunk slot
+        maximum = max(1, workers) * (self.chunk_workers + 1)
+        # Deadlines come from asyncio.timeout around each attempt, not httpx
+        self._client = httpx.AsyncClient(
+            timeout=None,
+            limits=httpx.Limits(
+                max_connections=None, max_keepalive_connections=maximum
+            ),
+        )
+        self._requests = 0
+        self._connections = 0
+        self.limiter = AsyncAdaptiveLimiter(
+            max(workers, self.chunk_workers), maximum=maximum
+        )
+
+    def connection_stats(self) -> dict[str, int]:
+        return {"requests": self._requests, "connections": self._connections}
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+    async def _trace(self, event: str, info: dict[str, Any]) -> None:
+        # httpcore reports every new TCP connection, direct or to a proxy,
+        # and every request sent, including hedges cancelled later
+        if event == "connection.connect_tcp.complete":
+            self._connections += 1
+        elif event == "http11.send_request_headers.complete":
+            self._requests += 1
+
+    async def _generate(
+        self,
+        prompt: str,
+        *,
+        system_instruction: str,
+        response_schema: dict[str, Any] | None = None,
+        on_text: Callable[[str], None] | None = None,
+        check: Callable[[str], Any] | None = None,
+        usage: UsageTally | None = None,
+        priority: float = 0.0,
+    ) -> str:
+        body = self._request_body(prompt, system_instruction, response_schema)
+        if self.hedge is None:
+            return await self._generate_with_retries(
+                self.model,
+                body,
+                on_text=on_text,
+                check=check,
+                usage=usage,
+                priority=priority,
+            )
+        return await self._generate_hedged(body, check, usage, priority)
+
+    async def _generate_hedged(
+        self,
+        body: dict[str, Any],
+        check: Callable[[str], Any] | None = None,
+        usage: UsageTally | None = None,
+        priority: float = 0.0,
+    ) -> str:
+        """Race the request against a delayed duplicate; the loser is
+        cancelled and its connection closed."""
+        primary = asyncio.ensure_future(
+            self._generate_with_retries(
+                self.model, body, check=check, usage=usage, priority=priority
+            )
+        )
+        tasks = [primary]
+        try:
+            delay = self._hedge_delay()
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done or not self._take_hedge():
+                return await primary
+
+            model = self.hedge.fallback_model or self.model
+            print(f"[gemini] hedging after {delay:.1f}s with model={model}", flush=True)
+            hedge = asyncio.ensure_future(
+                self._generate_with_retries(
+                    model, body, hedge=True, check=check, usage=usage
+                )
+            )
+            tasks.append(hedge)
+            pending = set(tasks)
+            error: BaseException | None = None
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is not None:
+                        error = task.exception()
+                        continue
+                    if task is hedge:
+                        self.hedges_won += 1
+                    return task.result()
+            raise error
+        finally:
+            # No-op for the winner and for tasks that already failed
+            for task in tasks:
+                task.cancel()
+
+    async def _generate_with_retries(
+        self,
+        model: str,
+        body: dict[str, Any],
+        *,
+        hedge: bool = False,
+        on_text: Callable[[str], None] | None = None,
+        check: Callable[[str], Any] | None = None,
+        usage: UsageTally | None = None,
+        priority: float = 0.0,
+    ) -> str:
+        payload = json.dumps(body).encode("utf-8")
+        headers = {
+            "x-goog-api-key": self.api_key,
+            "content-type": "application/json",
+        }
+        last_error: BaseException | None = None
+        for attempt in range(1, self.max_retries + 1):
+            print(
+                f"[gemini] request model={model} attempt={attempt}/{self.max_retries}",
+                flush=True,
+            )
+            await self.limiter.acquire(block=not hedge, priority=priority)
+            throttled = True
+            retry_after: float | None = None
+            started_at = time.monotonic()
+            try:
+                async with (
+                    asyncio.timeout(self.timeout_seconds),
+                    self._client.stream(
+                        "POST",
+                        self._build_endpoint(model),
+                        headers=headers,
+                        content=payload,
+                        extensions={"trace": self._trace},
+                    ) as response,
+                ):
+                    if response.is_success:
+                        throttled = False
+                        if self.stream:
+                            text, metadata = await self._read_stream(
+                                response, model, started_at, on_text
+                            )
+                        else:
+                            answer = json.loads(await response.aread())
+                            text = response_text(answer)
+                            metadata = answer.get("usageMetadata") or {}
+                        latency = time.monotonic() - started_at
+                        self._latencies.append(latency)
+                        self._record_usage(metadata, latency, usage)
+                        if not text.strip():
+                            raise RuntimeError("Gemini returned an empty response.")
+                        if check is not None:
+                            check(text.strip())
+                        return text.strip()
+                    await response.aread()
+                    error_text = response.text
+                status = response.status_code
+                if status not in RETRYABLE_STATUS_CODES:
+                    throttled = False
+                    raise RuntimeError(
+                        f"Gemini request failed with {status}: {error_text}"
+                    )
+                print(f"[gemini] retryable status={status} model={model}", flush=True)
+                retry_after = parse_retry_after(response.headers, error_text)
+                last_error = RuntimeError(
+                    f"Gemini request failed with {status}: {error_text}"
+                )
+            except MalformedResponse as exc:
+                print(f"[gemini] malformed response model={model}: {exc}", flush=True)
+                last_error = exc
+            except CONNECT_ERRORS as exc:
+                print(f"[gemini] connect error model={model}: {exc!r}", flush=True)
+                last_error = exc
+            except TRANSPORT_ERRORS as exc:
+                # The server may have received the request: don't send it again
+                raise RuntimeError(
+                    f"Gemini request failed after it was sent: {exc!r}"
+                ) from exc
+            finally:
+                await self.limiter.release(throttled=throttled, retry_after=retry_after)
+
+            if attempt < self.max_retries:
+                await asyncio.sleep(min(2**attempt, 10))
+        raise RuntimeError(
+            f"Gemini request failed after {self.max_retries} attempts: {last_error}"
+        ) from last_error
+
+    async def _read_stream(
+        self,
+        response: httpx.Response,
+        model: str,
+        started_at: float,
+        on_text: Callable[[str], None] | None,
+    ) -> tuple[str, dict[str, Any]]:
+        text = ""
+        metadata: dict[str, Any] = {}
+        first_event = True
+        async for line in response.aiter_lines():
+            payload = sse_payload(line)
+            if payload is None:
+                continue
+            metadata = payload.get("usageMetadata") or metadata
+            delta = response_text(payload)
+            if first_event:
+                first_event = False
+                print(
+                    f"[gemini] first byte after "
+                    f"{time.monotonic() - started_at:.2f}s model={model}",
+                    flush=True,
+                )
+            text += delta
+            check_stream_text(text)
+            if on_text is not None:
+                on_text(text)
+        return text, metadata
+
+    async def translate_text(
+        self,
+        text: str,
+        options: TranslationOptions,
+        on_text: Callable[[str], None] | None = None,
+        usage: UsageTally | None = None,
+        priority: float = 0.0,
+        check: Callable[[str], Any] | None = None,
+    ) -> str:
+        if not text.strip():
+            return text
+        prompt, system_instruction = build_translation_prompt(text, options)
+        return await self._generate(
+            prompt,
+            system_instruction=system_instruction,
+            on_text=on_text,
+            check=check,
+            usage=usage,
+            priority=priority,
+        )
+
+    async def translate_segments(
+        self,
+        body: str,
+        options: TranslationOptions,
+        on_segment: Callable[[int, Segment], None] | None = None,
+        usage: UsageTally | None = None,
+    ) -> str:
+        plan = self._plan_segments(body, options, on_segment)
+        if plan.pending:
+            chunk_options = self._chunk_options(options)
+
+            async def translate_chunk(chunk: dict[int, str], priority: int) -> None:
+                def on_text(partial: str) -> None:
+                    for index, text in plan.partial(chunk, partial).items():
+                        on_segment(index, plan.segment(index, text))
+
+                response = await self.translate_text(
+                    plan.prompt(chunk),
+                    chunk_options,
+                    on_text=on_text if on_segment is not None else None,
+                    usage=usage,
+                    priority=priority,
+                    check=lambda text: plan.parse(chunk, text),
+                )
+                self._finish_chunk(plan, chunk, response, on_segment)
+
+            chunks = self._plan_chunks(plan)
+            await gather_or_cancel(
+                *(
+                    translate_chunk(chunk, priority)
+                    for chunk, priority in zip(
+                        chunks, chunk_priorities(len(chunks)), strict=True
+                    )
+                )
+            )
+        return plan.join()
+
+    async def translate_front_matter(
+        self,
+        metadata: dict[str, Any],
+        keys: tuple[str, ...],
+        *,
+        source_lang: str,
+        target_lang: str,
+        usage: UsageTally | None = None,
+    ) -> dict[str, Any]:
+        fields = front_matter_fields(metadata, keys)
+        if not fields:
+            return dict(metadata)
+        prompt, schema = build_front_matter_request(
+            fields, source_lang=source_lang, target_lang=target_lang
+        )
+        response = await self._generate(
+            prompt,
+            system_instruction=FRONT_MATTER_SYSTEM_INSTRUCTION,
+            response_schema=schema,
+            usage=usage,
+            priority=FRONT_MATTER_PRIORITY,
+        )
+        return merge_front_matter(metadata, fields, response)
+
+    async def translate_markdown_document(
+        self,
+        markdown_text: str,
+        *,
+        source_lang: str,
+        target_lang: str,
+        front_matter_keys: tuple[str, ...] = DEFAULT_FRONT_MATTER_KEYS,
+        writer: ProgressiveWriter | None = None,
+        usage: UsageTally | None = None,
+    ) -> str:
+        metadata, body, has_front_matter = extract_front_matter(markdown_text)
+        translated_metadata, translated_body = await gather_or_cancel(
+            self.translate_front_matter(
+                metadata if has_front_matter else {},
+                front_matter_keys,
+                source_lang=source_lang,
+                target_lang=target_lang,
+                usage=usage,
+            ),
+            self.translate_segments(
+                body,
+                TranslationOptions(
+                    source_lang=source_lang,
+                    target_lang=target_lang,
+                    model=self.model,
+                    temperature=self.temperature,
+                    markdown=True,
+                ),
+                on_segment=writer.add if writer is not None else None,
+                usage=usage,
+            ),
+        )
+        return self._assemble_document(
+            translated_body,
+            translated_metadata if has_front_matter else None,
+            target_lang=target_lang,
+        )
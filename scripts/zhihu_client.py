@@ -1,9 +1,12 @@
+import hashlib
 import os
 import re
 import shutil
 import subprocess
+import threading
 import time
 import webbrowser
+from collections import OrderedDict
 from dataclasses import dataclass
 from datetime import datetime
 from zoneinfo import ZoneInfo
@@ -15,6 +18,8 @@ from typing import Any
 import requests
 import yaml
 
+import markdown_ast
+from markdown_ast import ZHIHU_LANGUAGE_ALIASES, ZHIHU_TABLE_TAG
 from zhihu_parser import Parser
 
 
@@ -270,7 +275,13 @@ def _merge_split_ordered_lists(html: str) -> str:
     - When the continuation's start skips numbers (e.g. <ol start="4"> after 2 items),
       detects bold paragraphs like "3. Title" in the gap and promotes them to real <li>
       elements, stripping the redundant number prefix.
+
+    Each parent is handled in one left-to-right pass over its children, so the
+    cost is linear in the number of nodes rather than in fragments × document.
     """
+    if "<ol start=" not in html:
+        return html
+
     from bs4 import BeautifulSoup, NavigableString, Tag
 
     def strip_number_prefix(node: Tag, num: int) -> None:
@@ -279,60 +290,34 @@ def _merge_split_ordered_lists(html: str) -> str:
             new_val = re.sub(rf"^\s*{num}\s*[\.、]\s*", "", str(first_text))
             first_text.replace_with(new_val)
 
-    soup = BeautifulSoup(f"<div>{html}</div>", "html.parser")
-    root = soup.find("div")
-
-    while True:
-        continuation = None
-        for ol in root.find_all("ol"):
-            try:
-                if int(ol.get("start", 1)) > 1:
-                    continuation = ol
-                    break
-            except (ValueError, TypeError):
-                pass
-        if continuation is None:
-            break
-
-        continuation_start = int(continuation.get("start"))
-
-        prev_ol = None
-        between_nodes = []
-        sibling = continuation.previous_sibling
-        while sibling is not None:
-            if isinstance(sibling, Tag) and sibling.name == "ol":
-                prev_ol = sibling
-                break
-            between_nodes.insert(0, sibling)
-            sibling = sibling.previous_sibling
-
-        if prev_ol is None:
-            del continuation["start"]
-            continue
+    def ol_start(node) -> int:
+        if not isinstance(node, Tag) or node.name != "ol":
+            return 0
+        try:
+            return int(node.get("start", 1))
+        except (ValueError, TypeError):
+            return 1
 
-        current_lis = prev_ol.find_all("li", recursive=False)
-        prev_last_idx = len(current_lis)
+    def merge_into(prev_ol: Tag, prev_lis: list[Tag], between: list, continuation: Tag):
+        continuation_start = ol_start(continuation)
+        prev_last_idx = len(prev_lis)
         missing_count = continuation_start - prev_last_idx - 1
 
-        for node in between_nodes:
-            node.extract()
-        between_nodes = [
-            n
-            for n in between_nodes
-            if not (isinstance(n, NavigableString) and not n.strip())
+        between = [
+            n for n in between if not (isinstance(n, NavigableString) and not n.strip())
         ]
 
         if missing_count <= 0:
             # No gap: all intermediate content belongs to the last existing <li>
-            last_li = current_lis[-1]
-            for node in between_nodes:
+            last_li = prev_lis[-1]
+            for node in between:
                 last_li.append(node)
         else:
             # Gap detected: split intermediate content into segments.
             # A new segment starts when a <p> whose text matches "N. ..." is found,
             # where N is the next expected missing item number.
             segments: list[list] = [[]]
-            for node in between_nodes:
+            for node in between:
                 if isinstance(node, Tag) and node.name == "p":
                     expected_num = prev_last_idx + len(segments)
                     text = node.get_text().strip()
@@ -345,7 +330,7 @@ def _merge_split_ordered_lists(html: str) -> str:
                 segments[-1].append(node)
 
             # segments[0] → extra content for the last existing item
-            last_li = current_lis[-1]
+            last_li = prev_lis[-1]
             for node in segments[0]:
                 last_li.append(node)
             # segments[1..] → new <li> elements for each promoted missing item
@@ -354,68 +339,155 @@ def _merge_split_ordered_lists(html: str) -> str:
                 for node in seg:
                     new_li.append(node)
                 prev_ol.append(new_li)
+                prev_lis.append(new_li)
 
-        for li in list(continuation.find_all("li", recursive=False)):
-            prev_ol.append(li.extract())
-
+        for li in [
+            c for c in continuation.contents if isinstance(c, Tag) and c.name == "li"
+        ]:
+            prev_ol.append(li)
+            prev_lis.append(li)
         continuation.decompose()
 
+    def merge_children(parent: Tag) -> None:
+        if any(ol_start(child) > 1 for child in parent.contents):
+            # Detach every child (front to back, so each one is found at
+            # index 0) and re-attach the survivors while merging continuations
+            # as we go.
+            children = list(parent.contents)
+            for child in children:
+                child.extract()
+
+            prev_ol: Tag | None = None
+            prev_lis: list[Tag] = []
+            between: list = []
+            for child in children:
+                start = ol_start(child)
+                if start > 1 and prev_ol is not None:
+                    merge_into(prev_ol, prev_lis, between, child)
+                    between = []
+                    continue
+                if start:
+                    if start > 1:
+                        del child["start"]
+                    for node in between:
+                        parent.append(node)
+                    between = []
+                    parent.append(child)
+                    prev_ol = child
+                    prev_lis = [
+                        c
+                        for c in child.contents
+                        if isinstance(c, Tag) and c.name == "li"
+                    ]
+                elif prev_ol is not None:
+                    between.append(child)
+                else:
+                    parent.append(child)
+            for node in between:
+                parent.append(node)
+
+        for child in parent.contents:
+            if isinstance(child, Tag):
+                merge_children(child)
+
+    soup = BeautifulSoup(f"<div>{html}</div>", "html.parser")
+    root = soup.find("div")
+    merge_children(root)
     return root.decode_contents()
 
 
-def _postprocess_zhihu_html(html: str) -> str:
-    # Code blocks with language: <pre><code class="language-X">...</code></pre>
-    # → <pre lang="X">...</pre>
-    html = re.sub(
-        r'<pre><code class="language-([^"]+)">(.*?)</code></pre>',
-        lambda m: f'<pre lang="{m.group(1)}">{m.group(2)}</pre>',
-        html,
-        flags=re.DOTALL,
-    )
-    # Code blocks without language
-    html = re.sub(
-        r"<pre><code>(.*?)</code></pre>",
-        lambda m: f"<pre>{m.group(1)}</pre>",
-        html,
-        flags=re.DOTALL,
-    )
+# Every construct _postprocess_zhihu_html rewrites, as one alternation so the
+# document is scanned once. python-markdown escapes <, > and " inside code and
+# text, so these tokens never overlap.
+_ZHIHU_HTML_TOKEN_RE = re.compile(
+    r'<pre><code(?: class="language-(?P<lang>[^"]+)")?>(?P<code>.*?)</code></pre>'
+    r"|<h(?P<level>[1-6])>(?P<heading>.*?)</h(?P=level)>"
+    r'|<pre lang="(?P<pre_lang>x86asm)">'
+    r"|(?P<table><table>)"
+    r"|<thead>\s*(?P<thead>.*?)\s*</thead>\s*<tbody>",
+    re.DOTALL,
+)
+
 
-    # Headings: Zhihu only supports h2 (TOC-level) and h3 (sub-section).
-    # Synced articles use ## for h2 and ### for h3, so we keep them as-is.
-    # Only h1 needs shifting up to h2; h4+ collapse to bold paragraphs.
-    def _shift_heading(m: re.Match) -> str:
-        level = int(m.group(1))
-        content = m.group(2)
+def _rewrite_zhihu_token(m: re.Match) -> str:
+    if m.group("code") is not None:
+        # <pre><code class="language-X">...</code></pre> → <pre lang="X">...</pre>
+        lang = m.group("lang")
+        if lang is None:
+            return f"<pre>{m.group('code')}</pre>"
+        lang = ZHIHU_LANGUAGE_ALIASES.get(lang, lang)
+        return f'<pre lang="{lang}">{m.group("code")}</pre>'
+    if m.group("pre_lang") is not None:
+        # Raw-HTML code blocks in the markdown source
+        return f'<pre lang="{ZHIHU_LANGUAGE_ALIASES[m.group("pre_lang")]}">'
+    if m.group("level") is not None:
+        # Headings: Zhihu only supports h2 (TOC-level) and h3 (sub-section).
+        # Synced articles use ## for h2 and ### for h3, so we keep them as-is.
+        # Only h1 needs shifting up to h2; h4+ collapse to bold paragraphs.
+        level = int(m.group("level"))
+        content = m.group("heading")
         if level == 1:
             return f"<h2>{content}</h2>"
         if level <= 3:
             return f"<h{level}>{content}</h{level}>"
         return f"<p><strong>{content}</strong></p>"
-
-    html = re.sub(r"<h([1-6])>(.*?)</h\1>", _shift_heading, html, flags=re.DOTALL)
-    # Normalize language identifiers Zhihu doesn't recognise → known aliases
-    html = html.replace('<pre lang="x86asm">', '<pre lang="nasm">')
-    # Tables: add Zhihu draft attributes and merge <thead> into <tbody>
+    if m.group("table") is not None:
+        # Tables: add Zhihu draft attributes
+        return ZHIHU_TABLE_TAG
     # Zhihu requires all rows in a single <tbody> (no <thead>); header cells use <th>
-    html = html.replace(
-        "<table>",
-        '<table data-draft-node="block" data-draft-type="table" data-size="normal">',
-    )
-    html = re.sub(
-        r"<thead>\s*(.*?)\s*</thead>\s*<tbody>", r"<tbody>\1", html, flags=re.DOTALL
-    )
-    html = _merge_split_ordered_lists(html)
-    return html
+    return f"<tbody>{m.group('thead')}"
 
 
-def markdown_to_html(markdown_text: str) -> str:
-    try:
-        import markdown as markdown_lib
-    except ModuleNotFoundError as error:
+def _postprocess_zhihu_html(html: str) -> str:
+    html = _ZHIHU_HTML_TOKEN_RE.sub(_rewrite_zhihu_token, html)
+    return _merge_split_ordered_lists(html)
+
+
+MARKDOWN_EXTENSIONS = ["fenced_code", "tables", "nl2br", "sane_lists"]
+HTML_CACHE_SIZE = 256
+# "markdown": python-markdown followed by _postprocess_zhihu_html (default).
+# "ast": markdown_ast reader + Zhihu-dialect emitter, opt-in until it is at
+# parity with python-markdown (check with zhihu_roundtrip_check.py
+# --renderer ast on scripts/tests/data/renderer/*.md).
+HTML_RENDERERS = ("ast", "markdown")
+DEFAULT_HTML_RENDERER = "markdown"
+
+# One configured converter per thread: building a Markdown instance re-creates
+# every extension, while reset() only clears per-document state.
+_markdown_local = threading.local()
+# sha256(renderer + markdown) → Zhihu HTML, least recently used first.
+_html_cache: OrderedDict[str, str] = OrderedDict()
+_html_cache_lock = threading.Lock()
+
+
+def _markdown_converter():
+    converter = getattr(_markdown_local, "converter", None)
+    if converter is None:
+        try:
+            import markdown as markdown_lib
+        except ModuleNotFoundError as error:
+            raise RuntimeError(
+                "`markdown` package is required for publish/update operations."
+            ) from error
+
+        converter = markdown_lib.Markdown(
+            extensions=MARKDOWN_EXTENSIONS, output_format="html5"
+        )
+        _markdown_local.converter = converter
+    return converter
+
+
+def html_renderer() -> str:
+    renderer = os.environ.get("ZHIHU_HTML_RENDERER", DEFAULT_HTML_RENDERER).strip()
+    if renderer not in HTML_RENDERERS:
         raise RuntimeError(
-            "`markdown` package is required for publish/update operations."
-        ) from error
+            f"Unknown ZHIHU_HTML_RENDERER {renderer!r}; "
+            f"expected one of: {', '.join(HTML_RENDERERS)}"
+        )
+    return renderer
+
 
+def _render_with_markdown(markdown_text: str) -> str:
     body = re.sub(
         r'{{<\s*linkcard\s+url="([^"]+)"\s+title="([^"]*)"\s*>}}',
         lambda match: (
@@ -423,12 +495,33 @@ def markdown_to_html(markdown_text: str) -> str:
         ),
         markdown_text,
     )
-    html = markdown_lib.markdown(
-        body,
-        extensions=["fenced_code", "tables", "nl2br", "sane_lists"],
-        output_format="html5",
-    )
-    return _postprocess_zhihu_html(html)
+    return _postprocess_zhihu_html(_markdown_converter().reset().convert(body))
+
+
+def markdown_to_html(markdown_text: str, renderer: str | None = None) -> str:
+    """Render an article body as Zhihu draft HTML.
+
+    `renderer` defaults to ZHIHU_HTML_RENDERER (see HTML_RENDERERS).
+    """
+    renderer = renderer or html_renderer()
+    key = hashlib.sha256(f"{renderer}\0{markdown_text}".encode()).hexdigest()
+    with _html_cache_lock:
+        cached = _html_cache.get(key)
+        if cached is not None:
+            _html_cache.move_to_end(key)
+            return cached
+
+    if renderer == "ast":
+        html = markdown_ast.parse(markdown_text).to_html()
+    else:
+        html = _render_with_markdown(markdown_text)
+
+    with _html_cache_lock:
+        _html_cache[key] = html
+        _html_cache.move_to_end(key)
+        while len(_html_cache) > HTML_CACHE_SIZE:
+            _html_cache.popitem(last=False)
+    return html
 
 
 def prompt_input(label: str, default: str = "") -> str:
@@ -0,0 +1,93 @@
+"""
+Normalisation applied to both sides of a Zhihu round-trip diff.
+
+Zhihu's preview rewrites some constructs into equivalent forms (http:// URLs,
+resized image hosts, _emphasis_ markers, ...). These passes map the local
+markdown and the round-tripped markdown onto the same spelling so that only
+real differences show up in the diff.
+
+Every pattern is compiled once and anchored to a single line, so a pass runs
+over the whole document at once and gives the same result as applying it
+line by line.
+"""
+
+import re
+
+# Zhihu image URLs: normalise subdomain/size-suffix/query to just the v2 hash
+_IMAGE_URL_RE = re.compile(r"(?<=\()([^)\n]*zhimg\.com[^)\n]*)")
+_IMAGE_QUERY_RE = re.compile(r"\?.*$")
+_IMAGE_SIZE_RE = re.compile(r"_(r|720w|1440w|b)\.")
+_IMAGE_HOST_RE = re.compile(r"pic[a-z0-9]*\.zhimg\.com")
+
+
+def _normalise_zhimg_url(url: str) -> str:
+    url = _IMAGE_QUERY_RE.sub("", url)
+    url = _IMAGE_SIZE_RE.sub(".", url)
+    return _IMAGE_HOST_RE.sub("pic.zhimg.com", url)
+
+
+def _normalise_image_url(m: re.Match) -> str:
+    return _normalise_zhimg_url(m.group(1))
+
+
+def normalise_url(url: str) -> str:
+    """Apply the URL passes to a bare URL (e.g. a link or image node field)."""
+    url = url.replace("https://", "http://")
+    return _normalise_zhimg_url(url) if "zhimg.com" in url else url
+
+
+# (pattern, replacement) passes, applied in order
+URL_NORMS: list[tuple[re.Pattern, object]] = [
+    # https → http (Zhihu preview rewrites all URLs)
+    (re.compile(r"https://"), "http://"),
+    (_IMAGE_URL_RE, _normalise_image_url),
+]
+MARKUP_NORMS: list[tuple[re.Pattern, object]] = [
+    # Emphasis markers: *text* ↔ _text_ are semantically equivalent
+    (re.compile(r"(?<!\*)\*(?!\*)(.+?)(?<!\*)\*(?!\*)"), r"_\1_"),
+    # Inline code: strip trailing spaces inside backticks
+    (re.compile(r"`([^`\n]+?) +`"), r"`\1`"),
+    # Angle-bracket URLs: [text](<url>) → [text](url)
+    (re.compile(r"\(<(https?://[^>\n]+)>\)"), r"(\1)"),
+    # Bare-URL links where label == URL: [url](url) → url
+    (re.compile(r"\[(http[^\]\n]+)\]\(\1\)"), r"\1"),
+    # Trailing space in link labels: [label ](url) → [label](url)
+    (re.compile(r"\[([^\]\n]+?) +\]"), r"[\1]"),
+    # Backslash escapes: \_ → _ (parser strips them, source may keep them)
+    (re.compile(r"\\([_*\[\]()~`>#+\-.!|{}])"), r"\1"),
+    # Zhihu strips <code> inside <a> and headings
+    (re.compile(r"\[`([^`\n]+)`\]"), r"[\1]"),
+    (re.compile(r"^(#{1,6}) `(.+)`$", re.MULTILINE), r"\1 \2"),
+]
+ROUNDTRIP_NORMS = URL_NORMS + MARKUP_NORMS
+
+
+def normalise_lines(text: str) -> list[str]:
+    """Return a list of stripped, de-duplicated-blank lines for diffing."""
+    out: list[str] = []
+    prev_blank = False
+    for line in text.splitlines():
+        line = line.rstrip()
+        blank = not line
+        if blank and prev_blank:
+            continue
+        out.append(line)
+        prev_blank = blank
+    # drop leading/trailing blank lines
+    while out and not out[0]:
+        out.pop(0)
+    while out and not out[-1]:
+        out.pop()
+    return out
+
+
+def apply_norms(
+    lines: list[str], norms: list[tuple[re.Pattern, object]] = ROUNDTRIP_NORMS
+) -> list[str]:
+    """Apply `norms` to every line, one whole-document pass per pattern."""
+    if not lines:
+        return []
+    text = "\n".join(lines)
+    for pattern, replacement in norms:
+        text = pattern.sub(replacement, text)
+    return text.split("\n")
@@ -196,7 +196,7 @@ class Parser:
     def parse_link(self, element: Tag) -> markdown.Link:
         url = self.normalize_url(element["href"])
         label = str(self.parse_paragraph(element))
-        return markdown.Link(label, url)
+        return markdown.Link(label, url, element.get("title", ""))
 
     def parse_linkcard(self, element: Tag) -> markdown.LinkCard:
         title = element.attrs.get("data-text")
@@ -300,9 +300,15 @@ class Parser:
 
     def parse_table(self, element: Tag) -> markdown.Table | None:
         rows: list[list[str]] = []
+        align: list[str] = []
         tbody = element.find("tbody") or element
         for tr in tbody.find_all("tr"):
-            cells = [self._norm(cell.get_text()) for cell in tr.find_all(["th", "td"])]
+            cells = tr.find_all(["th", "td"])
+            if cells and not rows:
+                for cell in cells:
+                    style = re.search(r"text-align:\s*(\w+)", cell.get("style", ""))
+                    align.append(style.group(1) if style else "")
+            cells = [self._norm(cell.get_text()) for cell in cells]
             if cells:
                 rows.append(cells)
-        return markdown.Table(rows) if rows else None
+        return markdown.Table(rows, align if any(align) else None) if rows else None
@@ -0,0 +1,77 @@
+"""
+On-disk cache of Zhihu preview pages, keyed by the draft HTML sent to Zhihu.
+
+The preview Zhihu serves depends only on the HTML we PATCH into the draft, so
+a round-trip run only needs the network for articles whose generated HTML
+changed since the last run. Entries are plain files named by the sha256 of
+the draft HTML; once the directory grows past `max_bytes`, the least recently
+used entries are evicted.
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+CACHE_DIR = Path(__file__).resolve().parent.parent / ".cache" / "zhihu-preview"
+CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+
+class PreviewCache:
+    def __init__(self, directory: Path = CACHE_DIR, max_bytes: int = CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(html: str) -> str:
+        return hashlib.sha256(html.encode("utf-8")).hexdigest()
+
+    def _path(self, html: str) -> Path:
+        return self.directory / f"{self.key(html)}.html"
+
+    def get(self, html: str) -> str | None:
+        path = self._path(html)
+        try:
+            preview = path.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        # Reads refresh the entry's position in the LRU order
+        os.utime(path)
+        with self._lock:
+            self.hits += 1
+        return preview
+
+    def put(self, html: str, preview: str) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, temp_name = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                handle.write(preview)
+            os.replace(temp_name, self._path(html))
+        except BaseException:
+            Path(temp_name).unlink(missing_ok=True)
+            raise
+        with self._lock:
+            self.evict()
+
+    def evict(self) -> None:
+        """Drop least recently used entries until the cache fits `max_bytes`."""
+        entries = []
+        for path in self.directory.glob("*.html"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
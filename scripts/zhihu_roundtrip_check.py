@@ -4,29 +4,64 @@ Round-trip consistency check for all Zhihu articles.
 
 Flow per article:
   local markdown → markdown_to_html → PATCH draft → fetch preview HTML
-  → zhihu_parser → markdown → diff vs local
+  → zhihu_parser → markdown_ast.Document → block-by-block comparison with
+  the expected document
+
+The expected document comes from an independent renderer: the same markdown
+through python-markdown (ZHIHU_HTML_RENDERER=markdown) and the offline
+preview, read back with zhihu_parser. Reading the local markdown with
+markdown_ast instead would share every gap of the emitter built on it, so
+those would cancel out rather than show up as differences.
+
+The preview comes from a backend: "live" pushes the draft to Zhihu, "offline"
+runs zhihu_simulator locally (no cookie or network, seconds for the corpus).
+
+Live checks can run several articles at once (--jobs); all workers share one
+rate limiter, so Zhihu sees at most one request per --delay seconds. Each
+article is pushed to its own draft, or to a scratch draft borrowed from
+--draft-ids so that no two in-flight checks share a draft.
+
+Live previews are cached on disk by the hash of the draft HTML, so only
+articles whose generated HTML changed hit the network; --refresh refetches.
+
+Markdown files given on the command line (e.g. scripts/tests/data/*.md) are
+checked instead of the articles; live checks of them need --draft-ids.
+--renderer picks the renderer under test (default: ZHIHU_HTML_RENDERER), e.g.
+  --backend offline --renderer ast scripts/tests/data/renderer/*.md
+checks the markdown_ast emitter against python-markdown.
 
 Usage:
-  uv run python scripts/zhihu_roundtrip_check.py [--delay SECONDS] [--article-id ID]
+  uv run python scripts/zhihu_roundtrip_check.py [--backend live|offline]
+      [--delay SECONDS] [--jobs N] [--draft-ids ID,ID,...] [--refresh]
+      [--article-id ID] [--renderer ast|markdown] [PATH ...]
 """
 
 import argparse
-import difflib
-import re
+import bisect
+import queue
 import sys
+import threading
 import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).resolve().parent))
 
+import markdown_ast
 from zhihu_client import (
+    HTML_RENDERERS,
     ZHUANLAN_API,
     ZHUANLAN_HEADERS,
     ZhihuClient,
     markdown_to_html,
     read_markdown_document,
 )
+from zhihu_normalise import apply_norms, normalise_url
 from zhihu_parser import Parser
+from zhihu_preview_cache import PreviewCache
+from zhihu_simulator import simulate_preview
 
 ARTICLE_DIR = (
     Path(__file__).resolve().parent.parent
@@ -39,27 +74,97 @@ PREVIEW_URL = "https://zhuanlan.zhihu.com/p/{id}/preview?comment=0&catalog=1"
 
 
 # ---------------------------------------------------------------------------
-# Normalisation helpers
+# Preview backends
 # ---------------------------------------------------------------------------
 
 
-def _normalise(text: str) -> list[str]:
-    """Return a list of stripped, de-duplicated-blank lines for diffing."""
-    lines = [line.rstrip() for line in text.splitlines()]
-    out: list[str] = []
-    prev_blank = False
-    for line in lines:
-        blank = not line.strip()
-        if blank and prev_blank:
-            continue
-        out.append(line)
-        prev_blank = blank
-    # drop leading/trailing blank lines
-    while out and not out[0].strip():
-        out.pop(0)
-    while out and not out[-1].strip():
-        out.pop()
-    return out
+class RateLimiter:
+    """Space request starts at least `interval` seconds apart across threads."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._next_start = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start)
+            self._next_start = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+class LivePreview:
+    """PATCH the draft on Zhihu and fetch the real preview page.
+
+    Without scratch drafts every article is pushed to its own draft. With
+    them, each check borrows a draft id for its PATCH + GET cycle, so
+    concurrent checks never overwrite each other's content. With a cache,
+    previews of unchanged HTML are served from disk unless `refresh` is set.
+    """
+
+    def __init__(
+        self,
+        client: ZhihuClient,
+        delay: float,
+        draft_ids: list[str] | None = None,
+        cache: PreviewCache | None = None,
+        refresh: bool = False,
+    ):
+        self.client = client
+        self.limiter = RateLimiter(delay)
+        self.cache = cache
+        self.refresh = refresh
+        self.draft_pool: queue.Queue[str] | None = None
+        if draft_ids:
+            self.draft_pool = queue.Queue()
+            for draft_id in draft_ids:
+                self.draft_pool.put(draft_id)
+
+    def fetch_preview(self, article_id: str, draft: dict) -> str:
+        if self.cache is not None and not self.refresh:
+            cached = self.cache.get(draft["content"])
+            if cached is not None:
+                return cached
+
+        if self.draft_pool is None:
+            preview = self._round_trip(article_id, draft)
+        else:
+            draft_id = self.draft_pool.get()
+            try:
+                preview = self._round_trip(draft_id, draft)
+            finally:
+                self.draft_pool.put(draft_id)
+
+        if self.cache is not None:
+            self.cache.put(draft["content"], preview)
+        return preview
+
+    def _round_trip(self, draft_id: str, draft: dict) -> str:
+        self.limiter.wait()
+        patch = self.client.session.patch(
+            f"{ZHUANLAN_API}/{draft_id}/draft",
+            json=draft,
+            headers=ZHUANLAN_HEADERS,
+            timeout=30,
+        )
+        patch.raise_for_status()
+
+        self.limiter.wait()
+        preview = self.client.session.get(PREVIEW_URL.format(id=draft_id), timeout=30)
+        preview.raise_for_status()
+        return preview.text
+
+
+class OfflinePreview:
+    """Simulate Zhihu's draft → preview rewrites locally."""
+
+    def fetch_preview(self, article_id: str, draft: dict) -> str:
+        return simulate_preview(draft["content"])
+
+
+BACKENDS = ("live", "offline")
 
 
 # ---------------------------------------------------------------------------
@@ -68,10 +173,10 @@ def _normalise(text: str) -> list[str]:
 
 
 def check_article(
-    client: ZhihuClient,
+    backend: LivePreview | OfflinePreview,
     article_id: str,
     md_path: Path,
-    delay: float,
+    renderer: str | None = None,
 ) -> dict:
     metadata, body_markdown = read_markdown_document(md_path)
     title = metadata.get("title") or md_path.stem
@@ -79,113 +184,175 @@ def check_article(
         "title_image_url"
     )
 
-    html = markdown_to_html(body_markdown)
-
-    # Push draft
-    patch = client.session.patch(
-        f"{ZHUANLAN_API}/{article_id}/draft",
-        json={
+    html = markdown_to_html(body_markdown, renderer)
+    preview_html = backend.fetch_preview(
+        article_id,
+        {
             "content": html,
             "title": title,
             "titleImage": title_image,
             "isTitleImageFullScreen": False,
             "table_of_contents": True,
         },
-        headers=ZHUANLAN_HEADERS,
-        timeout=30,
     )
-    patch.raise_for_status()
-    time.sleep(delay)
-
-    # Fetch preview
-    preview = client.session.get(PREVIEW_URL.format(id=article_id), timeout=30)
-    preview.raise_for_status()
-    time.sleep(delay)
 
     # Parse preview HTML → markdown
-    parser = Parser()
-    article = parser.parse_article_from_html(preview.text)
-    round_trip_md = article.content.dump()
-
-    local_lines = _normalise(body_markdown)
-    rt_lines = _normalise(round_trip_md)
-
-    def _apply_norms(lines: list[str]) -> list[str]:
-        result = []
-        for l in lines:
-            # https → http (Zhihu preview rewrites all URLs)
-            l = l.replace("https://", "http://")
-
-            # Zhihu image URLs: normalise subdomain/size-suffix/query to just v2-hash
-            def _norm_img_url(m: re.Match) -> str:
-                url = m.group(1)
-                url = re.sub(r"\?.*$", "", url)
-                url = re.sub(r"_(r|720w|1440w|b)\.", ".", url)
-                url = re.sub(r"pic[a-z0-9]*\.zhimg\.com", "pic.zhimg.com", url)
-                return url
-
-            l = re.sub(r"(?<=\()([^)]*zhimg\.com[^)]*)", _norm_img_url, l)
-            # Emphasis markers: *text* ↔ _text_ are semantically equivalent
-            l = re.sub(r"(?<!\*)\*(?!\*)(.+?)(?<!\*)\*(?!\*)", r"_\1_", l)
-            # Inline code: strip trailing spaces inside backticks
-            l = re.sub(r"`([^`]+?) +`", r"`\1`", l)
-            # Angle-bracket URLs: [text](<url>) → [text](url)
-            l = re.sub(r"\(<(https?://[^>]+)>\)", r"(\1)", l)
-            # Bare-URL links where label == URL: [url](url) → url
-            l = re.sub(r"\[(http[^\]]+)\]\(\1\)", r"\1", l)
-            # Trailing space in link labels: [label ](url) → [label](url)
-            l = re.sub(r"\[([^\]]+?) +\]", r"[\1]", l)
-            # Backslash escapes: \_ → _ (parser strips them, source may keep them)
-            l = re.sub(r"\\([_*\[\]()~`>#+\-.!|{}])", r"\1", l)
-            # Zhihu strips <code> inside <a> and headings — normalise
-            l = re.sub(r"\[`([^`]+)`\]", r"[\1]", l)
-            l = re.sub(r"^(#{1,6}) `(.+)`$", r"\1 \2", l)
-            result.append(l)
-        return result
-
-    diff = list(
-        difflib.unified_diff(
-            _apply_norms(local_lines),
-            _apply_norms(rt_lines),
-            fromfile="local",
-            tofile="round-trip",
-            lineterm="",
-            n=2,
-        )
-    )
+    article = Parser().parse_article_from_html(preview_html)
+    expected_html = simulate_preview(markdown_to_html(body_markdown, "markdown"))
+    expected = Parser().parse_article_from_html(expected_html)
 
     return {
         "article_id": article_id,
         "title": title,
-        "diff": diff,
-        "local_lines": local_lines,
-        "rt_lines": rt_lines,
+        "mismatches": compare_documents(expected.content, article.content),
+        "error": None,
     }
 
 
 # ---------------------------------------------------------------------------
-# Categorise diff hunks
+# Block comparison
 # ---------------------------------------------------------------------------
 
-CATEGORIES = {
-    "linkcard": re.compile(r"linkcard|{{<"),
-    "image": re.compile(r"!\["),
-    "code_block": re.compile(r"^[+-]```"),
-    "heading": re.compile(r"^[+-]#{1,6} "),
-    "list_item": re.compile(r"^[+-]\s*[-*\d]"),
-    "bold_italic": re.compile(r"\*\*|__|\*[^*]|_[^_]"),
-}
+
+@dataclass
+class Mismatch:
+    """A top-level block that differs between the local and round-trip trees.
+
+    kind is "changed" (same node type; `fields` maps each differing field to
+    its local and round-trip value), "missing" (only in the local document)
+    or "extra" (only in the round-trip). `index` is the block's position in
+    the document it comes from.
+    """
+
+    kind: str
+    node_type: str
+    index: int
+    fields: dict[str, tuple[str, str]]
+
+
+def _norm(value: str) -> str:
+    return "\n".join(apply_norms(value.split("\n")))
+
+
+def _quote_text(node: markdown_ast.BlockQuote) -> str:
+    # zhihu_parser joins quoted paragraphs with <br><br>
+    if isinstance(node.children, markdown_ast.Paragraph):
+        return str(node.children)
+    return "<br><br>".join(str(child).strip() for child in node.children)
+
+
+def block_fields(node: markdown_ast.Node) -> tuple[str, dict[str, str]]:
+    """Return the node type and comparable fields of a top-level block."""
+    if (
+        isinstance(node, markdown_ast.Paragraph)
+        and len(node.children) == 1
+        and isinstance(node.children[0], markdown_ast.Image)
+    ):
+        # Zhihu serves standalone images as block-level <figure>s
+        node = node.children[0]
+
+    match node:
+        case markdown_ast.Header():
+            fields = {"level": str(node.level), "text": node.text}
+        case markdown_ast.Image() | markdown_ast.LinkCard():
+            fields = {"label": node.label, "url": node.url}
+        case markdown_ast.BlockCode():
+            fields = {"language": node.language, "code": node.code}
+        case markdown_ast.List():
+            fields = {"ordered": str(node.ordered), "items": str(len(node.items))}
+            for index, item in enumerate(node.items):
+                fields[f"items[{index}]"] = str(item).strip()
+        case markdown_ast.Table():
+            fields = {"rows": str(len(node.rows)), "align": " | ".join(node.align)}
+            for index, row in enumerate(node.rows):
+                fields[f"rows[{index}]"] = " | ".join(row)
+        case markdown_ast.BlockQuote():
+            fields = {"text": _quote_text(node)}
+        case markdown_ast.HorizontalRule():
+            fields = {}
+        case _:
+            fields = {"text": str(node).strip()}
+    return type(node).__name__, {
+        name: normalise_url(value) if name == "url" else _norm(value)
+        for name, value in fields.items()
+    }
 
 
-def categorise(diff: list[str]) -> set[str]:
-    cats: set[str] = set()
-    for line in diff:
-        if not line.startswith(("+", "-")) or line.startswith(("+++", "---")):
+def compare_documents(
+    local: markdown_ast.Document, round_trip: markdown_ast.Document
+) -> list[Mismatch]:
+    """Align the top-level blocks of both documents and report differences.
+
+    Equal blocks are matched in order. On a mismatch the two sides resync at
+    the nearest later block that occurs on the other side (looked up through
+    an index of block keys), so a dropped or inserted block costs one lookup
+    instead of a quadratic diff.
+    """
+    left = [block_fields(node) for node in local.children]
+    right = [block_fields(node) for node in round_trip.children]
+    left_keys = [(kind, tuple(fields.items())) for kind, fields in left]
+    right_keys = [(kind, tuple(fields.items())) for kind, fields in right]
+
+    def index_of(keys: list) -> dict:
+        positions = defaultdict(list)
+        for position, key in enumerate(keys):
+            positions[key].append(position)
+        return positions
+
+    left_index, right_index = index_of(left_keys), index_of(right_keys)
+
+    def next_position(index: dict, key, start: int) -> int | None:
+        positions = index.get(key, [])
+        at = bisect.bisect_left(positions, start)
+        return positions[at] if at < len(positions) else None
+
+    mismatches: list[Mismatch] = []
+
+    def missing(i: int) -> None:
+        kind, fields = left[i]
+        values = {name: (value, "") for name, value in fields.items()}
+        mismatches.append(Mismatch("missing", kind, i, values))
+
+    def extra(j: int) -> None:
+        kind, fields = right[j]
+        values = {name: ("", value) for name, value in fields.items()}
+        mismatches.append(Mismatch("extra", kind, j, values))
+
+    i = j = 0
+    while i < len(left) and j < len(right):
+        if left_keys[i] == right_keys[j]:
+            i += 1
+            j += 1
             continue
-        for name, pat in CATEGORIES.items():
-            if pat.search(line):
-                cats.add(name)
-    return cats
+        in_right = next_position(right_index, left_keys[i], j)
+        in_left = next_position(left_index, right_keys[j], i)
+        if in_right is None and in_left is None:
+            (left_kind, left_fields), (right_kind, right_fields) = left[i], right[j]
+            if left_kind == right_kind:
+                changed = {
+                    name: (left_fields.get(name, ""), right_fields.get(name, ""))
+                    for name in left_fields | right_fields
+                    if left_fields.get(name) != right_fields.get(name)
+                }
+                mismatches.append(Mismatch("changed", left_kind, i, changed))
+            else:
+                missing(i)
+                extra(j)
+            i += 1
+            j += 1
+        elif in_left is None or (in_right is not None and in_right - j <= in_left - i):
+            for position in range(j, in_right):
+                extra(position)
+            j = in_right
+        else:
+            for position in range(i, in_left):
+                missing(position)
+            i = in_left
+    for position in range(i, len(left)):
+        missing(position)
+    for position in range(j, len(right)):
+        extra(position)
+    return mismatches
 
 
 # ---------------------------------------------------------------------------
@@ -200,25 +367,37 @@ CYAN = "\033[36m"
 BOLD = "\033[1m"
 
 
-def colour_diff(diff: list[str]) -> str:
-    out = []
-    for line in diff:
-        if line.startswith("---") or line.startswith("+++"):
-            out.append(BOLD + line + RESET)
-        elif line.startswith("-"):
-            out.append(RED + line + RESET)
-        elif line.startswith("+"):
-            out.append(GREEN + line + RESET)
-        elif line.startswith("@@"):
-            out.append(CYAN + line + RESET)
+MAX_MISMATCHES_SHOWN = 40
+
+
+def _preview(value: str, width: int = 100) -> str:
+    text = repr(value)
+    return text if len(text) <= width else text[: width - 3] + "..."
+
+
+def format_mismatch(mismatch: Mismatch) -> str:
+    side = "round-trip" if mismatch.kind == "extra" else "local"
+    lines = [
+        (
+            f"{CYAN}{mismatch.node_type}{RESET} {mismatch.kind}"
+            f" ({side} block {mismatch.index})"
+        )
+    ]
+    for name, (local, round_trip) in mismatch.fields.items():
+        if mismatch.kind == "changed":
+            lines.append(f"    {name}:")
+            lines.append(f"      {RED}- {_preview(local)}{RESET}")
+            lines.append(f"      {GREEN}+ {_preview(round_trip)}{RESET}")
+        elif mismatch.kind == "missing":
+            lines.append(f"    {RED}- {name}: {_preview(local)}{RESET}")
         else:
-            out.append(line)
-    return "\n".join(out)
+            lines.append(f"    {GREEN}+ {name}: {_preview(round_trip)}{RESET}")
+    return "\n".join(lines)
 
 
 def report(results: list[dict]) -> None:
-    identical = [r for r in results if not r["diff"]]
-    different = [r for r in results if r["diff"]]
+    identical = [r for r in results if not r["mismatches"] and not r["error"]]
+    different = [r for r in results if r["mismatches"] or r["error"]]
 
     print(f"\n{BOLD}=== Round-trip consistency check ==={RESET}")
     print(
@@ -233,24 +412,19 @@ def report(results: list[dict]) -> None:
     if different:
         print(f"\n{RED}✗ Different ({len(different)}){RESET}")
         for r in different:
-            cats = categorise(r["diff"])
-            cat_str = ", ".join(sorted(cats)) if cats else "other"
-            added = sum(
-                1 for l in r["diff"] if l.startswith("+") and not l.startswith("+++")
-            )
-            removed = sum(
-                1 for l in r["diff"] if l.startswith("-") and not l.startswith("---")
-            )
-            print(
-                f"\n{BOLD}{r['article_id']}  {r['title'][:60]}{RESET}"
-                f"  [{cat_str}]  +{added}/-{removed} lines"
-            )
-            # Show up to 80 diff lines to keep output manageable
-            shown = r["diff"][:80]
-            print(colour_diff(shown))
-            if len(r["diff"]) > 80:
+            print(f"\n{BOLD}{r['article_id']}  {r['title'][:60]}{RESET}", end="")
+            if r["error"]:
+                print(f"  {RED}ERROR: {r['error']}{RESET}")
+                continue
+            mismatches = r["mismatches"]
+            node_types = ", ".join(sorted({m.node_type for m in mismatches}))
+            print(f"  [{node_types}]  {len(mismatches)} mismatched blocks")
+            for mismatch in mismatches[:MAX_MISMATCHES_SHOWN]:
+                print(format_mismatch(mismatch))
+            if len(mismatches) > MAX_MISMATCHES_SHOWN:
                 print(
-                    f"  {YELLOW}... {len(r['diff']) - 80} more lines truncated{RESET}"
+                    f"  {YELLOW}... {len(mismatches) - MAX_MISMATCHES_SHOWN}"
+                    f" more mismatches truncated{RESET}"
                 )
 
 
@@ -261,23 +435,70 @@ def report(results: list[dict]) -> None:
 
 def build_parser() -> argparse.ArgumentParser:
     p = argparse.ArgumentParser(description=__doc__)
+    p.add_argument(
+        "--backend",
+        choices=BACKENDS,
+        default="live",
+        help="Where previews come from: Zhihu (live) or zhihu_simulator (offline)",
+    )
     p.add_argument(
         "--delay",
         type=float,
         default=1.5,
-        help="Seconds between requests (default 1.5)",
+        help="Seconds between requests in live mode (default 1.5)",
+    )
+    p.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Articles checked concurrently (default 1)",
+    )
+    p.add_argument(
+        "--draft-ids",
+        default="",
+        help="Comma-separated scratch draft ids to push previews to instead of "
+        "each article's own draft",
+    )
+    p.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Ignore cached live previews and fetch every article again",
     )
     p.add_argument("--article-id", default="", help="Check only this article id")
+    p.add_argument(
+        "--renderer",
+        choices=HTML_RENDERERS,
+        default=None,
+        help="Markdown → HTML renderer to check (default: ZHIHU_HTML_RENDERER)",
+    )
+    p.add_argument(
+        "paths",
+        nargs="*",
+        type=Path,
+        help="Markdown files to check instead of the articles",
+    )
     return p
 
 
 def main() -> None:
-    args = build_parser().parse_args()
-
-    client = ZhihuClient.from_env_or_cache(allow_login=False)
+    parser = build_parser()
+    args = parser.parse_args()
+    draft_ids = [d.strip() for d in args.draft_ids.split(",") if d.strip()]
+    if args.paths and args.backend == "live" and not draft_ids:
+        parser.error("live checks of markdown files need --draft-ids")
+
+    if args.backend == "live":
+        client = ZhihuClient.from_env_or_cache(allow_login=False)
+        backend = LivePreview(
+            client, args.delay, draft_ids, PreviewCache(), args.refresh
+        )
+    else:
+        backend = OfflinePreview()
 
     # Collect articles to check
-    if args.article_id:
+    if args.paths:
+        candidates = [(path.stem, path) for path in args.paths]
+    elif args.article_id:
         md_path = ARTICLE_DIR / args.article_id / "index.md"
         if not md_path.exists():
             print(f"Not found: {md_path}", file=sys.stderr)
@@ -297,27 +518,40 @@ def main() -> None:
                 aid = d.name  # directory name is the article id
             candidates.append((aid, md))
 
-    results: list[dict] = []
-    for i, (aid, md_path) in enumerate(candidates, 1):
-        print(f"[{i}/{len(candidates)}] Checking {aid} ...", end=" ", flush=True)
+    total = len(candidates)
+
+    def check_one(aid: str, md_path: Path) -> dict:
         try:
-            result = check_article(client, aid, md_path, args.delay)
-            status = "OK" if not result["diff"] else f"{len(result['diff'])} diff lines"
-            print(status)
-            results.append(result)
+            return check_article(backend, aid, md_path, args.renderer)
         except Exception as e:
-            print(f"ERROR: {e}")
-            results.append(
-                {
-                    "article_id": aid,
-                    "title": md_path.parent.name,
-                    "diff": [f"ERROR: {e}"],
-                    "local_lines": [],
-                    "rt_lines": [],
-                }
-            )
+            return {
+                "article_id": aid,
+                "title": md_path.parent.name,
+                "mismatches": [],
+                "error": str(e),
+            }
+
+    results: list[dict | None] = [None] * total
+    with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as executor:
+        future_map = {
+            executor.submit(check_one, aid, md_path): index
+            for index, (aid, md_path) in enumerate(candidates)
+        }
+        for done, future in enumerate(as_completed(future_map), 1):
+            result = future.result()
+            results[future_map[future]] = result
+            if result["error"]:
+                status = f"ERROR: {result['error']}"
+            elif result["mismatches"]:
+                status = f"{len(result['mismatches'])} mismatched blocks"
+            else:
+                status = "OK"
+            print(f"[{done}/{total}] {result['article_id']} ... {status}", flush=True)
 
     report(results)
+    if isinstance(backend, LivePreview) and backend.cache is not None:
+        hits = backend.cache.hits
+        print(f"\nPreview cache: {hits} hits, {total - hits} fetched")
 
 
 if __name__ == "__main__":
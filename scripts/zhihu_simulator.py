@@ -0,0 +1,164 @@
+"""
+Offline stand-in for Zhihu's draft → preview HTML transformation.
+
+Zhihu does not store the HTML we PATCH into a draft verbatim: the preview page
+serves a rewritten copy. This module applies the rewrites we have observed so
+that round-trip checks can run without a cookie or network access:
+
+  - every URL is served over http://, external links go through link.zhihu.com
+  - images become <figure> blocks on a pic*.zhimg.com host with an _r size
+    suffix and a ?source= query; the alt text becomes the caption
+  - <em>/<strong> become <i>/<b>
+  - <pre lang="X"> becomes <div class="highlight"><pre><code class="language-X">
+  - <code> is dropped inside links and headings
+  - a paragraph holding a single link becomes a link card
+
+The live preview remains the source of truth; see
+`zhihu_roundtrip_check.py --backend live`.
+"""
+
+import hashlib
+import re
+from urllib.parse import quote, urlsplit
+
+from bs4 import BeautifulSoup, Tag
+
+LINK_REDIRECT = "http://link.zhihu.com/?target="
+# Hosts Zhihu links to directly instead of through link.zhihu.com
+ZHIHU_HOSTS = ("zhihu.com", "zhimg.com")
+IMAGE_HOSTS = ("pic1", "pic2", "pic3", "pic4", "picx")
+IMAGE_SOURCE = "1def8aca"
+# Code languages Zhihu renames on save
+LANGUAGE_ALIASES = {"bash": "text"}
+PREVIEW_TEMPLATE = '<div class="RichText ztext Post-RichText">{content}</div>'
+
+
+def _is_zhihu_host(url: str) -> bool:
+    host = urlsplit(url).hostname or ""
+    return any(host == h or host.endswith("." + h) for h in ZHIHU_HOSTS)
+
+
+def _force_http(url: str) -> str:
+    return re.sub(r"^https://", "http://", url)
+
+
+def simulate_link(url: str) -> str:
+    """Return the href Zhihu serves for a link to `url`."""
+    if not url.startswith(("http://", "https://")) or _is_zhihu_host(url):
+        return _force_http(url)
+    return LINK_REDIRECT + quote(url, safe="/")
+
+
+def simulate_image(url: str) -> str:
+    """Return the data-original URL Zhihu serves for an image at `url`.
+
+    Images already on zhimg keep their v2 hash; anything else is re-uploaded,
+    which we model as a hash derived from the source URL.
+    """
+    match = re.search(r"(v2-[0-9a-f]+)(?:_\w+)?\.(\w+)", url)
+    if match and _is_zhihu_host(url):
+        name, ext = match.group(1), match.group(2)
+    else:
+        name = "v2-" + hashlib.md5(url.encode("utf-8")).hexdigest()
+        ext = "jpg"
+    host = IMAGE_HOSTS[int(hashlib.md5(name.encode()).hexdigest(), 16) % 5]
+    return f"http://{host}.zhimg.com/{name}_r.{ext}?source={IMAGE_SOURCE}"
+
+
+def _rewrite_image(soup: BeautifulSoup, img: Tag) -> Tag:
+    original = simulate_image(img.get("src", ""))
+    figure = soup.new_tag("figure", attrs={"data-size": "normal"})
+    figure.append(
+        soup.new_tag(
+            "img",
+            attrs={
+                "src": original,
+                "data-original": original,
+                "data-caption": img.get("alt", ""),
+                "data-size": "normal",
+                "class": "origin_image zh-lightbox-thumb",
+            },
+        )
+    )
+    if img.get("alt"):
+        caption = soup.new_tag("figcaption")
+        caption.string = img["alt"]
+        figure.append(caption)
+    return figure
+
+
+def _rewrite_code_block(soup: BeautifulSoup, pre: Tag) -> Tag:
+    language = pre.get("lang", "")
+    language = LANGUAGE_ALIASES.get(language, language)
+    code = soup.new_tag("code")
+    if language:
+        code["class"] = f"language-{language}"
+    code.string = pre.get_text()
+    highlight = soup.new_tag("div", attrs={"class": "highlight"})
+    new_pre = soup.new_tag("pre")
+    new_pre.append(code)
+    highlight.append(new_pre)
+    return highlight
+
+
+def _rewrite_link_card(soup: BeautifulSoup, paragraph: Tag) -> Tag:
+    link = paragraph.find("a")
+    label = link.get_text()
+    card = soup.new_tag(
+        "a",
+        attrs={
+            "href": link["href"],
+            "data-draft-node": "block",
+            "data-draft-type": "link-card",
+            "data-text": "" if label == link.get("data-url") else label,
+            "class": "LinkCard new",
+        },
+    )
+    card.string = label
+    return card
+
+
+def _only_child(node: Tag) -> Tag | None:
+    """Return the single element child of `node` if it has no other content."""
+    children = [
+        child
+        for child in node.children
+        if not (isinstance(child, str) and not child.strip())
+    ]
+    if len(children) == 1 and isinstance(children[0], Tag):
+        return children[0]
+    return None
+
+
+def simulate_preview(html: str) -> str:
+    """Return the preview page Zhihu would serve for draft content `html`."""
+    soup = BeautifulSoup(html, "html.parser")
+
+    for node in soup.find_all(["a", "h2", "h3"]):
+        for code in node.find_all("code"):
+            code.unwrap()
+    for link in soup.find_all("a"):
+        link["data-url"] = link.get("href", "")
+        link["href"] = simulate_link(link["data-url"])
+    for tag, replacement in (("em", "i"), ("strong", "b")):
+        for node in soup.find_all(tag):
+            node.name = replacement
+    for pre in soup.find_all("pre"):
+        pre.replace_with(_rewrite_code_block(soup, pre))
+    for img in soup.find_all("img"):
+        img.replace_with(_rewrite_image(soup, img))
+    # Figures are block-level; a lone link at the top level becomes a card
+    for paragraph in soup.find_all("p"):
+        child = _only_child(paragraph)
+        if child is None:
+            continue
+        if child.name == "figure":
+            paragraph.unwrap()
+        elif (
+            child.name == "a" and child.find(True) is None and paragraph.parent is soup
+        ):
+            paragraph.replace_with(_rewrite_link_card(soup, paragraph))
+    for link in soup.find_all("a"):
+        del link["data-url"]
+
+    return PREVIEW_TEMPLATE.format(content=str(soup))